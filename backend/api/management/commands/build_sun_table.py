@@ -0,0 +1,41 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from django.core.management.base import BaseCommand
+from weather_engine.sun_table import SUN_TABLE_DAYS, SunTable, latest_sun_table, remove_old_sun_tables
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+def build_sun_table(force=False):
+    """
+    Builds the per-place sunrise and sunset table for the forecast horizon.
+
+    The table starts yesterday (UTC): hours of today's forecast west of
+    Greenwich still belong to yesterday's solar day.
+
+    Args:
+        force (bool): Rebuild even if the stored table is up to date.
+
+    Returns:
+        bool: True if a new table was saved.
+    """
+    start_date = datetime.now(timezone.utc).date() - timedelta(days=1)
+
+    table = latest_sun_table()
+    if not force and table is not None and table.is_current(start_date):
+        logger.info("Sun table starting %s is up to date.", start_date)
+        return False
+
+    table = SunTable.build(start_date, SUN_TABLE_DAYS + 1)
+    remove_old_sun_tables(keep=table.directory)
+    return True
+
+class Command(BaseCommand):
+    help = 'Precompute sunrise, sunset and solar noon of every place for the next 16 days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild even if the table is up to date')
+
+    def handle(self, *args, **options):
+        build_sun_table(force=options['force'])
@@ -3,7 +3,9 @@ import logging
 import shutil
 from datetime import datetime, timedelta, timezone
 from django.core.management.base import BaseCommand
-from weather.models.model_gfs_forecast import GFSForecast
+from weather.models import ForecastCycle
+from weather_engine.forecast_partitions import drop_expired_cycles
+from weather_engine.forecast_store import remove_expired_cubes
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -89,18 +91,27 @@ def cleanup_old_gfs_data():
                         continue
 
 def delete_old_gfs_forecast_entries():
-    """Deletes old GFSForecast entries from the database."""
+    """Drops superseded and stale forecast cycles, with their GFSForecast partitions, from the database."""
     # Number of days to keep
     days_to_keep = 2
 
-    # Get the current date in UTC
-    current_date = datetime.utcnow().date()
-    cutoff_date = current_date - timedelta(days=days_to_keep - 1)
-    logger.info(f"Deleting GFSForecast data with date before {cutoff_date}")
+    # Unfinished cycles older than this will never become current
+    cutoff_datetime = datetime.now(timezone.utc) - timedelta(days=days_to_keep - 1)
+    logger.info(f"Deleting GFSForecast cycles older than the current one or unfinished before {cutoff_datetime}")
+
+    # Whole cycles are dropped as partitions instead of deleting rows one by one
+    num_dropped = drop_expired_cycles(cutoff_datetime)
+    logger.info(f"Dropped {num_dropped} old GFSForecast cycles")
 
-    # Delete entries older than the cutoff date
-    num_deleted, _ = GFSForecast.objects.filter(date__lt=cutoff_date).delete()
-    logger.info(f"Deleted {num_deleted} old GFSForecast entries with date before {cutoff_date}")
+def delete_old_forecast_cubes():
+    """Deletes forecast cubes of old cycles from the forecast store, keeping the current one."""
+    # Number of days to keep
+    days_to_keep = 2
+
+    cutoff_datetime = datetime.now(timezone.utc) - timedelta(days=days_to_keep - 1)
+    current = ForecastCycle.objects.current()
+    num_removed = remove_expired_cubes(cutoff_datetime, keep=current.run_datetime if current is not None else None)
+    logger.info(f"Deleted {num_removed} forecast cubes of cycles before {cutoff_datetime}")
 
 def cleanup_data():
     """Runs the full cleanup process for GFS data, temp files, and old database entries."""
@@ -114,10 +125,14 @@ def cleanup_data():
     logger.info("Cleaning up old GFS data folders and files.")
     cleanup_old_gfs_data()
 
-    # Step 3: Delete old GFSForecast entries from the database
+    # Step 3: Drop old GFSForecast cycles from the database
     logger.info("Deleting old GFSForecast entries from the database.")
     delete_old_gfs_forecast_entries()
 
+    # Step 4: Delete old forecast cubes
+    logger.info("Deleting old forecast cubes.")
+    delete_old_forecast_cubes()
+
     logger.info("Cleanup of data completed.")
 
 class Command(BaseCommand):
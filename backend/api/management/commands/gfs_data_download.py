@@ -1,14 +1,22 @@
 from datetime import datetime, timedelta, timezone
+import json
 import logging
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from django.core.management.base import BaseCommand
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from weather_engine.gfs_inventory import enabled_idx_keys, merge_ranges, parse_idx, select_records
+from weather_engine.grid_index import DOMAIN_MARGIN_DEGREES, places_bounding_box
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 def get_available_files(base_url, date, hour):
     """
     Retrieves the list of available files on the NOAA server for a given cycle.
@@ -72,7 +80,213 @@ def find_latest_complete_cycle(base_url, forecast_hours, max_cycles=10):
     logger.warning("No complete cycles found in the last %d cycles.", max_cycles)
     return None, None
 
-def download_gfs_data_sequence(base_url, date, hour, forecast_hours, save_directory, dry_run=False):
+def create_session(pool_size):
+    """
+    Creates a requests session whose connection pool is shared by all download threads.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def fetch_inventory(session, url):
+    """
+    Downloads and parses the .idx inventory of a GRIB file.
+
+    Returns:
+        list or None: IdxRecord per message, or None if the inventory is unavailable.
+    """
+    try:
+        response = session.get(f"{url}.idx", timeout=60)
+        if response.status_code == 200:
+            return parse_idx(response.text)
+        logger.warning("Failed to download inventory %s.idx (Status Code: %d)", url, response.status_code)
+    except requests.RequestException as e:
+        logger.warning("Error downloading inventory %s.idx: %s", url, e)
+    return None
+
+def write_response(response, file):
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        if chunk:
+            file.write(chunk)
+
+def download_ranges(session, url, ranges, temp_save_path):
+    """
+    Downloads byte ranges of a remote file into one local file, resuming a partial download.
+
+    Args:
+        session (requests.Session): Session to download with.
+        url (str): URL of the remote GRIB file.
+        ranges (list): (start, end) byte ranges; end is inclusive or None for end of file.
+        temp_save_path (str): Partial file to append to.
+    """
+    # Bytes already on disk cover the first ranges (or part of one) in order
+    skip = os.path.getsize(temp_save_path) if os.path.exists(temp_save_path) else 0
+    with open(temp_save_path, 'ab') as file:
+        for start, end in ranges:
+            if end is not None and skip >= end - start + 1:
+                skip -= end - start + 1
+                continue
+            range_start, skip = start + skip, 0
+            range_header = f"bytes={range_start}-{'' if end is None else end}"
+            response = session.get(url, headers={'Range': range_header}, stream=True, timeout=60)
+            with response:
+                if response.status_code == 416 and end is None:
+                    # The open-ended last range was already complete
+                    continue
+                if response.status_code != 206:
+                    raise requests.RequestException(
+                        f"Range request {range_header} for {url} failed (Status Code: {response.status_code})"
+                    )
+                write_response(response, file)
+
+def download_signature(url, ranges):
+    """
+    Describes what a partial download holds: the bytes of ranges of url, in order,
+    or of the whole file when ranges is None.
+    """
+    return json.dumps({'url': url, 'ranges': ranges})
+
+def prepare_resume(temp_save_path, signature_path, signature):
+    """
+    Keeps a partial download for resuming only if it was started with the same signature,
+    which is recorded next to it. A partial file started for other byte ranges (e.g. from
+    an earlier inventory or parameter selection) is discarded so that it is not appended to.
+    """
+    try:
+        with open(signature_path) as file:
+            recorded = file.read()
+    except OSError:
+        recorded = None
+    if recorded == signature:
+        return
+
+    if os.path.exists(temp_save_path):
+        logger.info("Discarding partial download %s started for other byte ranges", temp_save_path)
+        os.remove(temp_save_path)
+    with open(signature_path, 'w') as file:
+        file.write(signature)
+
+def download_full_file(session, url, temp_save_path):
+    """
+    Downloads a whole remote file, resuming a partial download when the server allows it.
+    """
+    existing_size = os.path.getsize(temp_save_path) if os.path.exists(temp_save_path) else 0
+    headers = {'Range': f"bytes={existing_size}-"} if existing_size else {}
+    with session.get(url, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 416:
+            return
+        if response.status_code not in (200, 206):
+            raise requests.RequestException(f"Failed to download {url} (Status Code: {response.status_code})")
+        # A 200 means the server ignored the range and sent the whole file again
+        with open(temp_save_path, 'ab' if response.status_code == 206 else 'wb') as file:
+            write_response(response, file)
+
+def download_filtered_file(session, filter_url, date, hour, file_name, idx_keys, bounding_box, temp_save_path):
+    """
+    Downloads the enabled variables and levels over our domain through the NOMADS filter service.
+    """
+    params = {
+        'file': file_name,
+        'dir': f"/gfs.{date}/{hour}/atmos",
+    }
+    for variable, level in idx_keys:
+        params[f"var_{variable}"] = 'on'
+        params[f"lev_{level.replace(' ', '_')}"] = 'on'
+    if bounding_box is not None:
+        min_lat, max_lat, min_lon, max_lon = bounding_box
+        params.update({
+            'subregion': '',
+            'leftlon': min_lon - DOMAIN_MARGIN_DEGREES,
+            'rightlon': max_lon + DOMAIN_MARGIN_DEGREES,
+            'toplat': max_lat + DOMAIN_MARGIN_DEGREES,
+            'bottomlat': min_lat - DOMAIN_MARGIN_DEGREES,
+        })
+
+    # Filter service output is generated on the fly and cannot be resumed
+    with session.get(filter_url, params=params, stream=True, timeout=120) as response:
+        if response.status_code != 200:
+            raise requests.RequestException(
+                f"Filter request for {file_name} failed (Status Code: {response.status_code})"
+            )
+        with open(temp_save_path, 'wb') as file:
+            write_response(response, file)
+
+def download_gfs_file(session, base_url, date, hour, forecast_hour, save_directory, idx_keys=None,
+                      filter_url=None, bounding_box=None):
+    """
+    Downloads one forecast hour, restricted to the enabled parameters when idx_keys is given.
+
+    Args:
+        session (requests.Session): Session to download with.
+        base_url (str): Base URL of the NOAA server.
+        date (str): Date in YYYYMMDD format.
+        hour (str): Hour in HH format.
+        forecast_hour (int): Forecast hour to download.
+        save_directory (str): Directory to save the file in.
+        idx_keys (set): .idx (variable, level) pairs to download, or None for the full file.
+        filter_url (str): NOMADS filter service URL to use instead of range requests.
+        bounding_box (tuple): (min_lat, max_lat, min_lon, max_lon) for the filter service.
+
+    Returns:
+        str or None: Path of the downloaded file, or None on failure.
+    """
+    file_name = f"gfs.t{hour}z.pgrb2.0p25.f{forecast_hour:03}"
+    url = f"{base_url}/gfs.{date}/{hour}/atmos/{file_name}"
+    temp_save_path = os.path.join(save_directory, f"{file_name}.tmp")
+    # Ends in .tmp too, so that gfs_data_cleanup removes it with the partial file
+    signature_path = os.path.join(save_directory, f"{file_name}.signature.tmp")
+    final_save_path = os.path.join(save_directory, f"{file_name}")
+
+    if os.path.exists(final_save_path):
+        logger.info("File already exists: %s", final_save_path)
+        return final_save_path
+
+    try:
+        if idx_keys is not None and filter_url:
+            # Filtered downloads are never resumed, so no other download may resume their partial file
+            if os.path.exists(signature_path):
+                os.remove(signature_path)
+            download_filtered_file(session, filter_url, date, hour, file_name, idx_keys, bounding_box, temp_save_path)
+        else:
+            records = fetch_inventory(session, url) if idx_keys is not None else None
+            if records is None:
+                prepare_resume(temp_save_path, signature_path, download_signature(url, None))
+                download_full_file(session, url, temp_save_path)
+            else:
+                selected = select_records(records, idx_keys)
+                if not selected:
+                    logger.warning("No enabled parameters listed in %s.idx, skipping.", url)
+                    return None
+                ranges = merge_ranges(selected)
+                logger.info("Downloading %d of %d messages in %d ranges from %s",
+                            len(selected), len(records), len(ranges), url)
+                prepare_resume(temp_save_path, signature_path, download_signature(url, ranges))
+                download_ranges(session, url, ranges, temp_save_path)
+
+        os.rename(temp_save_path, final_save_path)
+        if os.path.exists(signature_path):
+            os.remove(signature_path)
+        logger.info("Downloaded GFS data to %s", final_save_path)
+        return final_save_path
+    except requests.RequestException as e:
+        # The partial .tmp file is kept so that the next run can resume it
+        logger.warning("Error downloading %s: %s", url, e)
+        return None
+
+def download_gfs_data_sequence(base_url, date, hour, forecast_hours, save_directory, dry_run=False, workers=1,
+                               idx_keys=None, filter_url=None, bounding_box=None):
     """
     Downloads a sequence of GFS data files for specified forecast hours.
 
@@ -83,46 +297,52 @@ def download_gfs_data_sequence(base_url, date, hour, forecast_hours, save_direct
         forecast_hours (list): List of forecast hours to download.
         save_directory (str): Directory to save the downloaded files.
         dry_run (bool): If True, simulates the download without saving files.
+        workers (int): Number of files downloaded concurrently.
+        idx_keys (set): .idx (variable, level) pairs to download, or None for full files.
+        filter_url (str): NOMADS filter service URL to use instead of range requests.
+        bounding_box (tuple): (min_lat, max_lat, min_lon, max_lon) for the filter service.
 
     Returns:
         list: List of paths to the downloaded (or expected) GRIB2 files.
     """
     os.makedirs(save_directory, exist_ok=True)
-    grib_files = []
-
-    for forecast_hour in forecast_hours:
-        file_name = f"gfs.t{hour}z.pgrb2.0p25.f{forecast_hour:03}"
-        url = f"{base_url}/gfs.{date}/{hour}/atmos/{file_name}"
-        temp_save_path = os.path.join(save_directory, f"{file_name}.tmp")
-        final_save_path = os.path.join(save_directory, f"{file_name}")
-
-        if not os.path.exists(final_save_path):
-            if not dry_run:
-                try:
-                    response = requests.get(url, stream=True, timeout=60)
-                    if response.status_code == 200:
-                        with open(temp_save_path, 'wb') as file:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                if chunk:
-                                    file.write(chunk)
-                        os.rename(temp_save_path, final_save_path)
-                        logger.info("Downloaded GFS data to %s", final_save_path)
-                        grib_files.append(final_save_path)
-                    else:
-                        logger.warning("Failed to download GFS data from %s (Status Code: %d)", url, response.status_code)
-                        if os.path.exists(temp_save_path):
-                            os.remove(temp_save_path)
-                except requests.RequestException as e:
-                    logger.warning("Error downloading %s: %s", url, e)
-                    if os.path.exists(temp_save_path):
-                        os.remove(temp_save_path)
-            else:
-                logger.info(f"DRY RUN: Would download {url} to {final_save_path}")
-                grib_files.append(final_save_path)
-        else:
-            logger.info("File already exists: %s", final_save_path)
+
+    if dry_run:
+        grib_files = []
+        for forecast_hour in forecast_hours:
+            file_name = f"gfs.t{hour}z.pgrb2.0p25.f{forecast_hour:03}"
+            url = f"{base_url}/gfs.{date}/{hour}/atmos/{file_name}"
+            final_save_path = os.path.join(save_directory, file_name)
+            logger.info(f"DRY RUN: Would download {url} to {final_save_path}")
             grib_files.append(final_save_path)
-    return grib_files
+        return grib_files
+
+    session = create_session(workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lambda forecast_hour: download_gfs_file(
+                session, base_url, date, hour, forecast_hour, save_directory, idx_keys, filter_url, bounding_box
+            ),
+            forecast_hours,
+        )
+        return [path for path in results if path is not None]
+
+def build_forecast_hours(max_hours):
+    """
+    Lists the forecast hours published for a cycle, up to max_hours.
+
+    Args:
+        max_hours (int): Maximum forecast hour.
+
+    Returns:
+        list: Forecast hours in ascending order.
+    """
+    if max_hours > 120:
+        forecast_hours_0_120 = list(range(0, 121, 1))
+        # Forecast hours after 120 are typically in 3-hour increments
+        forecast_hours_120_plus = list(range(123, min(385, max_hours + 1), 3))
+        return forecast_hours_0_120 + forecast_hours_120_plus
+    return list(range(0, max_hours + 1, 1))
 
 def is_directory_complete(directory, expected_file_count):
     """
@@ -137,7 +357,11 @@ def is_directory_complete(directory, expected_file_count):
     """
     if not os.path.exists(directory):
         return False
-    actual_file_count = len([f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))])
+    # Partial downloads are not complete files
+    actual_file_count = len([
+        f for f in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, f)) and not f.endswith('.tmp')
+    ])
     return actual_file_count >= expected_file_count
 
 class Command(BaseCommand):
@@ -167,6 +391,24 @@ class Command(BaseCommand):
             default=10,
             help='Maximum number of past cycles to check (default: 10)'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of files to download concurrently (default: 8)'
+        )
+        parser.add_argument(
+            '--full_files',
+            action='store_true',
+            help='Download complete GRIB files instead of only the enabled parameters'
+        )
+        parser.add_argument(
+            '--filter_url',
+            type=str,
+            default=None,
+            help='NOMADS filter service URL (e.g. https://nomads.ncep.noaa.gov/cgi-bin/filter_gfs_0p25.pl) '
+                 'to download enabled parameters over the places bounding box only'
+        )
 
     def handle(self, *args, **options):
         """
@@ -178,15 +420,24 @@ class Command(BaseCommand):
         max_hours = options['max_hours']
         dry_run = options['dry_run']
         max_cycles = options['max_cycles']
+        workers = max(1, options['workers'])
+        filter_url = options['filter_url']
 
-        # Define forecast_hours based on max_hours
-        if max_hours > 120:
-            forecast_hours_0_120 = list(range(0, 121, 1))
-            # Forecast hours after 120 are typically in 3-hour increments
-            forecast_hours_120_plus = list(range(123, min(385, max_hours + 1), 3))
-            forecast_hours = forecast_hours_0_120 + forecast_hours_120_plus
-        else:
-            forecast_hours = list(range(0, max_hours + 1, 1))
+        idx_keys = None
+        bounding_box = None
+        if not options['full_files']:
+            idx_keys = enabled_idx_keys()
+            if idx_keys is None:
+                logger.warning("Some enabled parameters cannot be selected by inventory, downloading full files.")
+            elif not idx_keys:
+                logger.error("No enabled parameters found. Use --full_files to download complete files.")
+                return
+            else:
+                logger.info(f"Downloading inventory keys: {sorted(idx_keys)}")
+                if filter_url:
+                    bounding_box = places_bounding_box()
+
+        forecast_hours = build_forecast_hours(max_hours)
 
         expected_file_count = len(forecast_hours)
         logger.info(f"Forecast hours (max {max_hours} hours): {forecast_hours}")
@@ -211,7 +462,11 @@ class Command(BaseCommand):
                 hour=hour,
                 forecast_hours=forecast_hours,
                 save_directory=save_directory,
-                dry_run=dry_run
+                dry_run=dry_run,
+                workers=workers,
+                idx_keys=idx_keys,
+                filter_url=filter_url,
+                bounding_box=bounding_box
             )
 
             if len(grib_files) >= expected_file_count:
@@ -1,14 +1,20 @@
 import os
 import logging
+import re
 import pygrib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 from django.core.management.base import BaseCommand
+from django.db import connections
 from weather_engine.models import GFSParameter
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Download folders are named '<YYYYMMDD>_<HH>' after the cycle they hold
+CYCLE_FOLDER_PATTERN = re.compile(r'^\d{8}_\d{2}$')
+
 def extract_forecast_details(filename, folder_name):
     try:
         # Example filename: gfs.t12z.pgrb2.0p25.f000
@@ -28,17 +34,6 @@ def extract_forecast_details(filename, folder_name):
         logger.error(f"Error extracting details from filename {filename}: {e}")
         return None, None, None
 
-def list_available_parameters(file_path):
-    parameters = set()
-    try:
-        with pygrib.open(file_path) as gribs:
-            for grib in gribs:
-                param_key = (grib.parameterCategory, grib.level, grib.shortName, grib.name)
-                parameters.add(param_key)
-    except Exception as e:
-        logger.error(f"Error listing parameters in GRIB file {file_path}: {e}")
-    return parameters
-
 def standardize_param_key(param):
     """Standardize the parameter key for consistent comparison."""
     return (
@@ -49,8 +44,18 @@ def standardize_param_key(param):
     )
 
 def filter_grib_messages(file_path, relevant_parameters, new_file_path):
+    """
+    Copy the messages matching the relevant parameters in a single pass.
+
+    Only message headers are read; matching messages are written out as their
+    original encoded bytes, so data sections are never decoded.
+
+    Returns:
+        int: Number of messages written. No file is left behind when it is 0.
+    """
+    temp_file_path = f"{new_file_path}.tmp"
     try:
-        with pygrib.open(file_path) as gribs, open(new_file_path, 'wb') as new_grib_file:
+        with pygrib.open(file_path) as gribs, open(temp_file_path, 'wb') as new_grib_file:
             messages_written = 0
             for grib in gribs:
                 param_key = standardize_param_key((
@@ -62,12 +67,80 @@ def filter_grib_messages(file_path, relevant_parameters, new_file_path):
                 if param_key in relevant_parameters:
                     new_grib_file.write(grib.tostring())
                     messages_written += 1
-            if messages_written > 0:
-                logger.info(f"Saved {messages_written} messages to {new_file_path}")
-            else:
-                logger.warning(f"No matching parameters found in {file_path}")
+        if messages_written > 0:
+            os.replace(temp_file_path, new_file_path)
+            logger.info(f"Saved {messages_written} messages to {new_file_path}")
+        else:
+            os.remove(temp_file_path)
+            logger.warning(f"No matching parameters found in {file_path}")
+        return messages_written
     except Exception as e:
         logger.error(f"Error while filtering GRIB file {file_path}: {e}")
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        return 0
+
+def enabled_parameter_keys():
+    """Build the set of standardized keys of enabled parameters."""
+    return {
+        standardize_param_key((
+            param.parameter_category,
+            param.level_layer,
+            param.short_name,
+            param.description
+        ))
+        for param in GFSParameter.objects.filter(enabled=True)
+    }
+
+def filter_gfs_file(file_path, folder_name, relevant_parameters, filtered_directory):
+    """
+    Filter one downloaded GRIB file into the filtered directory of its cycle.
+
+    Returns:
+        str or None: Path of the filtered file, or None if nothing was written.
+    """
+    filename = os.path.basename(file_path)
+    valid_datetime, cycle_datetime, forecast_hour = extract_forecast_details(filename, folder_name)
+    if valid_datetime is None:
+        logger.error(f"Skipping file due to error in extracting details: {file_path}")
+        return None
+
+    # Create output subdirectory for the cycle
+    filtered_subdirectory = os.path.join(filtered_directory, folder_name)
+    os.makedirs(filtered_subdirectory, exist_ok=True)
+
+    # Name the filtered file
+    new_file_name = f"filtered_{valid_datetime.strftime('%Y%m%d_%H%M')}_f{forecast_hour:03d}.grib2"
+    new_file_path = os.path.join(filtered_subdirectory, new_file_name)
+
+    logger.info(f"Filtering data from {file_path} to {new_file_path}")
+    if filter_grib_messages(file_path, relevant_parameters, new_file_path) > 0:
+        return new_file_path
+    return None
+
+def filter_gfs_files_in_parallel(grib_files, base_directory, relevant_parameters, filtered_directory, workers):
+    """
+    Filter downloaded GRIB files concurrently, one file per worker process.
+    """
+    # Workers do not use the database; keep the parent's connection out of the fork
+    connections.close_all()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                filter_gfs_file,
+                os.path.join(base_directory, folder_name, filename),
+                folder_name,
+                relevant_parameters,
+                filtered_directory,
+            ): filename
+            for folder_name, filename in grib_files
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error while filtering GRIB file {futures[future]}: {e}")
 
 class Command(BaseCommand):
     """
@@ -76,6 +149,14 @@ class Command(BaseCommand):
 
     help = 'Filter and save GRIB data based on enabled parameters in the database'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of files filtered in parallel (default: number of CPUs)'
+        )
+
     def handle(self, *args, **options):
         logger.info("Starting the GRIB data filtering process.")
 
@@ -83,13 +164,13 @@ class Command(BaseCommand):
         filtered_directory = os.path.join(base_directory, "filtered_data")
         os.makedirs(filtered_directory, exist_ok=True)
 
-        # Collect all GRIB files in subdirectories starting with date
+        # Collect all GRIB files in cycle subdirectories named like '20241018_12'
         grib_files = []
         for subdir in os.listdir(base_directory):
             subdir_path = os.path.join(base_directory, subdir)
-            if os.path.isdir(subdir_path) and subdir.startswith("2024"):
+            if os.path.isdir(subdir_path) and CYCLE_FOLDER_PATTERN.match(subdir):
                 for filename in os.listdir(subdir_path):
-                    if filename.startswith('gfs') and '.f' in filename:
+                    if filename.startswith('gfs') and '.f' in filename and not filename.endswith('.tmp'):
                         grib_files.append((subdir, filename))
 
         if not grib_files:
@@ -98,48 +179,20 @@ class Command(BaseCommand):
 
         try:
             # Build a set of enabled parameters
-            relevant_parameters = {
-                standardize_param_key((
-                    param.parameter_category,
-                    param.level_layer,
-                    param.short_name,
-                    param.description
-                ))
-                for param in GFSParameter.objects.filter(enabled=True)
-            }
+            relevant_parameters = enabled_parameter_keys()
             if not relevant_parameters:
                 logger.warning("No enabled parameters found.")
                 return
 
             logger.info(f"Enabled parameters: {relevant_parameters}")
 
-            for folder_name, filename in grib_files:
-                file_path = os.path.join(base_directory, folder_name, filename)
-                valid_datetime, cycle_datetime, forecast_hour = extract_forecast_details(filename, folder_name)
-                if valid_datetime is None:
-                    logger.error(f"Skipping file due to error in extracting details: {file_path}")
-                    continue
-
-                # Create output subdirectory for the cycle
-                filtered_subdirectory = os.path.join(filtered_directory, folder_name)
-                os.makedirs(filtered_subdirectory, exist_ok=True)
-
-                # Name the filtered file
-                new_file_name = f"filtered_{valid_datetime.strftime('%Y%m%d_%H%M')}_f{forecast_hour:03d}.grib2"
-                new_file_path = os.path.join(filtered_subdirectory, new_file_name)
-
-                # Check available parameters in the GRIB file
-                available_parameters = list_available_parameters(file_path)
-                standardized_available_parameters = {standardize_param_key(param) for param in available_parameters}
-
-                # Find matching parameters
-                matching_parameters = relevant_parameters & standardized_available_parameters
-
-                if matching_parameters:
-                    logger.info(f"Filtering data from {file_path} to {new_file_path}")
-                    filter_grib_messages(file_path, matching_parameters, new_file_path)
-                else:
-                    logger.warning(f"No relevant parameters found in {file_path}. Skipping file.")
+            workers = max(1, options['workers'])
+            if workers > 1 and len(grib_files) > 1:
+                filter_gfs_files_in_parallel(grib_files, base_directory, relevant_parameters, filtered_directory, workers)
+            else:
+                for folder_name, filename in grib_files:
+                    file_path = os.path.join(base_directory, folder_name, filename)
+                    filter_gfs_file(file_path, folder_name, relevant_parameters, filtered_directory)
 
             logger.info("GRIB data filtering process completed.")
 
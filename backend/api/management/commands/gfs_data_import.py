@@ -1,19 +1,28 @@
 import os
 import logging
+import multiprocessing
 import pygrib
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
-from django.contrib.gis.geos import Point as GEOSPoint
 from django.core.management.base import BaseCommand
-from weather.models.model_gfs_forecast import GFSForecast
-from geography.models.model_geographic_place import GeographicPlace
-from scipy.spatial import cKDTree
+from django.db import connections
+from api.management.commands.gfs_data_download import build_forecast_hours
+from weather_engine.forecast_loader import copy_forecast_rows
+from api.utils.weather_payloads import publish_forecast_cycle
+from weather.models import ForecastCycle
+from weather_engine.forecast_partitions import ensure_cycle_partition
+from weather_engine.forecast_store import FORECAST_STORE_DIRECTORY, ForecastCube, cycle_directory_name
+from weather_engine.grid_index import DEFAULT_INTERPOLATION, GridDomain, GridIndexCache, grid_definition, places_bounding_box
 import re
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of places written per bulk import call in pivoted mode
+IMPORT_BATCH_SIZE = 20000
+
 def extract_forecast_details_from_filename(filename):
     try:
         base_name = os.path.basename(filename)
@@ -59,120 +68,44 @@ def extract_forecast_details_from_filename(filename):
         logger.error(f"Error extracting details from filename {filename}: {e}")
         return None, None
 
+def extract_cycle_details_from_filename(filename):
+    """
+    Returns the cycle datetime and forecast hour encoded in a filtered GRIB filename.
+    """
+    valid_datetime, utc_cycle_time = extract_forecast_details_from_filename(filename)
+    if valid_datetime is None:
+        return None, None
+    forecast_hour = int(os.path.basename(filename).split('_')[3].split('.')[0].lstrip('f'))
+    return valid_datetime - timedelta(hours=forecast_hour), forecast_hour
+
 def bulk_import_forecast_data(forecast_data):
     try:
-        # Step 1: Build a set of unique keys from forecast_data
-        unique_keys = set(
-            (data['place'].id, data['date'], data['hour'], data['utc_cycle_time'])
-            for data in forecast_data
-        )
-
-        # Step 2: Fetch existing records matching these keys
-        existing_records = GFSForecast.objects.filter(
-            place__in=[data['place'] for data in forecast_data],
-            date__in=[data['date'] for data in forecast_data],
-            hour__in=[data['hour'] for data in forecast_data],
-            utc_cycle_time__in=[data['utc_cycle_time'] for data in forecast_data]
-        )
-
-        existing_keys = set(
-            (record.place.id, record.date, record.hour, record.utc_cycle_time)
-            for record in existing_records
-        )
-
-        # Step 3: Separate new records and records to update
-        new_records = []
-        records_to_update = []
-
-        # Create a mapping for existing records to update
-        existing_records_dict = {
-            (record.place.id, record.date, record.hour, record.utc_cycle_time): record
-            for record in existing_records
-        }
-
-        for data in forecast_data:
-            key = (data['place'].id, data['date'], data['hour'], data['utc_cycle_time'])
-            if key in existing_keys:
-                # Update existing record
-                record = existing_records_dict[key]
-                record.latitude = data['latitude']
-                record.longitude = data['longitude']
-                # Update forecast_data dictionary
-                record.forecast_data.update(data['forecast_data'])
-                records_to_update.append(record)
-            else:
-                # Create new record
-                new_records.append(GFSForecast(
-                    place=data['place'],
-                    latitude=data['latitude'],
-                    longitude=data['longitude'],
-                    date=data['date'],
-                    hour=data['hour'],
-                    utc_cycle_time=data['utc_cycle_time'],
-                    forecast_data=data['forecast_data']
-                ))
-
-        # Step 4: Bulk create new records
-        if new_records:
-            GFSForecast.objects.bulk_create(new_records, batch_size=1000, ignore_conflicts=True)
-            logger.info("Bulk inserted %d new records", len(new_records))
-
-        # Step 5: Bulk update existing records
-        if records_to_update:
-            GFSForecast.objects.bulk_update(
-                records_to_update,
-                fields=['latitude', 'longitude', 'forecast_data'],
-                batch_size=1000
-            )
-            logger.info("Bulk updated %d existing records", len(records_to_update))
-
-        total_records = len(new_records) + len(records_to_update)
-        logger.info("Processed %d records (%d new, %d updated)", total_records, len(new_records), len(records_to_update))
+        # Stream the rows through COPY and merge them into existing forecasts in one statement
+        total_records = copy_forecast_rows(forecast_data)
+        logger.info("Processed %d records", total_records)
 
     except Exception as e:
         logger.error(f"Error during bulk import: {e}")
+        # A file with missing rows must not count towards its cycle's completeness
+        raise
 
-def process_grib_message(grib, valid_datetime, utc_cycle_time, places):
-    forecast_data = []
-    data = grib.values
-    lats, lons = grib.latlons()
-
-    param_name = f"{grib.shortName.lower()}_level_{grib.level}_{grib.typeOfLevel}"
-
-    # Flatten lats and lons to 1D arrays
-    latitudes = lats.flatten()
-    longitudes = lons.flatten()
-
-    # Create a KDTree for efficient nearest neighbor search
-    grid_points = np.column_stack((latitudes, longitudes))
-    grid_tree = cKDTree(grid_points)
-
-    # Prepare arrays of place coordinates
-    place_coords = []
-    place_list = []
-    for place in places:
-        place_coords.append((place.location.y, place.location.x))  # (latitude, longitude)
-        place_list.append(place)
-
-    place_coords = np.array(place_coords)
+def grib_param_name(grib):
+    return f"{grib.shortName.lower()}_level_{grib.level}_{grib.typeOfLevel}"
 
-    # Query the KDTree to find nearest grid point for each place
-    distances, indices = grid_tree.query(place_coords, k=1)
+def process_grib_message(grib, valid_datetime, utc_cycle_time, grid_index, cycle_id):
+    forecast_data = []
 
-    # Extract the data values at those indices
-    data_flat = data.flatten()
-    for i, index in enumerate(indices):
-        value = data_flat[index]
-        if isinstance(value, np.ma.core.MaskedConstant):
-            value = None
-        else:
-            value = float(value)
+    param_name = grib_param_name(grib)
 
+    # Extract the data values at the cached nearest grid point of each place
+    values = grid_index.values(grib)
+    for i, value in enumerate(values):
         forecast_entry = {
-            'place': place_list[i],
-            'latitude': place_coords[i][0],
-            'longitude': place_coords[i][1],
-            'forecast_data': {param_name: value},
+            'cycle_id': cycle_id,
+            'place_id': int(grid_index.place_ids[i]),
+            'latitude': float(grid_index.latitudes[i]),
+            'longitude': float(grid_index.longitudes[i]),
+            'forecast_data': {param_name: None if np.isnan(value) else float(value)},
             'date': valid_datetime.date(),
             'hour': valid_datetime.hour,
             'utc_cycle_time': utc_cycle_time,
@@ -183,56 +116,449 @@ def process_grib_message(grib, valid_datetime, utc_cycle_time, places):
     # Bulk insert or update the forecast data
     bulk_import_forecast_data(forecast_data)
 
-def parse_and_import_gfs_data(file_path):
+def read_grib_matrix(file_path, grid_cache):
+    """
+    Reads every message of a GRIB file into a places x parameters matrix.
+
+    Args:
+        file_path (str): Path to the filtered GRIB2 file.
+        grid_cache (GridIndexCache): Cache providing the place-to-gridpoint index.
+
+    Returns:
+        tuple: (grid_index, param_names, matrix), or (None, [], None) if there are no places.
+    """
+    grid_index = None
+    param_names = []
+    columns = []
+
+    with pygrib.open(file_path) as gribs:
+        total_messages = gribs.messages
+        logger.info("Total number of messages in the GRIB file: %d", total_messages)
+
+        for i, grib in enumerate(gribs, start=1):
+            logger.info(
+                "Reading message %d of %d. Parameter: %s, Level: %d, Type of Level: %s",
+                i, total_messages, grib.parameterName, grib.level, grib.typeOfLevel
+            )
+            message_index = grid_cache.get(grib)
+            if message_index is None:
+                return None, [], None
+            if grid_index is None:
+                grid_index = message_index
+
+            param_names.append(grib_param_name(grib))
+            columns.append(message_index.values(grib))
+
+    if grid_index is None:
+        return None, [], None
+
+    return grid_index, param_names, np.column_stack(columns)
+
+def import_forecast_matrix(grid_index, param_names, matrix, valid_datetime, utc_cycle_time, cycle_id):
+    """
+    Writes one forecast row per place holding every parameter of the matrix.
+
+    Args:
+        grid_index (GridIndex): Index providing place ids and coordinates for the matrix rows.
+        param_names (list): Forecast data keys for the matrix columns.
+        matrix (numpy.ndarray): places x parameters values, NaN where missing.
+        valid_datetime (datetime): Valid time of the forecast.
+        utc_cycle_time (str): Cycle hour, e.g. '00'.
+        cycle_id (int): ForecastCycle the rows belong to.
+    """
+    date = valid_datetime.date()
+    hour = valid_datetime.hour
+
+    for start in range(0, len(grid_index), IMPORT_BATCH_SIZE):
+        end = start + IMPORT_BATCH_SIZE
+        forecast_data = []
+        for place_id, latitude, longitude, row in zip(
+            grid_index.place_ids[start:end].tolist(),
+            grid_index.latitudes[start:end].tolist(),
+            grid_index.longitudes[start:end].tolist(),
+            matrix[start:end].tolist(),
+        ):
+            forecast_data.append({
+                'cycle_id': cycle_id,
+                'place_id': place_id,
+                'latitude': latitude,
+                'longitude': longitude,
+                # NaN marks masked grid values
+                'forecast_data': {
+                    name: None if value != value else value
+                    for name, value in zip(param_names, row)
+                },
+                'date': date,
+                'hour': hour,
+                'utc_cycle_time': utc_cycle_time,
+            })
+
+        bulk_import_forecast_data(forecast_data)
+
+def import_gfs_file_into_cube(file_path, cube, forecast_hour):
+    """
+    Writes every message of a GRIB file into the forecast cube of its cycle.
+
+    Args:
+        file_path (str): Path to the filtered GRIB2 file.
+        cube (ForecastCube): Cube of the file's cycle, opened for writing.
+        forecast_hour (int): Forecast hour of the file.
+    """
+    with pygrib.open(file_path) as gribs:
+        for grib in gribs:
+            param_name = grib_param_name(grib)
+            if not cube.has_parameter(param_name):
+                logger.warning("Parameter %s is not part of cube %s, skipping.", param_name, cube.directory)
+                continue
+            values = np.ma.filled(np.ma.asarray(grib.values, dtype=np.float32), np.nan)
+            cube.write_field(param_name, forecast_hour, cube.domain.crop(values))
+    cube.flush()
+    cube.mark_hour_written(forecast_hour)
+    logger.info("Stored forecast hour %d in cube %s", forecast_hour, cube.directory)
+
+def open_forecast_cubes(file_paths, forecast_hours=()):
+    """
+    Opens or allocates the forecast cube of every cycle found in a list of files.
+
+    An existing cube is reused when it already covers the cycle's forecast hours
+    and the files' parameters; otherwise a new one is created over the places'
+    bounding box.
+
+    Args:
+        file_paths (list): Filtered GRIB2 files to import.
+        forecast_hours (list): Forecast hours published for a cycle, as downloaded
+            (see build_forecast_hours), so that a cube spans its whole cycle even
+            when only some of its files are imported.
+
+    Returns:
+        dict: ForecastCube per cycle datetime.
+    """
+    cycles = {}
+    for file_path in file_paths:
+        cycle_datetime, forecast_hour = extract_cycle_details_from_filename(file_path)
+        if cycle_datetime is not None:
+            cycles.setdefault(cycle_datetime, []).append((forecast_hour, file_path))
+
+    bounding_box = places_bounding_box() if cycles else None
+    if cycles and bounding_box is None:
+        logger.error("No places found in the database.")
+        return {}
+
+    cubes = {}
+    for cycle_datetime, hour_files in cycles.items():
+        # Parameters differ between forecast hours (e.g. accumulations are missing at f000)
+        parameters = []
+        definition = None
+        for _, file_path in hour_files:
+            try:
+                with pygrib.open(file_path) as gribs:
+                    for grib in gribs:
+                        definition = definition or grid_definition(grib)
+                        param_name = grib_param_name(grib)
+                        if param_name not in parameters:
+                            parameters.append(param_name)
+            except Exception as e:
+                logger.error("Error reading GRIB file %s: %s", file_path, e)
+        if definition is None:
+            continue
+
+        cycle_hours = sorted(set(forecast_hours) | {forecast_hour for forecast_hour, _ in hour_files})
+        cycle_directory = os.path.join(FORECAST_STORE_DIRECTORY, cycle_directory_name(cycle_datetime))
+        try:
+            cube = ForecastCube.open(cycle_directory, mode='r+')
+            if not (set(cycle_hours) <= set(cube.forecast_hours) and set(parameters) <= set(cube.parameters)):
+                cube = None
+        except Exception:
+            cube = None
+
+        if cube is None:
+            domain = GridDomain.around(definition, *bounding_box)
+            cube = ForecastCube.create(cycle_datetime, cycle_hours, parameters, domain)
+        elif cube.complete:
+            # Readers must not use a cube while some of its hours are rewritten
+            cube.mark_incomplete()
+        cubes[cycle_datetime] = cube
+
+    return cubes
+
+def publish_forecast_cubes(cubes):
+    """
+    Marks the cube of every cycle whose forecast hours have all been written, in this
+    run or an earlier one, as complete and makes its ForecastCycle the current one,
+    so that cached responses and ETags change with it.
+
+    Args:
+        cubes (dict): Forecast cubes per cycle datetime, as returned by open_forecast_cubes.
+    """
+    for cycle_datetime, cube in cubes.items():
+        missing_hours = set(cube.forecast_hours) - set(cube.written_hours())
+        if missing_hours:
+            logger.info(
+                "Forecast cube %s still lacks forecast hours %s, leaving it unpublished.",
+                cube.directory, sorted(missing_hours)
+            )
+            continue
+
+        # Readers only pick up cubes whose every forecast hour has been written
+        cube.mark_complete()
+        cycle = ForecastCycle.objects.register(cycle_datetime, len(cube.forecast_hours))
+        ForecastCycle.objects.filter(pk=cycle.pk).update(
+            imported_hours=cube.forecast_hours, imported_files=len(cube.forecast_hours)
+        )
+        cycle.activate()
+        logger.info("Published forecast cube %s as %s", cube.directory, cycle)
+
+def parse_and_import_gfs_data(file_path, grid_cache=None, per_message=False, cubes=None, publish=True):
+    """
+    Imports one filtered GRIB file into the forecast cube of its cycle, or into
+    GFSForecast rows and records its forecast hour on the cycle.
+
+    Args:
+        file_path (str): Path to the filtered GRIB2 file.
+        grid_cache (GridIndexCache): Cache holding the place-to-gridpoint index.
+        per_message (bool): Write each GRIB message separately.
+        cubes (dict): Forecast cubes per cycle when importing into the forecast store.
+        publish (bool): Publish the cycle when this file completes it; callers that
+            publish cycles themselves pass False.
+
+    Returns:
+        bool: True if the file was imported (and deleted), False if it was kept for a retry.
+    """
     logger.info("Starting to parse GFS data from %s.", file_path)
 
+    if cubes is not None:
+        cycle_datetime, forecast_hour = extract_cycle_details_from_filename(file_path)
+        cube = cubes.get(cycle_datetime)
+        if cube is None:
+            logger.error("No forecast cube available for file: %s", file_path)
+            return False
+        try:
+            import_gfs_file_into_cube(file_path, cube, forecast_hour)
+        except Exception as e:
+            logger.error("Error processing GRIB file %s: %s", file_path, e)
+            return False
+        os.remove(file_path)
+        logger.info("Deleted GRIB file: %s", file_path)
+        return True
+
     valid_datetime, utc_cycle_time = extract_forecast_details_from_filename(file_path)
     if valid_datetime is None or utc_cycle_time is None:
         logger.error("Could not extract datetime details from filename: %s", file_path)
-        return
+        return False
 
-    try:
-        # Retrieve all places from the database
-        places = list(GeographicPlace.objects.all())
-        if not places:
-            logger.error("No places found in the database.")
-            return
+    if grid_cache is None:
+        grid_cache = GridIndexCache()
 
-        with pygrib.open(file_path) as gribs:
-            total_messages = gribs.messages
-            logger.info("Total number of messages in the GRIB file: %d", total_messages)
+    cycle_datetime, forecast_hour = extract_cycle_details_from_filename(file_path)
+    cycle = ForecastCycle.objects.register(cycle_datetime)
+    ensure_cycle_partition(cycle)
+
+    logger.info("Valid datetime is %s (UTC)", valid_datetime.isoformat())
 
-            for i, grib in enumerate(gribs, start=1):
-                logger.info(
-                    "Processing message %d of %d. Parameter: %s, Level: %d, Type of Level: %s",
-                    i, total_messages, grib.parameterName, grib.level, grib.typeOfLevel
-                )
-                logger.info("Valid datetime is %s (UTC)", valid_datetime.isoformat())
+    imported = False
+    try:
+        if per_message:
+            with pygrib.open(file_path) as gribs:
+                total_messages = gribs.messages
+                logger.info("Total number of messages in the GRIB file: %d", total_messages)
+
+                for i, grib in enumerate(gribs, start=1):
+                    logger.info(
+                        "Processing message %d of %d. Parameter: %s, Level: %d, Type of Level: %s",
+                        i, total_messages, grib.parameterName, grib.level, grib.typeOfLevel
+                    )
+
+                    # The place-to-gridpoint index is shared by every message on the same grid
+                    grid_index = grid_cache.get(grib)
+                    if grid_index is None:
+                        return False
+
+                    process_grib_message(grib, valid_datetime, utc_cycle_time, grid_index, cycle.pk)
+        else:
+            # Pivot all messages first so that each forecast row is written exactly once
+            grid_index, param_names, matrix = read_grib_matrix(file_path, grid_cache)
+            if grid_index is None:
+                return False
 
-                process_grib_message(grib, valid_datetime, utc_cycle_time, places)
+            logger.info("Importing %d parameters for %d places.", len(param_names), len(grid_index))
+            import_forecast_matrix(grid_index, param_names, matrix, valid_datetime, utc_cycle_time, cycle.pk)
 
+        imported = True
     except Exception as e:
         logger.error("Error processing GRIB file %s: %s", file_path, e)
 
     logger.info("Finished parsing GFS data from %s.", file_path)
 
-    if os.path.exists(file_path):
-        os.remove(file_path)
-        logger.info("Deleted GRIB file: %s", file_path)
+    if not imported:
+        # Kept on disk so that the next import run retries it
+        logger.warning("Keeping GRIB file for a retry: %s", file_path)
+        return False
+
+    # Readers switch to the cycle once every expected forecast hour is in and its payloads are rendered
+    if cycle.record_imported_file(forecast_hour) and publish:
+        publish_forecast_cycle(cycle)
+
+    os.remove(file_path)
+    logger.info("Deleted GRIB file: %s", file_path)
+    return True
+
+def prime_grid_cache(grid_cache, file_path):
+    """
+    Builds or loads the grid index for the grid used by a GRIB file.
+
+    Args:
+        grid_cache (GridIndexCache): Cache to populate.
+        file_path (str): Any GRIB file on the grid to index.
+
+    Returns:
+        bool: True if an index is available.
+    """
+    try:
+        with pygrib.open(file_path) as gribs:
+            for grib in gribs:
+                return grid_cache.get(grib) is not None
+    except Exception as e:
+        logger.error("Error reading grid from GRIB file %s: %s", file_path, e)
+    return False
+
+# Grid index cache and forecast cubes handed to forked import workers
+_worker_grid_cache = None
+_worker_cubes = None
+
+def init_import_worker(grid_cache, cubes):
+    global _worker_grid_cache, _worker_cubes
+    _worker_grid_cache = grid_cache
+    _worker_cubes = cubes
+
+def import_file_worker(file_path, per_message):
+    # Each worker lazily opens its own connection and keeps it for all of its files
+    return parse_and_import_gfs_data(file_path, _worker_grid_cache, per_message, _worker_cubes)
+
+def import_files_in_parallel(file_paths, grid_cache, per_message, workers, cubes=None):
+    """
+    Imports GRIB files concurrently in forked worker processes.
+
+    The grid index is built once in the parent and shared with the workers
+    through fork, so no worker queries the place table.
+
+    Args:
+        file_paths (list): Filtered GRIB2 files to import.
+        grid_cache (GridIndexCache): Cache holding the place-to-gridpoint index.
+        per_message (bool): Write each GRIB message separately.
+        workers (int): Number of worker processes.
+        cubes (dict): Forecast cubes per cycle when importing into the forecast store.
+
+    Returns:
+        list: The files that were imported.
+    """
+    if cubes is None and not prime_grid_cache(grid_cache, file_paths[0]):
+        logger.error("Could not build the grid index. Aborting import.")
+        return []
+
+    # Forked children must not share the parent's database socket
+    connections.close_all()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('fork'),
+        initializer=init_import_worker,
+        initargs=(grid_cache, cubes),
+    ) as executor:
+        futures = {
+            executor.submit(import_file_worker, file_path, per_message): file_path
+            for file_path in file_paths
+        }
+        imported = []
+        for future in as_completed(futures):
+            try:
+                if future.result():
+                    logger.info("Imported GRIB file: %s", futures[future])
+                    imported.append(futures[future])
+            except Exception as e:
+                logger.error("Error processing file %s: %s", futures[future], e)
+        return imported
+
+def register_forecast_cycles(file_paths, forecast_hours=None):
+    """
+    Registers the cycle of every file and creates its forecast partition before
+    any rows are written.
+
+    Args:
+        file_paths (list): Filtered GRIB2 files about to be imported.
+        forecast_hours (list): Forecast hours published for a cycle, as downloaded
+            (see build_forecast_hours). A cycle becomes the current one once each
+            of them is imported, whichever files are found now; None leaves the
+            expected hours unknown, so the files do not publish their cycle.
+    """
+    hours_per_cycle = {}
+    for file_path in file_paths:
+        cycle_datetime, forecast_hour = extract_cycle_details_from_filename(file_path)
+        if cycle_datetime is not None:
+            hours_per_cycle.setdefault(cycle_datetime, set()).add(forecast_hour)
+
+    for cycle_datetime, file_hours in hours_per_cycle.items():
+        cycle = ForecastCycle.objects.register(cycle_datetime, len(forecast_hours) if forecast_hours else 0)
+        ensure_cycle_partition(cycle)
+        missing_hours = set(forecast_hours or []) - set(cycle.imported_hours) - file_hours
+        if missing_hours:
+            logger.warning(
+                "No files for forecast hours %s of %s, it stays unpublished until they are imported.",
+                sorted(missing_hours), cycle
+            )
 
 class Command(BaseCommand):
     help = 'Import GFS data into the database'
 
     def add_arguments(self, parser):
         parser.add_argument('--file', type=str, help='Path to the filtered GRIB2 file')
+        parser.add_argument(
+            '--per_message',
+            action='store_true',
+            help='Write each GRIB message separately instead of one row per place and hour'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of files to import in parallel worker processes (default: 1)'
+        )
+        parser.add_argument(
+            '--backend',
+            choices=['database', 'cube'],
+            default='database',
+            help='Store forecasts as GFSForecast rows or as a gridded forecast cube (default: database)'
+        )
+        parser.add_argument(
+            '--max_hours',
+            type=int,
+            default=385,
+            help='Maximum forecast hour downloaded per cycle; a cycle is published once all of its '
+                 'forecast hours are imported (default: 385)'
+        )
+        parser.add_argument(
+            '--interpolation',
+            choices=['bilinear', 'nearest'],
+            default=DEFAULT_INTERPOLATION,
+            help=f'How grid values are interpolated onto places (default: {DEFAULT_INTERPOLATION})'
+        )
 
     def handle(self, *args, **options):
         logger.info("Starting the GFS data import process.")
 
         file_path = options['file']
+        per_message = options['per_message']
+        workers = max(1, options['workers'])
+        backend = options['backend']
+        grid_cache = GridIndexCache(method=options['interpolation'])
+        forecast_hours = build_forecast_hours(options['max_hours'])
         if file_path:
             logger.info(f"File path provided: {file_path}")
-            parse_and_import_gfs_data(file_path)
+            cubes = open_forecast_cubes([file_path], forecast_hours) if backend == 'cube' else None
+            if backend == 'database':
+                register_forecast_cycles([file_path])
+            if parse_and_import_gfs_data(file_path, grid_cache, per_message, cubes) and cubes:
+                # Publishes the cube once this file was its last missing forecast hour
+                publish_forecast_cubes(cubes)
         else:
             filtered_directory = 'data/filtered_data'
             logger.info(f"Looking for files in: {filtered_directory}")
@@ -240,18 +566,33 @@ class Command(BaseCommand):
                 logger.error(f"Filtered directory not found: {filtered_directory}")
                 return
 
-            total_files = 0
+            file_paths = []
             for root, dirs, files in os.walk(filtered_directory):
                 for file in files:
                     if file.endswith('.grib2'):
-                        total_files += 1
                         file_path = os.path.join(root, file)
                         logger.info(f"Found GRIB file: {file_path}")
-                        try:
-                            parse_and_import_gfs_data(file_path)
-                        except Exception as e:
-                            logger.error("Error processing file %s: %s", file_path, e)
+                        file_paths.append(file_path)
+
+            cubes = open_forecast_cubes(file_paths, forecast_hours) if backend == 'cube' else None
+            if backend == 'database':
+                register_forecast_cycles(file_paths, forecast_hours)
 
-            logger.info(f"Total GRIB files processed: {total_files}")
+            if workers > 1 and len(file_paths) > 1:
+                logger.info("Importing %d files with %d workers.", len(file_paths), workers)
+                imported_paths = import_files_in_parallel(sorted(file_paths), grid_cache, per_message, workers, cubes)
+            else:
+                imported_paths = []
+                for file_path in sorted(file_paths):
+                    try:
+                        if parse_and_import_gfs_data(file_path, grid_cache, per_message, cubes):
+                            imported_paths.append(file_path)
+                    except Exception as e:
+                        logger.error("Error processing file %s: %s", file_path, e)
+
+            if cubes:
+                publish_forecast_cubes(cubes)
+
+            logger.info(f"Total GRIB files processed: {len(file_paths)}, imported: {len(imported_paths)}")
 
         logger.info("GFS data import process completed for all files.")
@@ -0,0 +1,22 @@
+import logging
+from django.core.management.base import BaseCommand
+from weather.models import ForecastCycle
+from api.utils.weather_payloads import render_cycle_payloads, render_pending_payloads
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+class Command(BaseCommand):
+    help = 'Render the stored weather payloads of the current forecast cycle if they are missing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Render again even if the payloads are stored')
+
+    def handle(self, *args, **options):
+        if options['force']:
+            cycle = ForecastCycle.objects.current()
+            rendered = render_cycle_payloads(cycle) if cycle is not None else 0
+        else:
+            rendered = render_pending_payloads()
+        logger.info("Rendered %d forecast payloads.", rendered)
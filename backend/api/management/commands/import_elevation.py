@@ -9,6 +9,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.conf import settings
 from geography.models import GeographicPlace
+from geography.place_cache import invalidate_place_records
 
 # Configuration Constants
 ELEVATION_API_URL = "https://api.open-elevation.com/api/v1/lookup"
@@ -159,6 +160,9 @@ class Command(BaseCommand):
                     failed_updates += result.get('failed', 0)
                     pbar.update(result.get('success', 0) + result.get('failed', 0))
 
+        # bulk_update bypasses the signals that keep the place records current
+        invalidate_place_records()
+
         end_time = time.time()
         logger.info(f'Elevation update completed. Successfully updated {successful_updates} places.')
         self.stdout.write(
@@ -1,26 +1,77 @@
+import io
 import time
-from multiprocessing import Pool
-from django.core.management.base import BaseCommand
-from django.contrib.gis.geos import Point
-from geography.models import GeographicPlace, GeographicCategory, GeographicDivision
+from multiprocessing import Pool, cpu_count
+import numpy as np
+import shapely
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from geography.models import GeographicPlace, GeographicCategory, GeographicData, GeographicDivision
+from geography.place_cache import invalidate_place_records
+from geography.place_index import invalidate_place_index
 from unidecode import unidecode
 from django.utils.text import slugify
 
+# Bounding box for Greece
+MIN_LAT, MAX_LAT = 34.802066, 41.748878
+MIN_LNG, MAX_LNG = 19.316406, 28.256348
+
+DEFAULT_INTERVAL = 0.001  # Approximately 100 meters
+
+# Latitude rows streamed by one COPY
+ROWS_PER_BAND = 100
+
+PLACE_COLUMNS = (
+    'slug', 'longitude', 'latitude', 'elevation', 'confirmed', 'category_id', 'admin_division_id', 'location',
+)
+
+# Land geometry of the worker process, set by _init_worker
+_land = None
+
 
 class Command(BaseCommand):
-    help = 'Import geographic places for Greece at every 10 meters interval'
+    help = 'Import geographic places for Greece on a regular lattice, skipping points at sea'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help='Lattice spacing in degrees')
+        parser.add_argument('--workers', type=int, default=cpu_count(), help='Parallel COPY streams')
+        parser.add_argument(
+            '--no_land_mask',
+            action='store_true',
+            help='Keep points at sea (also used when no GeographicData is loaded)'
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Delete all existing places, and everything referencing them, before importing'
+        )
+        parser.add_argument(
+            '--noinput', '--no-input',
+            action='store_false',
+            dest='interactive',
+            help='Do not ask for confirmation before --truncate'
+        )
 
     def handle(self, *args, **options):
         start_time = time.time()
-
-        # Zero the counters by clearing the table
-        GeographicPlace.objects.all().delete()
-        self.stdout.write(self.style.SUCCESS('Cleared all existing geographic places.'))
-
-        # Define the bounding box for Greece
-        min_lat, max_lat = 34.802066, 41.748878
-        min_lng, max_lng = 19.316406, 28.256348
-        interval = 0.001  # Approximately 100 meters
+        interval = options['interval']
+
+        if GeographicPlace.objects.exists():
+            if not options['truncate']:
+                raise CommandError('Geographic places already exist; pass --truncate to replace them.')
+            if options['interactive']:
+                answer = input(
+                    'This deletes all geographic places and everything referencing them '
+                    '(forecasts, payloads, ...). Type "yes" to continue: '
+                )
+                if answer != 'yes':
+                    self.stdout.write('Import cancelled.')
+                    return
+
+            # Zero the counters by clearing the table (and, as before, everything referencing places)
+            with connection.cursor() as cursor:
+                cursor.execute(f"TRUNCATE {GeographicPlace._meta.db_table} CASCADE")
+            self.stdout.write(self.style.SUCCESS('Cleared all existing geographic places.'))
 
         # Default category
         default_category, created = GeographicCategory.objects.get_or_create(
@@ -34,59 +85,115 @@ class Command(BaseCommand):
             defaults={'name': 'Default', 'level_name': 'Division'}
         )
 
-        lat_steps = list(frange(min_lat, max_lat, interval))
-        lng_steps = list(frange(min_lng, max_lng, interval))
-        total_steps = len(lat_steps) * len(lng_steps)
+        latitudes = lattice_axis(MIN_LAT, MAX_LAT, interval)
+        longitudes = lattice_axis(MIN_LNG, MAX_LNG, interval)
+        self.stdout.write(f'Total lat steps: {len(latitudes)}, Total lng steps: {len(longitudes)}')
+        self.stdout.write(f'Lattice points before land masking: {len(latitudes) * len(longitudes)}')
+
+        land_wkb = None
+        if not options['no_land_mask']:
+            land_wkb = load_land_wkb()
+            if land_wkb is None:
+                self.stdout.write(self.style.WARNING('No GeographicData loaded, importing points at sea too.'))
+
+        bands = [
+            (latitudes[i:i + ROWS_PER_BAND], longitudes, default_category.id, default_division.id)
+            for i in range(0, len(latitudes), ROWS_PER_BAND)
+        ]
 
-        self.stdout.write(f'Total lat steps: {len(lat_steps)}, Total lng steps: {len(lng_steps)}')
-        self.stdout.write(f'Total places to insert: {total_steps}')
+        # Forked workers must open their own database connections
+        connections.close_all()
 
-        # Divide the task into chunks for parallel processing
-        chunk_size = 100000  # Adjust based on memory and performance
-        lat_chunks = [lat_steps[i:i + chunk_size] for i in range(0, len(lat_steps), chunk_size)]
+        inserted = 0
+        with Pool(processes=options['workers'], initializer=_init_worker, initargs=(land_wkb,)) as pool:
+            for count in pool.imap_unordered(copy_lattice_band, bands):
+                inserted += count
+                self.stdout.write(f'Inserted {inserted} places', ending='\r')
 
-        with Pool() as pool:
-            results = pool.starmap(process_chunk,
-                                   [(chunk, lng_steps, default_category, default_division) for chunk in lat_chunks])
+        # COPY bypasses the signals that keep the place index and records current
+        invalidate_place_index()
+        invalidate_place_records()
 
         end_time = time.time()
         self.stdout.write(
-            self.style.SUCCESS(f'Completed importing geographic places in {end_time - start_time:.2f} seconds.'))
-
-
-def process_chunk(lat_chunk, lng_steps, default_category, default_division):
-    from geography.models import GeographicPlace  # Import inside the function for multiprocessing
-    from django.db import transaction
-
-    places = []
-    for lat in lat_chunk:
-        for lng in lng_steps:
-            # Round latitude and longitude to six decimal places
-            lat_rounded = round(lat, 6)
-            lng_rounded = round(lng, 6)
-            # Generate a unique slug based on coordinates
-            slug = slugify(f"{lat_rounded}-{lng_rounded}")
-
-            place = GeographicPlace(
-                longitude=lng_rounded,
-                latitude=lat_rounded,
-                category=default_category,
-                admin_division=default_division,
-                slug=slug
-            )
-            places.append(place)
-
-            if len(places) >= 10000:  # Batch insert every 10,000 places
-                with transaction.atomic():
-                    GeographicPlace.objects.bulk_create(places, ignore_conflicts=True)
-                places = []
-
-    if places:
-        with transaction.atomic():
-            GeographicPlace.objects.bulk_create(places, ignore_conflicts=True)
-
-
-def frange(start, stop, step):
-    while start < stop:
-        yield round(start, 6)  # Ensure step values are rounded to six decimal places
-        start += step
+            self.style.SUCCESS(f'Imported {inserted} geographic places in {end_time - start_time:.2f} seconds.'))
+
+
+def lattice_axis(start, stop, step):
+    """
+    Returns the lattice coordinates start, start + step, ... below stop,
+    rounded to six decimal places like GeographicPlace.clean does.
+    """
+    count = int(np.ceil(round((stop - start) / step, 9)))
+    return np.round(start + np.arange(count) * step, 6)
+
+
+def load_land_wkb():
+    """
+    Returns the union of all GeographicData geometries as WKB, computed by PostGIS,
+    or None if there are none.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT ST_AsBinary(ST_Union(geometry)) FROM {GeographicData._meta.db_table}")
+        land_wkb = cursor.fetchone()[0]
+    return bytes(land_wkb) if land_wkb is not None else None
+
+
+def _init_worker(land_wkb):
+    global _land
+    if land_wkb is not None:
+        _land = shapely.from_wkb(land_wkb)
+        shapely.prepare(_land)
+
+
+def _lattice_rows(latitudes, longitudes, category_id, division_id):
+    # The text of each longitude is shared by all rows
+    longitude_texts = [repr(longitude) for longitude in longitudes.tolist()]
+    longitude_slugs = [text.replace('.', '') for text in longitude_texts]
+    tail = f"\t\\N\tf\t{category_id}\t{division_id}\tSRID=4326;POINT("
+
+    for latitude in latitudes.tolist():
+        latitude_text = repr(latitude)
+        latitude_slug = latitude_text.replace('.', '')
+
+        if _land is not None:
+            on_land = np.flatnonzero(shapely.intersects_xy(_land, longitudes, latitude))
+        else:
+            on_land = range(len(longitudes))
+
+        yield ''.join(
+            f"{latitude_slug}-{longitude_slugs[i]}\t{longitude_texts[i]}\t{latitude_text}"
+            f"{tail}{longitude_texts[i]} {latitude_text})\n"
+            for i in on_land
+        ), len(on_land)
+
+
+def copy_lattice_band(band):
+    """
+    Streams the land points of some lattice rows into GeographicPlace with one COPY.
+
+    Args:
+        band (tuple): (latitudes, longitudes, category id, division id).
+
+    Returns:
+        int: Number of places inserted.
+    """
+    latitudes, longitudes, category_id, division_id = band
+    table = GeographicPlace._meta.db_table
+    columns = ', '.join(PLACE_COLUMNS)
+
+    inserted = 0
+    with connection.cursor() as cursor:
+        if is_psycopg3:
+            with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for text, count in _lattice_rows(latitudes, longitudes, category_id, division_id):
+                    copy.write(text)
+                    inserted += count
+        else:
+            buffer = io.StringIO()
+            for text, count in _lattice_rows(latitudes, longitudes, category_id, division_id):
+                buffer.write(text)
+                inserted += count
+            buffer.seek(0)
+            cursor.cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", buffer)
+    return inserted
@@ -1,21 +1,238 @@
 import logging
-from django.core.management.base import BaseCommand
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
+from django.db import connections
+from api.management.commands.gfs_data_download import (
+    build_forecast_hours,
+    create_session,
+    download_gfs_file,
+    find_latest_complete_cycle,
+)
+from api.management.commands.gfs_data_filtered import enabled_parameter_keys, filter_gfs_file
+from api.management.commands.gfs_data_import import parse_and_import_gfs_data
+from api.utils.weather_payloads import publish_forecast_cycle, render_cycle_payloads
+from weather.models import ForecastCycle
+from weather_engine.forecast_partitions import ensure_cycle_partition
+from weather_engine.gfs_inventory import enabled_idx_keys
+from weather_engine.grid_index import GridIndexCache
 
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://nomads.ncep.noaa.gov/pub/data/nccf/com/gfs/prod"
+DATA_DIRECTORY = "data"
+FILTERED_DIRECTORY = os.path.join(DATA_DIRECTORY, "filtered_data")
+
+# Forecast hours that must all be imported before a streamed cycle is published, so that
+# the first day is served minutes after it is out; later hours are served as they land
+DEFAULT_PUBLISH_HOURS = 24
+
+def run_stage(name, workers, source, sink, handler, failures):
+    """
+    Starts worker threads that take items from source, process them and pass results on to sink.
+
+    A None item stops one worker. Each worker closes its own database connection when it stops.
+    Items whose handler raised are appended to failures as (stage name, item, error).
+
+    Returns:
+        list: The started threads.
+    """
+    def work():
+        try:
+            while True:
+                item = source.get()
+                if item is None:
+                    break
+                try:
+                    result = handler(item)
+                except Exception as e:
+                    logger.error("%s stage failed for %s: %s", name, item, e)
+                    failures.append((name, item, e))
+                    continue
+                if result is not None and sink is not None:
+                    sink.put(result)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=work, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def stop_stage(threads, source):
+    for _ in threads:
+        source.put(None)
+    for thread in threads:
+        thread.join()
+
+def run_streaming_pipeline(max_hours, max_cycles, download_workers, filter_workers, import_workers,
+                           queue_size, poll_interval, max_wait, publish_hours=DEFAULT_PUBLISH_HOURS):
+    """
+    Runs download -> filter -> import per forecast hour as soon as each file is published.
+
+    Stages are connected by bounded queues so a slow stage applies back pressure
+    instead of letting downloaded files pile up on disk. The cycle becomes the
+    current one as soon as every forecast hour up to publish_hours is imported;
+    later hours are readable as they land, each one bumping the cycle revision
+    that cached responses are keyed by, and the payloads are rendered again once
+    the last one is in.
+
+    Raises:
+        CommandError: If any forecast hour could not be downloaded, filtered or imported.
+    """
+    # Any cycle whose f000 is published can be streamed; later hours are polled for
+    date, hour = find_latest_complete_cycle(BASE_URL, [0], max_cycles)
+    if date is None or hour is None:
+        logger.error("No published cycles found. Exiting.")
+        return
+
+    folder_name = f"{date}_{hour}"
+    save_directory = os.path.join(DATA_DIRECTORY, folder_name)
+    os.makedirs(save_directory, exist_ok=True)
+    logger.info("Streaming cycle: Date=%s, Hour=%s", date, hour)
+
+    idx_keys = enabled_idx_keys()
+    relevant_parameters = enabled_parameter_keys()
+    # idx_keys is None when some enabled parameter needs the full files
+    if idx_keys == set() or not relevant_parameters:
+        logger.error("No enabled parameters found. Exiting.")
+        return
+
+    all_hours = build_forecast_hours(max_hours)
+    publish_after = {forecast_hour for forecast_hour in all_hours if forecast_hour <= publish_hours}
+
+    cycle_datetime = datetime.strptime(f"{date}{hour}", '%Y%m%d%H').replace(tzinfo=timezone.utc)
+    cycle = ForecastCycle.objects.register(cycle_datetime, len(all_hours))
+    ensure_cycle_partition(cycle)
+    # Number of imported hours when the payloads were last rendered, None until published
+    rendered_hours = cycle.imported_files if cycle.status == ForecastCycle.STATUS_CURRENT else None
+    publish_lock = threading.Lock()
+
+    session = create_session(download_workers)
+    grid_cache = GridIndexCache()
+
+    def download(forecast_hour):
+        deadline = time.monotonic() + max_wait
+        while True:
+            path = download_gfs_file(session, BASE_URL, date, hour, forecast_hour, save_directory, idx_keys)
+            if path is not None:
+                return path
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"gave up waiting for forecast hour {forecast_hour:03d} of cycle {folder_name}")
+            time.sleep(poll_interval)
+
+    def filter_file(path):
+        filtered_path = filter_gfs_file(path, folder_name, relevant_parameters, FILTERED_DIRECTORY)
+        if filtered_path is None:
+            raise RuntimeError("no enabled parameters could be filtered")
+        return filtered_path
+
+    def import_file(path):
+        nonlocal rendered_hours
+        if not parse_and_import_gfs_data(path, grid_cache, publish=False):
+            raise RuntimeError("import failed, file kept for a retry")
+
+        with publish_lock:
+            if rendered_hours is not None:
+                return
+            current = ForecastCycle.objects.get(pk=cycle.pk)
+            if publish_after <= set(current.imported_hours):
+                logger.info("Forecast hours up to %d are imported, publishing %s.", publish_hours, current)
+                publish_forecast_cycle(current)
+                rendered_hours = current.imported_files
+
+    forecast_hours = queue.Queue()
+    downloaded = queue.Queue(maxsize=queue_size)
+    filtered = queue.Queue(maxsize=queue_size)
+    for forecast_hour in all_hours:
+        forecast_hours.put(forecast_hour)
+
+    failures = []
+    import_threads = run_stage('import', import_workers, filtered, None, import_file, failures)
+    filter_threads = run_stage('filter', filter_workers, downloaded, filtered, filter_file, failures)
+    download_threads = run_stage('download', download_workers, forecast_hours, downloaded, download, failures)
+
+    stop_stage(download_threads, forecast_hours)
+    stop_stage(filter_threads, downloaded)
+    stop_stage(import_threads, filtered)
+
+    cycle.refresh_from_db()
+    if cycle.status == ForecastCycle.STATUS_CURRENT and rendered_hours is not None and cycle.imported_files > rendered_hours:
+        # Payloads rendered at publication lack the hours imported after it
+        render_cycle_payloads(cycle)
+
+    missing_hours = sorted(set(all_hours) - set(cycle.imported_hours))
+    if failures or missing_hours:
+        raise CommandError(
+            f"Cycle {folder_name} is {'published' if rendered_hours is not None else 'not published'} with "
+            f"{len(missing_hours)} of {len(all_hours)} forecast hours missing ({missing_hours}); "
+            f"failures: {'; '.join(f'{name} {item}: {error}' for name, item, error in failures)}"
+        )
+
 class Command(BaseCommand):
     help = 'Run the GFS data processing pipeline'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--streaming',
+            action='store_true',
+            help='Download, filter and import each forecast hour as soon as it is published'
+        )
+        parser.add_argument('--max_hours', type=int, default=385, help='Maximum forecast hour (default: 385)')
+        parser.add_argument('--max_cycles', type=int, default=10, help='Maximum number of past cycles to check (default: 10)')
+        parser.add_argument('--download_workers', type=int, default=8, help='Concurrent downloads (default: 8)')
+        parser.add_argument('--filter_workers', type=int, default=2, help='Concurrent filter workers (default: 2)')
+        parser.add_argument('--import_workers', type=int, default=2, help='Concurrent import workers (default: 2)')
+        parser.add_argument('--queue_size', type=int, default=8, help='Files buffered between stages (default: 8)')
+        parser.add_argument(
+            '--poll_interval',
+            type=int,
+            default=60,
+            help='Seconds between checks for a forecast hour that is not yet published (default: 60)'
+        )
+        parser.add_argument(
+            '--max_wait',
+            type=int,
+            default=3 * 3600,
+            help='Seconds to wait for a forecast hour to be published (default: 10800)'
+        )
+        parser.add_argument(
+            '--publish_hours',
+            type=int,
+            default=DEFAULT_PUBLISH_HOURS,
+            help='Publish a streamed cycle once every forecast hour up to this one is imported '
+                 f'(default: {DEFAULT_PUBLISH_HOURS})'
+        )
+
     def handle(self, *args, **options):
         logger.info("Starting GFS data processing pipeline.")
 
-        commands = [
-            'gfs_data_download',
-            'gfs_data_filtered',
-            'gfs_data_import',
-            'gfs_data_cleanup',
-        ]
+        if options['streaming']:
+            run_streaming_pipeline(
+                max_hours=options['max_hours'],
+                max_cycles=options['max_cycles'],
+                download_workers=max(1, options['download_workers']),
+                filter_workers=max(1, options['filter_workers']),
+                import_workers=max(1, options['import_workers']),
+                queue_size=max(1, options['queue_size']),
+                poll_interval=options['poll_interval'],
+                max_wait=options['max_wait'],
+                publish_hours=options['publish_hours'],
+            )
+            commands = ['gfs_data_render', 'gfs_data_cleanup', 'build_sun_table']
+        else:
+            commands = [
+                'gfs_data_download',
+                'gfs_data_filtered',
+                'gfs_data_import',
+                'gfs_data_render',
+                'gfs_data_cleanup',
+                'build_sun_table',
+            ]
 
         for command in commands:
             logger.info(f"Running command: {command}")
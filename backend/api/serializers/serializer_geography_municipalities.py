@@ -11,5 +11,9 @@ class MunicipalitySerializer(serializers.ModelSerializer):
         fields = ['name', 'slug']
 
     def get_name(self, obj):
+        # Names resolved in bulk by the view, see geography.translations
+        names = self.context.get('names')
+        if names is not None:
+            return names.get(obj.pk)
         language = self.context.get('language', 'en')
         return obj.safe_translation_getter('name', language_code=language, any_language=True)
@@ -0,0 +1,406 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+from datetime import datetime, time, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import shapely
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone as django_timezone
+from geography.models import GeographicCategory, GeographicDivision, GeographicPlace
+from geography.place_index import PlaceIndex
+from weather.models import ForecastCycle, GFSForecast
+from api.management.commands import import_places
+from api.management.commands.gfs_data_download import (
+    create_session,
+    download_gfs_file,
+    download_signature,
+)
+from api.utils.weather_data import build_weather_summary, get_weather_data_for_place
+from api.utils.weather_payloads import encode_payload, get_weather_payload, render_cycle_payloads
+from api.views import view_weather_batch
+from api.views.view_geography_nearest_place import find_nearest_place, nearest_place
+from api.views.view_weather_batch import parse_bbox, weather_batch
+
+# Three GRIB messages of a fake forecast file and its wgrib2 inventory
+GRIB_MESSAGES = [b'PRMSL' * 10, b'TMP2M' * 20, b'UGRD10' * 30]
+GRIB_FILE = b''.join(GRIB_MESSAGES)
+GRIB_INVENTORY = ''.join(
+    f"{number}:{sum(len(message) for message in GRIB_MESSAGES[:number - 1])}:d=2026101800:{variable}:{level}:anl:\n"
+    for number, (variable, level) in enumerate(
+        [('PRMSL', 'mean sea level'), ('TMP', '2 m above ground'), ('UGRD', '10 m above ground')], start=1
+    )
+)
+FILE_PATH = '/gfs.20261018/00/atmos/gfs.t00z.pgrb2.0p25.f000'
+
+
+class FakeNomadsHandler(BaseHTTPRequestHandler):
+    """
+    Serves the fake file and its .idx like NOMADS, honouring single byte range requests.
+    """
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('Range')))
+        if self.path == FILE_PATH + '.idx' and self.server.inventory:
+            self.send_body(200, GRIB_INVENTORY.encode('ascii'))
+        elif self.path == FILE_PATH:
+            self.send_file()
+        else:
+            self.send_body(404, b'')
+
+    def send_file(self):
+        range_header = self.headers.get('Range')
+        if range_header is None or not self.server.ranges:
+            self.send_body(200, GRIB_FILE)
+            return
+        start, end = range_header.removeprefix('bytes=').split('-')
+        start, end = int(start), int(end) if end else len(GRIB_FILE) - 1
+        if start >= len(GRIB_FILE):
+            self.send_body(416, b'')
+            return
+        self.send_body(206, GRIB_FILE[start:end + 1])
+
+    def send_body(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GFSDownloadTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeNomadsHandler)
+        self.server.requests = []
+        self.server.inventory = True
+        self.server.ranges = True
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.directory = tempfile.mkdtemp()
+        self.session = create_session(1)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.session.close()
+        shutil.rmtree(self.directory)
+
+    def download(self, idx_keys):
+        return download_gfs_file(self.session, self.base_url, '20261018', '00', 0, self.directory, idx_keys)
+
+    def read(self, path):
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def file_requests(self):
+        return [header for path, header in self.server.requests if path == FILE_PATH]
+
+    def test_downloads_only_the_selected_messages(self):
+        path = self.download({('PRMSL', 'mean sea level'), ('UGRD', '10 m above ground')})
+
+        self.assertEqual(self.read(path), GRIB_MESSAGES[0] + GRIB_MESSAGES[2])
+        self.assertEqual(self.file_requests(), ['bytes=0-49', 'bytes=150-'])
+        self.assertEqual(sorted(os.listdir(self.directory)), ['gfs.t00z.pgrb2.0p25.f000'])
+
+    def test_adjacent_messages_are_fetched_in_one_range(self):
+        path = self.download({('PRMSL', 'mean sea level'), ('TMP', '2 m above ground')})
+
+        self.assertEqual(self.read(path), GRIB_MESSAGES[0] + GRIB_MESSAGES[1])
+        self.assertEqual(self.file_requests(), ['bytes=0-149'])
+
+    def test_downloads_the_full_file_without_idx_keys(self):
+        path = self.download(None)
+
+        self.assertEqual(self.read(path), GRIB_FILE)
+        self.assertEqual(self.file_requests(), [None])
+
+    def test_downloads_the_full_file_when_the_inventory_is_missing(self):
+        self.server.inventory = False
+
+        path = self.download({('TMP', '2 m above ground')})
+
+        self.assertEqual(self.read(path), GRIB_FILE)
+
+    def test_resumes_a_partial_download_of_the_same_ranges(self):
+        temp_path = os.path.join(self.directory, 'gfs.t00z.pgrb2.0p25.f000.tmp')
+        with open(temp_path, 'wb') as file:
+            file.write(GRIB_MESSAGES[0] + GRIB_MESSAGES[2][:40])
+        with open(temp_path.replace('.tmp', '.signature.tmp'), 'w') as file:
+            file.write(download_signature(self.base_url + FILE_PATH, [(0, 49), (150, None)]))
+
+        path = self.download({('PRMSL', 'mean sea level'), ('UGRD', '10 m above ground')})
+
+        self.assertEqual(self.read(path), GRIB_MESSAGES[0] + GRIB_MESSAGES[2])
+        self.assertEqual(self.file_requests(), ['bytes=190-'])
+
+    def test_restarts_a_partial_download_of_other_ranges(self):
+        temp_path = os.path.join(self.directory, 'gfs.t00z.pgrb2.0p25.f000.tmp')
+        with open(temp_path, 'wb') as file:
+            file.write(GRIB_MESSAGES[1][:30])
+        with open(temp_path.replace('.tmp', '.signature.tmp'), 'w') as file:
+            file.write(download_signature(self.base_url + FILE_PATH, [(50, 149)]))
+
+        path = self.download({('PRMSL', 'mean sea level'), ('UGRD', '10 m above ground')})
+
+        self.assertEqual(self.read(path), GRIB_MESSAGES[0] + GRIB_MESSAGES[2])
+        self.assertEqual(self.file_requests(), ['bytes=0-49', 'bytes=150-'])
+
+    def test_restarts_a_partial_download_without_a_signature(self):
+        temp_path = os.path.join(self.directory, 'gfs.t00z.pgrb2.0p25.f000.tmp')
+        with open(temp_path, 'wb') as file:
+            file.write(b'left over')
+
+        path = self.download(None)
+
+        self.assertEqual(self.read(path), GRIB_FILE)
+
+    def test_server_ignoring_the_range_restarts_the_full_file(self):
+        self.server.ranges = False
+        temp_path = os.path.join(self.directory, 'gfs.t00z.pgrb2.0p25.f000.tmp')
+        with open(temp_path, 'wb') as file:
+            file.write(GRIB_FILE[:25])
+        with open(temp_path.replace('.tmp', '.signature.tmp'), 'w') as file:
+            file.write(download_signature(self.base_url + FILE_PATH, None))
+
+        path = self.download(None)
+
+        self.assertEqual(self.read(path), GRIB_FILE)
+
+
+class LatticeTests(SimpleTestCase):
+    def tearDown(self):
+        import_places._land = None
+
+    def rows(self, latitudes, longitudes):
+        return [row for text, count in import_places._lattice_rows(np.array(latitudes), np.array(longitudes), 1, 2)
+                for row in text.splitlines()]
+
+    def test_axis_stops_below_the_end(self):
+        self.assertEqual(import_places.lattice_axis(37.0, 37.004, 0.001).tolist(), [37.0, 37.001, 37.002, 37.003])
+        self.assertEqual(
+            import_places.lattice_axis(37.0, 37.0045, 0.001).tolist(), [37.0, 37.001, 37.002, 37.003, 37.004],
+        )
+
+    def test_axis_is_rounded_like_places(self):
+        axis = import_places.lattice_axis(34.802066, 34.9, 0.001)
+
+        self.assertEqual(len(axis), 98)
+        self.assertEqual(axis.tolist(), [round(value, 6) for value in axis.tolist()])
+        self.assertEqual(axis[-1], 34.899066)
+
+    def test_rows_are_copy_lines_of_places(self):
+        self.assertEqual(
+            self.rows([37.5], [23.5]),
+            ['375-235\t23.5\t37.5\t\\N\tf\t1\t2\tSRID=4326;POINT(23.5 37.5)'],
+        )
+
+    def test_points_at_sea_are_skipped(self):
+        import_places._init_worker(shapely.to_wkb(shapely.box(23.0, 37.0, 24.0, 38.0)))
+
+        rows = self.rows([36.5, 37.5], [22.5, 23.5, 24.5])
+
+        self.assertEqual([row.split('\t')[0] for row in rows], ['375-235'])
+
+    def test_all_points_are_kept_without_a_land_mask(self):
+        import_places._init_worker(None)
+
+        self.assertEqual(len(self.rows([36.5, 37.5], [22.5, 23.5, 24.5])), 6)
+
+
+class ImportPlacesTests(TestCase):
+    def setUp(self):
+        category = GeographicCategory.objects.create(slug='default')
+        division = GeographicDivision.objects.create(slug='attica')
+        GeographicPlace.objects.create(
+            slug='athens', latitude=37.9838, longitude=23.7275, category=category, admin_division=division,
+        )
+
+    def test_existing_places_are_kept_without_truncate(self):
+        with self.assertRaises(CommandError):
+            call_command('import_places', stdout=StringIO())
+
+        self.assertTrue(GeographicPlace.objects.filter(slug='athens').exists())
+
+    def test_truncate_asks_for_confirmation(self):
+        with mock.patch('builtins.input', return_value='no') as prompt:
+            call_command('import_places', truncate=True, stdout=StringIO())
+
+        prompt.assert_called_once()
+        self.assertTrue(GeographicPlace.objects.filter(slug='athens').exists())
+
+
+class NearestPlaceTests(TestCase):
+    PLACES = [
+        ('athens', 37.9838, 23.7275),
+        ('piraeus', 37.9429, 23.6469),
+        ('thessaloniki', 40.6401, 22.9444),
+        ('heraklion', 35.3387, 25.1442),
+        ('patras', 38.2466, 21.7346),
+        ('kerkyra', 39.6243, 19.9217),
+    ]
+
+    def setUp(self):
+        category = GeographicCategory.objects.create(slug='default')
+        division = GeographicDivision.objects.create(slug='greece')
+        for slug, latitude, longitude in self.PLACES:
+            GeographicPlace.objects.create(
+                slug=slug, latitude=latitude, longitude=longitude, category=category, admin_division=division,
+            )
+
+    def test_kd_tree_agrees_with_the_database_knn_query(self):
+        index = PlaceIndex.build()
+        with override_settings(NEAREST_PLACE_INDEX=False):
+            for latitude, longitude in [(37.96, 23.70), (37.95, 23.66), (40.0, 22.5), (35.0, 26.0),
+                                        (38.5, 21.0), (39.9, 19.5), (36.5, 24.5)]:
+                with self.subTest(latitude=latitude, longitude=longitude):
+                    self.assertEqual(index.nearest(latitude, longitude)[0], find_nearest_place(latitude, longitude).pk)
+
+    def test_invalid_coordinates_are_rejected(self):
+        factory = RequestFactory()
+        for query in [{}, {'latitude': '37.9'}, {'latitude': 'north', 'longitude': '23.7'},
+                      {'latitude': '90.1', 'longitude': '23.7'}, {'latitude': '37.9', 'longitude': '-180.5'}]:
+            with self.subTest(query=query):
+                self.assertEqual(nearest_place(factory.get('/nearest-place/', query)).status_code, 400)
+
+    def test_nearest_place_response(self):
+        response = nearest_place(RequestFactory().get('/nearest-place/', {'latitude': '37.95', 'longitude': '23.65'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['place_slug'], 'piraeus')
+
+
+def create_forecast(cycle, place, day, hour):
+    return GFSForecast.objects.create(
+        cycle=cycle, place=place, date=day, hour=hour, utc_cycle_time=f"{cycle.run_datetime.hour:02d}",
+        forecast_data={}, temperature_2m=285.0 + hour / 2, relative_humidity_2m=60.0, total_precipitation=0.2,
+        convective_precipitation_rate=0.0, wind_u_10m=4.0, wind_v_10m=-3.0, pressure_msl=101300.0,
+        low_cloud_cover=20.0, latitude=place.latitude, longitude=place.longitude,
+    )
+
+
+class WeatherPayloadTests(TestCase):
+    def setUp(self):
+        category = GeographicCategory.objects.create(slug='default')
+        division = GeographicDivision.objects.create(slug='attica')
+        self.place = GeographicPlace.objects.create(
+            slug='athens', latitude=37.9838, longitude=23.7275, category=category, admin_division=division,
+        )
+        # The 18Z run of yesterday also forecasts the last hours of yesterday
+        today = django_timezone.now().date()
+        yesterday = today - timedelta(days=1)
+        self.cycle = ForecastCycle.objects.create(
+            run_datetime=datetime.combine(yesterday, time(18), tzinfo=timezone.utc), expected_files=1,
+        )
+        for day, hour in [(yesterday, 18), (yesterday, 21), (today, 0), (today, 6), (today, 12), (today, 18)]:
+            create_forecast(self.cycle, self.place, day, hour)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cycle.activate()
+
+    @override_settings(WEATHER_FORECAST_BACKEND='database')
+    def test_rendered_payload_matches_the_live_response(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            render_cycle_payloads(self.cycle)
+
+        rendered = json.loads(get_weather_payload(self.place, self.cycle.pk))
+        live = json.loads(encode_payload(build_weather_summary(self.place, get_weather_data_for_place(self.place)),
+                                         compress=False))
+        self.assertEqual(len(live['weather_data']), 4)
+        self.assertSameResponse(rendered, live)
+
+    def assertSameResponse(self, first, second):
+        # The payloads are computed over numpy arrays, the live response value by value
+        if isinstance(first, float) or isinstance(second, float):
+            self.assertAlmostEqual(first, second, places=6)
+        elif isinstance(first, dict) and isinstance(second, dict):
+            self.assertEqual(first.keys(), second.keys())
+            for key in first:
+                self.assertSameResponse(first[key], second[key])
+        elif isinstance(first, list) and isinstance(second, list):
+            self.assertEqual(len(first), len(second))
+            for first_item, second_item in zip(first, second):
+                self.assertSameResponse(first_item, second_item)
+        else:
+            self.assertEqual(first, second)
+
+
+class ParseBBoxTests(SimpleTestCase):
+    def test_valid_box(self):
+        self.assertEqual(parse_bbox('23.5,37.8,24,38.1'), (23.5, 37.8, 24.0, 38.1))
+
+    def test_invalid_boxes(self):
+        for value in ['23.5,37.8,24', '23.5,37.8,24,38.1,1', 'west,37.8,24,38.1', '24,37.8,23.5,38.1',
+                      '23.5,38.1,24,37.8', '23.5,-91,24,38.1', '-181,37.8,24,38.1']:
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_bbox(value)
+
+
+@override_settings(WEATHER_FORECAST_BACKEND='database')
+class WeatherBatchTests(TestCase):
+    def setUp(self):
+        category = GeographicCategory.objects.create(slug='default')
+        division = GeographicDivision.objects.create(slug='attica')
+        self.places = {
+            slug: GeographicPlace.objects.create(
+                slug=slug, latitude=latitude, longitude=longitude, category=category, admin_division=division,
+            )
+            for slug, latitude, longitude in [
+                ('athens', 37.9838, 23.7275), ('piraeus', 37.9429, 23.6469), ('marathon', 38.1536, 23.9633),
+                ('thessaloniki', 40.6401, 22.9444),
+            ]
+        }
+        today = django_timezone.now().date()
+        cycle = ForecastCycle.objects.create(
+            run_datetime=datetime.combine(today, time(0), tzinfo=timezone.utc), expected_files=1,
+        )
+        for hour in (0, 6, 12):
+            create_forecast(cycle, self.places['athens'], today, hour)
+        with self.captureOnCommitCallbacks(execute=True):
+            cycle.activate()
+            render_cycle_payloads(cycle)
+        # Imported after the payloads were rendered: served from its forecast rows
+        for hour in (0, 6):
+            create_forecast(cycle, self.places['piraeus'], today, hour)
+
+    def get(self, query):
+        return weather_batch(RequestFactory().get('/weather/batch/', query))
+
+    def places_of(self, response):
+        self.assertEqual(response.status_code, 200)
+        return {place['place_slug']: place for place in json.loads(b''.join(response.streaming_content))['places']}
+
+    def test_places_parameter(self):
+        places = self.places_of(self.get({'places': 'athens,,marathon,unknown,'}))
+
+        self.assertEqual(set(places), {'athens', 'marathon'})
+
+    def test_bbox_parameter(self):
+        places = self.places_of(self.get({'bbox': '23.5,37.8,24,38.2'}))
+
+        self.assertEqual(set(places), {'athens', 'piraeus', 'marathon'})
+
+    def test_stream_is_valid_json_when_some_places_have_no_payload(self):
+        places = self.places_of(self.get({'places': 'athens,piraeus,marathon'}))
+
+        self.assertEqual(len(places['athens']['weather_data']), 3)  # Stored payload
+        self.assertEqual(len(places['piraeus']['weather_data']), 2)  # Rendered from the forecast rows
+        self.assertEqual(places['marathon']['weather_data'], [])  # No forecast at all
+        self.assertEqual(places['marathon']['alerts'], [])
+
+    def test_missing_or_invalid_selection_is_rejected(self):
+        for query in [{}, {'places': ','}, {'bbox': '23.5,37.8,24'}, {'bbox': '24,37.8,23.5,38.2'}]:
+            with self.subTest(query=query):
+                self.assertEqual(self.get(query).status_code, 400)
+
+    def test_number_of_places_is_limited(self):
+        with mock.patch.object(view_weather_batch, 'WEATHER_BATCH_MAX_PLACES', 3):
+            self.assertEqual(len(self.places_of(self.get({'bbox': '23.5,37.8,24,38.2'}))), 3)
+            self.assertEqual(self.get({'bbox': '20,35,25,41'}).status_code, 400)
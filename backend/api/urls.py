@@ -7,6 +7,7 @@ from .views.view_geography_place import place_detail
 from .views.view_geography_nearest_place import nearest_place
 from .views.view_weather_for_place import weather_for_place
 from .views.view_weather_for_place_daily import weather_for_place_daily
+from .views.view_weather_batch import weather_batch
 from api.views.view_articles import ArticlesArticleListView, ArticlesArticleDetailView
 
 urlpatterns = [
@@ -14,6 +15,7 @@ urlpatterns = [
     path('planet-list/', planet_list, name='planet_list'),
     path('municipalities/', MunicipalityList.as_view(), name='municipality-list'),
     path('place/', nearest_place, name='nearest_place'),
+    path('weather/batch/', weather_batch, name='weather_batch'),  # Before the place slug pattern
     path('weather/<slug:place_slug>/', weather_for_place, name='weather_for_place'),
     path(
         'weather/daily/<slug:place_slug>/',
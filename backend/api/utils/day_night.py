@@ -1,9 +1,82 @@
 # api/utils/day_night.py
 
-from astral import LocationInfo
-from astral.sun import sun
-from django.utils import timezone
-import pytz
+import threading
+from datetime import timezone
+import numpy as np
+from weather_engine.solar import is_day, solar_dates, sun_times
+from weather_engine.sun_table import latest_sun_table
+
+# Sun times per (latitude, longitude, solar date), shared by all requests of the process
+_sun_times_memo = {}
+_sun_times_memo_lock = threading.Lock()
+SUN_TIMES_MEMO_SIZE = 200000
+
+
+def get_sun_times(latitude, longitude, dates):
+    """
+    Look up sunrise, sunset and polar state of a location for some dates,
+    computing the dates not seen before in a single vectorised call.
+
+    Parameters:
+    - latitude (float): Latitude of the location.
+    - longitude (float): Longitude of the location.
+    - dates (list): numpy datetime64[D] solar dates.
+
+    Returns:
+    - dict: (sunrise, sunset, polar) keyed by date.
+    """
+    with _sun_times_memo_lock:
+        known = {
+            date: _sun_times_memo[(latitude, longitude, date)]
+            for date in dates
+            if (latitude, longitude, date) in _sun_times_memo
+        }
+
+    missing = sorted({date for date in dates if date not in known})
+    if missing:
+        _, sunrise, sunset, polar = sun_times(np.array(missing, dtype='datetime64[D]'), latitude, longitude)
+        computed = {date: (sunrise[i], sunset[i], polar[i]) for i, date in enumerate(missing)}
+        known.update(computed)
+        with _sun_times_memo_lock:
+            if len(_sun_times_memo) + len(missing) > SUN_TIMES_MEMO_SIZE:
+                _sun_times_memo.clear()
+            _sun_times_memo.update(((latitude, longitude, date), times) for date, times in computed.items())
+
+    return {date: known[date] for date in dates}
+
+
+def day_or_night_series(forecast_datetimes, latitude, longitude, place_id=None):
+    """
+    Determines for each datetime whether it is during day or night at the specified location.
+
+    Parameters:
+    - forecast_datetimes (list): Timezone aware datetimes to check.
+    - latitude (float): Latitude of the location.
+    - longitude (float): Longitude of the location.
+    - place_id (int): GeographicPlace id, to read the precomputed sun table.
+
+    Returns:
+    - list: 'day' or 'night' per datetime
+    """
+    if not forecast_datetimes:
+        return []
+
+    times = np.array(
+        [forecast_datetime.astimezone(timezone.utc).replace(tzinfo=None) for forecast_datetime in forecast_datetimes],
+        dtype='datetime64[s]',
+    )
+    dates = solar_dates(times, longitude)
+
+    sun_table = latest_sun_table() if place_id is not None else None
+    looked_up = sun_table.lookup(place_id, dates) if sun_table is not None else None
+    if looked_up is not None:
+        sunrise, sunset, polar = looked_up
+    else:
+        # A 7-day response touches at most 8 solar dates
+        known = get_sun_times(latitude, longitude, dates.tolist())
+        sunrise, sunset, polar = (np.array(values) for values in zip(*(known[date] for date in dates.tolist())))
+
+    return ['day' if day else 'night' for day in is_day(times, sunrise, sunset, polar).tolist()]
 
 
 def is_daytime(forecast_datetime, latitude, longitude):
@@ -18,23 +91,4 @@ def is_daytime(forecast_datetime, latitude, longitude):
     Returns:
     - str: 'day' or 'night'
     """
-    try:
-        # Determine the timezone based on latitude and longitude
-        # For simplicity, assuming UTC; for accurate results, use a timezone lookup library like timezonefinder
-        timezone_str = 'UTC'
-        tz = pytz.timezone(timezone_str)
-        forecast_datetime = forecast_datetime.astimezone(tz)
-
-        location = LocationInfo(name="Custom Location", region="Custom Region", timezone=timezone_str,
-                                latitude=latitude, longitude=longitude)
-        s = sun(location.observer, date=forecast_datetime.date(), tzinfo=tz)
-        sunrise = s['sunrise']
-        sunset = s['sunset']
-
-        if sunrise <= forecast_datetime <= sunset:
-            return 'day'
-        else:
-            return 'night'
-    except Exception as e:
-        # In case of any error, default to day
-        return 'day'
+    return day_or_night_series([forecast_datetime], latitude, longitude)[0]
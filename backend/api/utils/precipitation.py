@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -86,3 +87,52 @@ def categorize_precipitation(weather_entry):
     else:
         logger.warning(f"Unknown precipitation type: {precipitation_type}")
         return 'Unknown Precipitation Type'
+
+def categorize_precipitation_array(total_precipitation, temperature_celsius, convective_precipitation_rate=None,
+                                   precipitation_type=None):
+    """
+    Categorize precipitation for arrays of entries, with the rules of categorize_precipitation.
+
+    Parameters:
+    - total_precipitation (array-like): Total precipitation, NaN where missing.
+    - temperature_celsius (array-like): 2-meter temperature, NaN where missing.
+    - convective_precipitation_rate (array-like): Convective rate in mm/h, NaN where missing, or None if unknown.
+    - precipitation_type (array-like): 'snow', 'rain', 'sleet' or None per entry, or None if unknown.
+
+    Returns:
+    - numpy.ndarray: Precipitation category per entry (object array of strings).
+    """
+    total_precipitation = np.asarray(total_precipitation, dtype=float)
+    temperature_celsius = np.asarray(temperature_celsius, dtype=float)
+    shape = total_precipitation.shape
+    convective = (
+        np.full(shape, np.nan) if convective_precipitation_rate is None
+        else np.asarray(convective_precipitation_rate, dtype=float)
+    )
+    kind = np.full(shape, None, dtype=object) if precipitation_type is None else np.asarray(precipitation_type, dtype=object)
+    snow, rain = kind == 'snow', kind == 'rain'
+
+    conditions = [
+        np.isnan(total_precipitation) | np.isnan(temperature_celsius),
+        convective > 50,
+        convective > 20,
+        convective > 10,
+        snow & (temperature_celsius >= 3),
+        snow & (total_precipitation > 50),
+        snow & (total_precipitation > 25),
+        snow,
+        rain & (total_precipitation > 100),
+        rain & (total_precipitation > 50),
+        rain & (total_precipitation > 25),
+        rain & (total_precipitation > 5),
+        rain & (total_precipitation > 0),
+        rain,
+        kind == 'sleet',
+    ]
+    choices = [
+        'Data Unavailable', 'Severe Storm', 'Moderate Storm', 'Light Storm',
+        'No Precipitation', 'Heavy Snow', 'Moderate Snow', 'Light Snow',
+        'Extreme Rain', 'Heavy Rain', 'Moderate Rain', 'Light Rain', 'Drizzle', 'No Precipitation',
+        'Sleet',
+    ]
+    return np.select(conditions, np.array(choices, dtype=object), np.array('Unknown Precipitation Type', dtype=object))
@@ -0,0 +1,124 @@
+import hashlib
+import logging
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.translation import get_language
+from weather.models import ForecastCycle
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# GFS runs every 6 hours
+CYCLE_INTERVAL = timedelta(hours=6)
+
+# Shortest max-age sent while the next cycle is overdue
+MIN_MAX_AGE_SECONDS = 60
+
+
+def weather_response_key(endpoint, place_slug, language, revision):
+    return f"weather:{endpoint}:{revision}:{language}:{place_slug}"
+
+
+def cache_weather_response(endpoint):
+    """
+    Cache successful JSON responses of a weather view per (endpoint, place slug, language, cycle revision).
+
+    A new cycle, a further imported forecast hour or newly rendered payloads change the revision
+    and so the key, so cached responses are never served past the content they were built from.
+
+    Parameters:
+    - endpoint (str): Name distinguishing the cached view.
+
+    Returns:
+    - function: Decorator for views taking a place_slug argument.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, place_slug, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, place_slug, *args, **kwargs)
+
+            revision = ForecastCycle.objects.current_summary()['revision']
+            key = weather_response_key(endpoint, place_slug, get_language(), revision)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, place_slug, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            # Only JSON is shared; the browsable API renders HTML for the same URL
+            if response.status_code == 200 and response.get('Content-Type', '').startswith('application/json'):
+                cache.set(key, (response.content, response['Content-Type']), settings.WEATHER_RESPONSE_CACHE_TIMEOUT)
+            return response
+        return wrapped
+    return decorator
+
+
+def weather_etag(endpoint, place_slug, language, revision):
+    digest = hashlib.sha1(f"{endpoint}:{place_slug}:{language}".encode('utf-8')).hexdigest()[:16]
+    return f'"{revision}-{digest}"'
+
+
+def seconds_until_next_cycle(cycle_summary):
+    """
+    Estimate how long the current cycle's responses stay valid: the next run
+    is expected one cycle interval after the current one, with the same delay
+    between run time and completed import. A cycle published before all of its
+    forecast hours are imported changes with each hour, so it gets the minimum.
+
+    Parameters:
+    - cycle_summary (dict): As returned by ForecastCycle.objects.current_summary().
+
+    Returns:
+    - int: Seconds, at least MIN_MAX_AGE_SECONDS.
+    """
+    if not cycle_summary['is_complete']:
+        return MIN_MAX_AGE_SECONDS
+    completed_at = cycle_summary['completed_at'] or cycle_summary['run_datetime']
+    next_expected = completed_at + CYCLE_INTERVAL
+    return max(MIN_MAX_AGE_SECONDS, int((next_expected - timezone.now()).total_seconds()))
+
+
+def conditional_weather_response(endpoint):
+    """
+    Add ETag, Last-Modified and Cache-Control headers tied to the revision of the current
+    forecast cycle to a weather view, and answer matching If-None-Match / If-Modified-Since
+    requests with 304 before the view (and any forecast query) runs.
+
+    Parameters:
+    - endpoint (str): Name distinguishing the view in the ETag.
+
+    Returns:
+    - function: Decorator for views taking a place_slug argument.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, place_slug, *args, **kwargs):
+            cycle_summary = ForecastCycle.objects.current_summary()
+            if request.method not in ('GET', 'HEAD') or not cycle_summary['id']:
+                return view(request, place_slug, *args, **kwargs)
+
+            etag = weather_etag(endpoint, place_slug, get_language(), cycle_summary['revision'])
+            last_modified = cycle_summary['updated_at']
+            max_age = seconds_until_next_cycle(cycle_summary)
+
+            response = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+            if response is None:
+                response = view(request, place_slug, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+            patch_cache_control(response, public=True, max_age=max_age)
+            return response
+        return wrapped
+    return decorator
@@ -1,21 +1,28 @@
-import math
 import logging
+import numpy as np
 from datetime import datetime, timedelta, timezone  # Import timezone from datetime
+from itertools import groupby
+from operator import attrgetter
+from django.conf import settings
 from django.utils import timezone as django_timezone  # Alias to avoid confusion
-from django.db.models import Max, Min, Avg, FloatField
-from django.db.models.functions import TruncDate, Cast
+from django.db.models import Max, Min, Avg
+from django.db.models.functions import TruncDate
 from geography.models import GeographicPlace
-from weather.models import GFSForecast
-from .wind import calculate_wind, calculate_alert_probability  # Ensure this line is present
+from weather.models import ForecastCycle, GFSForecast, HOT_PARAMETER_FIELDS
+from weather_engine.forecast_store import latest_cube
+from weather_engine.solar import is_day, solar_dates, sun_times
+from api.serializers import AlertSerializer
+from .wind import calculate_wind_arrays, calculate_wind_series, calculate_alert_probabilities, calculate_alert_probability
 from .alerts import generate_alerts_for_weather
-from .day_night import is_daytime
-from .weather_state import determine_weather_state
+from .day_night import day_or_night_series
+from .weather_state import determine_weather_state, determine_weather_states
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Constants
 LAPSE_RATE_C_PER_METER = 0.006  # 0.6°C per 100 meters
+FORECAST_DAYS = 7  # Days of hourly forecast in the hourly weather response, counted from today
 
 def convert_and_adjust_temperature(kelvin_temp, elevation):
     if kelvin_temp is not None:
@@ -30,40 +37,277 @@ def convert_and_adjust_temperature(kelvin_temp, elevation):
 def calculate_pressure_hpa(pressure_pa):
     return round(pressure_pa / 100.0, 2) if pressure_pa is not None else None
 
-def get_weather_data_for_place(place):
+def get_hourly_forecast_data_from_store(place, start_date, end_date):
     """
-    Fetch and process weather data for a given place.
+    Slice a place's hourly forecast out of the gridded forecast cube of the current cycle
+    (or the latest complete cube before it).
+
+    Returns:
+    - list or None: (forecast_datetime, forecast_data) pairs, or None if no cube covers the place.
+    """
+    cube = latest_cube(until=ForecastCycle.objects.current_summary()['run_datetime'])
+    if cube is None:
+        return None
+
+    series = cube.series(place.latitude, place.longitude)
+    if series is None:
+        return None
+
+    return [
+        (forecast_datetime, forecast_data)
+        for forecast_datetime, forecast_data in series
+        if start_date <= forecast_datetime.date() <= end_date
+    ]
+
+def get_current_cycle_forecasts(place):
+    """
+    Select a place's GFSForecast rows of the current cycle only, so that a cycle
+    that is still being imported never reaches readers.
+
+    Parameters:
+    - place (GeographicPlace or PlaceRecord): The place, only its id is used.
+
+    Returns:
+    - QuerySet: GFSForecast rows, empty before the first cycle completes.
     """
-    # Define the time range for the forecast (e.g., next 7 days)
-    now = django_timezone.now()
-    start_date = now.date()
-    end_date = start_date + timedelta(days=7)  # Adjust as needed
+    cycle_id = ForecastCycle.objects.current_id()
+    if not cycle_id:
+        return GFSForecast.objects.none()
+    return GFSForecast.objects.filter(cycle_id=cycle_id, place_id=place.id)
 
-    # Query GFSForecast data for the place and date range
-    forecasts = GFSForecast.objects.filter(
-        place=place,
+def get_hourly_forecast_data_from_database(place, start_date, end_date):
+    """
+    Read a place's hourly forecast from GFSForecast rows.
+
+    Returns:
+    - list: (forecast_datetime, forecast_data) pairs ordered by time.
+    """
+    forecasts = get_current_cycle_forecasts(place).filter(
         date__gte=start_date,
         date__lte=end_date
     ).order_by('date', 'hour')
 
-    weather_data = []
-
+    hourly_forecast_data = []
     for forecast in forecasts:
-        # Extract forecast data from the JSONField
-        forecast_data = forecast.forecast_data
-
         # Build a datetime object from the date and hour
         forecast_datetime = datetime.combine(forecast.date, datetime.min.time()) + timedelta(hours=forecast.hour)
         # Make forecast_datetime timezone-aware using Python's datetime.timezone.utc
         forecast_datetime = django_timezone.make_aware(forecast_datetime, timezone=timezone.utc)
+        hourly_forecast_data.append((forecast_datetime, forecast.get_forecast_data()))
+
+    return hourly_forecast_data
+
+def iter_cycle_hourly_forecast_data(cycle, place_ids, start_date, end_date):
+    """
+    Read the hourly forecasts of several places of a cycle in one ordered scan.
+
+    Parameters:
+    - cycle (ForecastCycle or int): The cycle or its id.
+    - place_ids (list): GeographicPlace ids to read.
+    - start_date (date): First forecast date.
+    - end_date (date): Last forecast date.
+
+    Yields:
+    - tuple: (place_id, hourly_forecast_data) per place with forecasts, in place id order.
+    """
+    forecasts = (
+        GFSForecast.objects
+        .filter(cycle=cycle, place_id__in=place_ids, date__gte=start_date, date__lte=end_date)
+        .order_by('place_id', 'date', 'hour')
+    )
+    for place_id, place_forecasts in groupby(forecasts.iterator(), key=attrgetter('place_id')):
+        yield place_id, [
+            (
+                datetime.combine(forecast.date, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=forecast.hour),
+                forecast.get_forecast_data(),
+            )
+            for forecast in place_forecasts
+        ]
+
+def read_cycle_forecast_columns(cycle, place_ids, start_date, end_date):
+    """
+    Read the hot parameter columns of several places of a cycle as numpy arrays.
+
+    Parameters:
+    - cycle (ForecastCycle or int): The cycle or its id.
+    - place_ids (list): GeographicPlace ids to read.
+    - start_date (date): First forecast date.
+    - end_date (date): Last forecast date.
+
+    Returns:
+    - dict: 'place_id' and 'time' (UTC datetime64[s]) arrays plus one float array (NaN where
+      missing) per HOT_PARAMETER_FIELDS column, rows ordered by place id and time.
+    """
+    field_names = list(HOT_PARAMETER_FIELDS.values())
+    rows = list(
+        GFSForecast.objects
+        .filter(cycle=cycle, place_id__in=place_ids, date__gte=start_date, date__lte=end_date)
+        .order_by('place_id', 'date', 'hour')
+        .values_list('place_id', 'date', 'hour', *field_names)
+    )
+    columns = list(zip(*rows)) if rows else [()] * (3 + len(field_names))
+
+    forecast_columns = {
+        'place_id': np.array(columns[0], dtype=np.int64),
+        'time': (
+            np.array(columns[1], dtype='datetime64[D]').astype('datetime64[s]')
+            + np.array(columns[2], dtype=np.int64).astype('timedelta64[h]')
+        ),
+    }
+    for field_name, values in zip(field_names, columns[3:]):
+        forecast_columns[field_name] = np.array(values, dtype=float)
+    return forecast_columns
+
+def _nullable(values):
+    # NaN becomes None, other values become Python numbers
+    values = np.asarray(values)
+    return np.where(np.isnan(values), None, values).tolist()
+
+def build_weather_data_for_places(places, forecast_columns):
+    """
+    Vectorised build_weather_data for several places at once: every derived value is
+    computed over all (place, hour) rows in one pass, only the entry dicts are built per hour.
+
+    Parameters:
+    - places (list): GeographicPlace objects (or records) with id, latitude, longitude and elevation.
+    - forecast_columns (dict): Arrays as returned by read_cycle_forecast_columns.
+
+    Returns:
+    - dict: One weather entry dict list per place id, for places with forecast rows.
+    """
+    place_ids = forecast_columns['place_id']
+    if not len(place_ids):
+        return {}
+
+    # Coordinates and elevation of the place of every row
+    place_positions = {place.id: i for i, place in enumerate(places)}
+    positions = np.array([place_positions[place_id] for place_id in place_ids.tolist()], dtype=np.int64)
+    latitudes = np.array([place.latitude for place in places], dtype=float)[positions]
+    longitudes = np.array([place.longitude for place in places], dtype=float)[positions]
+    # Places imported without elevation are stored at sea level (see GeographicPlace.save)
+    elevations = np.nan_to_num(np.array([place.elevation for place in places], dtype=float))[positions]
+
+    times = forecast_columns['time']
+    temperature = np.round(forecast_columns['temperature_2m'] - 273.15 - elevations * LAPSE_RATE_C_PER_METER, 2)
+    pressure = np.round(forecast_columns['pressure_msl'] / 100.0, 2)
+    total_precipitation = forecast_columns['total_precipitation']
+    storm_probability = calculate_alert_probabilities(forecast_columns['convective_precipitation_rate'])
+    wind_speed, wind_direction, beaufort = calculate_wind_arrays(
+        forecast_columns['wind_u_10m'], forecast_columns['wind_v_10m'],
+    )
+    wind_missing = np.isnan(wind_speed)
+
+    dates = solar_dates(times, longitudes)
+    _, sunrise, sunset, polar = sun_times(dates, latitudes, longitudes)
+    day_or_night = np.where(is_day(times, sunrise, sunset, polar), 'day', 'night').tolist()
+
+    states = zip(*(state.tolist() for state in determine_weather_states(
+        temperature,
+        total_precipitation,
+        forecast_columns['low_cloud_cover'],
+        wind_speed,
+        storm_probability >= 80,
+    )))
+
+    datetimes = [f"{value}+00:00" for value in np.datetime_as_string(times, unit='s').tolist()]
+    entries = [
+        {
+            'datetime': forecast_datetime,
+            'temperature_celsius': temperature_celsius,
+            'relative_humidity_percent': relative_humidity_percent,
+            'wind_speed_m_s': wind_speed_m_s,
+            'wind_direction': direction,
+            'wind_beaufort_scale': beaufort_scale,
+            'total_precipitation_mm': total_precipitation_mm,
+            'storm_probability_percent': storm_probability_percent,
+            'pressure_hPa': pressure_hPa,
+            'day_or_night': day_night,
+            'weather_state': dict(zip(('temperature', 'precipitation', 'cloud_cover', 'wind', 'flood'), state)),
+        }
+        for (
+            forecast_datetime, temperature_celsius, relative_humidity_percent, wind_speed_m_s, direction,
+            beaufort_scale, total_precipitation_mm, storm_probability_percent, pressure_hPa, day_night, state,
+        ) in zip(
+            datetimes,
+            _nullable(temperature),
+            _nullable(forecast_columns['relative_humidity_2m']),
+            _nullable(wind_speed),
+            wind_direction.tolist(),
+            np.where(wind_missing, None, beaufort).tolist(),
+            _nullable(total_precipitation),
+            np.where(np.isnan(storm_probability), None, np.nan_to_num(storm_probability).astype(np.int64)).tolist(),
+            _nullable(pressure),
+            day_or_night,
+            states,
+        )
+    ]
+
+    # Rows are ordered by place, so each place is one contiguous slice
+    unique_ids, starts = np.unique(place_ids, return_index=True)
+    ends = np.append(starts[1:], len(place_ids))
+    return {
+        place_id: entries[start:end]
+        for place_id, start, end in zip(unique_ids.tolist(), starts.tolist(), ends.tolist())
+    }
+
+def forecast_date_range():
+    """
+    Return the first and last forecast date of the hourly weather response, shared by
+    the live view and the rendered payloads so that both cover the same hours.
+    """
+    start_date = django_timezone.now().date()
+    return start_date, start_date + timedelta(days=FORECAST_DAYS)
+
+def get_weather_data_for_place(place):
+    """
+    Fetch and process weather data for a given place.
+    """
+    start_date, end_date = forecast_date_range()
+
+    hourly_forecast_data = None
+    if settings.WEATHER_FORECAST_BACKEND == 'cube':
+        hourly_forecast_data = get_hourly_forecast_data_from_store(place, start_date, end_date)
+    if hourly_forecast_data is None:
+        hourly_forecast_data = get_hourly_forecast_data_from_database(place, start_date, end_date)
+
+    return build_weather_data(place, hourly_forecast_data)
+
+def build_weather_data(place, hourly_forecast_data):
+    """
+    Turn a place's raw hourly forecast into the hourly entries served by the API.
+
+    Parameters:
+    - place (GeographicPlace): The place, providing elevation and coordinates.
+    - hourly_forecast_data (list): (forecast_datetime, forecast_data) pairs ordered by time.
+
+    Returns:
+    - list: One weather entry dict per hour.
+    """
+    weather_data = []
+
+    # Calculate wind properties for all hours at once
+    wind_speeds, wind_directions, beaufort_scales = calculate_wind_series(
+        [forecast_data.get('10u_level_10_heightAboveGround') for _, forecast_data in hourly_forecast_data],
+        [forecast_data.get('10v_level_10_heightAboveGround') for _, forecast_data in hourly_forecast_data],
+    )
+
+    # Determine day or night for all hours at once
+    days_or_nights = day_or_night_series(
+        [forecast_datetime for forecast_datetime, _ in hourly_forecast_data],
+        place.latitude,
+        place.longitude,
+        place_id=place.id,
+    )
+
+    for (forecast_datetime, forecast_data), wind_speed, wind_direction, beaufort_scale, day_or_night in zip(
+        hourly_forecast_data, wind_speeds, wind_directions, beaufort_scales, days_or_nights
+    ):
 
         # Extract necessary fields from forecast_data
         temperature_kelvin = forecast_data.get('2t_level_2_heightAboveGround')
         relative_humidity_percent = forecast_data.get('2r_level_2_heightAboveGround')
         total_precipitation_mm = forecast_data.get('tp_level_0_surface')
         conv_precip_rate = forecast_data.get('cprat_level_0_surface')
-        wind_u = forecast_data.get('10u_level_10_heightAboveGround')
-        wind_v = forecast_data.get('10v_level_10_heightAboveGround')
         pressure_Pa = forecast_data.get('prmsl_level_0_meanSea')  # Pressure in Pascals
 
         # Adjust temperature for elevation
@@ -72,18 +316,12 @@ def get_weather_data_for_place(place):
             elevation=place.elevation
         )
 
-        # Calculate wind properties
-        wind_speed, wind_direction, beaufort_scale = calculate_wind(wind_u, wind_v)
-
         # Calculate storm probability
         storm_probability = calculate_alert_probability(conv_precip_rate)
 
         # Convert pressure from Pa to hPa
         pressure_hPa = calculate_pressure_hpa(pressure_Pa)
 
-        # Determine day or night
-        day_or_night = is_daytime(forecast_datetime, place.latitude, place.longitude)
-
         # Determine weather state
         weather_state = determine_weather_state({
             'temperature_celsius': adjusted_temp_celsius,
@@ -114,6 +352,31 @@ def get_weather_data_for_place(place):
 
     return weather_data
 
+def build_weather_summary(place, weather_data):
+    """
+    Build the language independent part of the hourly weather response.
+
+    Parameters:
+    - place (GeographicPlace): The place the weather data belongs to.
+    - weather_data (list): Hourly weather entries.
+
+    Returns:
+    - dict: weather_data, weather_state and alerts of the response.
+    """
+    alerts = []
+    weather_state = {}
+    if weather_data:
+        # Alerts and state describe the last forecast entry
+        latest_weather = weather_data[-1]
+        alerts = generate_alerts_for_weather(place, latest_weather)
+        weather_state = determine_weather_state(latest_weather)
+
+    return {
+        'weather_data': weather_data,
+        'weather_state': weather_state,
+        'alerts': AlertSerializer(alerts, many=True).data,
+    }
+
 def get_daily_weather_data_for_place(place):
     """
     Fetch and aggregate daily weather data for a given place.
@@ -123,15 +386,15 @@ def get_daily_weather_data_for_place(place):
 
     # Fetch and aggregate daily weather data from GFSForecast
     daily_forecasts = (
-        GFSForecast.objects.filter(place=place, date__gte=today)
+        get_current_cycle_forecasts(place).filter(date__gte=today)
         .annotate(date_only=TruncDate('date'))
         .values('date_only')
         .annotate(
-            max_temp=Max(Cast('forecast_data__2t_level_2_heightAboveGround', FloatField())),
-            min_temp=Min(Cast('forecast_data__2t_level_2_heightAboveGround', FloatField())),
-            avg_cloud_cover=Avg(Cast('forecast_data__lcc_level_0_lowCloudLayer', FloatField())),
-            max_precipitation=Max(Cast('forecast_data__tp_level_0_surface', FloatField())),
-            wind_speed_avg=Avg(Cast('forecast_data__10u_level_10_heightAboveGround', FloatField())),
+            max_temp=Max('temperature_2m'),
+            min_temp=Min('temperature_2m'),
+            avg_cloud_cover=Avg('low_cloud_cover'),
+            max_precipitation=Max('total_precipitation'),
+            wind_speed_avg=Avg('wind_u_10m'),
         )
         .order_by('date_only')
     )
@@ -0,0 +1,170 @@
+import gzip
+import json
+import logging
+from itertools import islice
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+from geography.models import GeographicPlace
+from weather.models import ForecastCycle, PlaceForecastPayload
+from .weather_data import (
+    build_weather_data,
+    build_weather_data_for_places,
+    build_weather_summary,
+    forecast_date_range,
+    iter_cycle_hourly_forecast_data,
+    read_cycle_forecast_columns,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Places rendered per database round trip and vectorised pass
+PAYLOAD_BATCH_SIZE = 2000
+
+
+def encode_payload(summary, compress=True):
+    encoded = json.dumps(summary, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return gzip.compress(encoded) if compress else encoded
+
+
+def render_cycle_payloads(cycle, batch_size=PAYLOAD_BATCH_SIZE):
+    """
+    Render the hourly weather response of every place for a cycle and store it compressed.
+
+    Each batch of places is read as column arrays and its wind, sun, state and unit
+    conversions are computed over all (place, hour) rows at once.
+
+    Parameters:
+    - cycle (ForecastCycle): The cycle to render, normally the current one.
+    - batch_size (int): Number of places fetched and written at a time.
+
+    Returns:
+    - int: Number of payloads stored.
+    """
+    start_date, end_date = forecast_date_range()
+
+    places = (
+        GeographicPlace.objects
+        .only('id', 'latitude', 'longitude', 'elevation')
+        .order_by('id')
+        .iterator(chunk_size=batch_size)
+    )
+
+    rendered = 0
+    while True:
+        batch = list(islice(places, batch_size))
+        if not batch:
+            break
+
+        forecast_columns = read_cycle_forecast_columns(cycle, [place.id for place in batch], start_date, end_date)
+        weather_data_by_place = build_weather_data_for_places(batch, forecast_columns)
+
+        payloads = [
+            PlaceForecastPayload(
+                cycle=cycle,
+                place_id=place.id,
+                payload=encode_payload(build_weather_summary(place, weather_data_by_place[place.id])),
+            )
+            for place in batch
+            if place.id in weather_data_by_place
+        ]
+
+        PlaceForecastPayload.objects.bulk_create(
+            payloads,
+            update_conflicts=True,
+            unique_fields=['cycle', 'place'],
+            update_fields=['payload'],
+        )
+        rendered += len(payloads)
+        logger.info("Rendered %d forecast payloads for %s", rendered, cycle)
+
+    rendered_at = timezone.now()
+    ForecastCycle.objects.filter(pk=cycle.pk).update(payloads_rendered_at=rendered_at, updated_at=rendered_at)
+    # Responses cached from the previous payloads belong to the previous revision
+    ForecastCycle.objects.forget_current_summary()
+    return rendered
+
+
+def publish_forecast_cycle(cycle):
+    """
+    Switch readers to a fully imported cycle, then render its payloads.
+
+    Until the payloads are stored, readers render responses from the cycle's forecast
+    rows, so a failed rendering only costs speed; render_pending_payloads retries it.
+    """
+    if cycle.activate():
+        render_cycle_payloads(cycle)
+
+
+def render_pending_payloads():
+    """
+    Render the payloads of the current cycle if they have not been stored yet.
+
+    Returns:
+    - int: Number of payloads stored, 0 if there was nothing to render.
+    """
+    cycle = ForecastCycle.objects.current()
+    if cycle is None or cycle.payloads_rendered_at is not None:
+        return 0
+    return render_cycle_payloads(cycle)
+
+
+def get_weather_payload(place, cycle):
+    """
+    Fetch the rendered hourly weather response of a place.
+
+    Parameters:
+    - place (GeographicPlace or PlaceRecord): The place to look up.
+    - cycle (ForecastCycle or int): The cycle or its id, normally the current one.
+
+    Returns:
+    - bytes or None: The JSON encoded weather_data, weather_state and alerts, or None if not rendered.
+    """
+    payload = (
+        PlaceForecastPayload.objects
+        .filter(cycle=cycle, place_id=place.id)
+        .values_list('payload', flat=True)
+        .first()
+    )
+    if payload is None:
+        return None
+    return gzip.decompress(bytes(payload))
+
+
+def iter_weather_payloads(places, cycle_id):
+    """
+    Stream the hourly weather responses of several places.
+
+    Stored payloads are read in one query; places without one are rendered from a
+    single ordered scan of the cycle's forecasts, over the same days as the live view.
+
+    Parameters:
+    - places (list): GeographicPlace objects, ordered by id.
+    - cycle_id (int): The current cycle id.
+
+    Yields:
+    - tuple: (place, bytes) with the JSON encoded weather_data, weather_state and alerts, per place.
+    """
+    places_by_id = {place.id: place for place in places}
+
+    stored = (
+        PlaceForecastPayload.objects
+        .filter(cycle_id=cycle_id, place_id__in=list(places_by_id))
+        .order_by('place_id')
+        .values_list('place_id', 'payload')
+    )
+    missing = dict(places_by_id)
+    for place_id, payload in stored.iterator():
+        yield missing.pop(place_id), gzip.decompress(bytes(payload))
+
+    if not missing:
+        return
+
+    start_date, end_date = forecast_date_range()
+    for place_id, hourly_forecast_data in iter_cycle_hourly_forecast_data(cycle_id, list(missing), start_date, end_date):
+        place = missing.pop(place_id)
+        yield place, encode_payload(build_weather_summary(place, build_weather_data(place, hourly_forecast_data)), compress=False)
+
+    # Places without any forecast rows still get an (empty) entry
+    for place in missing.values():
+        yield place, encode_payload(build_weather_summary(place, []), compress=False)
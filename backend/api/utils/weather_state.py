@@ -1,6 +1,7 @@
 # api/utils/weather_state.py
 
-from .precipitation import categorize_precipitation
+import numpy as np
+from .precipitation import categorize_precipitation, categorize_precipitation_array
 
 def determine_weather_state(weather_entry):
     """
@@ -54,3 +55,38 @@ def determine_weather_state(weather_entry):
         state['flood'] = 'No Flood'
 
     return state
+
+
+def determine_weather_states(temperature_celsius, total_precipitation, avg_cloud_cover, wind_speed, flood):
+    """
+    Determine the weather state of many entries at once, with the rules of determine_weather_state.
+
+    Parameters:
+    - temperature_celsius (array-like): Temperatures, NaN where missing.
+    - total_precipitation (array-like): Total precipitation, NaN where missing.
+    - avg_cloud_cover (array-like): Cloud cover in percent, NaN where missing (counted as clear).
+    - wind_speed (array-like): Wind speeds in m/s, NaN where missing (counted as calm).
+    - flood (array-like): Boolean flood risk per entry.
+
+    Returns:
+    - tuple: (temperature, precipitation, cloud_cover, wind, flood) object arrays of state strings.
+    """
+    temperature_celsius = np.asarray(temperature_celsius, dtype=float)
+    avg_cloud_cover = np.asarray(avg_cloud_cover, dtype=float)
+    wind_speed = np.asarray(wind_speed, dtype=float)
+
+    temperature = np.select(
+        [temperature_celsius > 30, temperature_celsius < 0], np.array(['Hot', 'Cold'], dtype=object),
+        np.array('Normal', dtype=object),
+    )
+    precipitation = categorize_precipitation_array(total_precipitation, temperature_celsius)
+    cloud_cover = np.select(
+        [avg_cloud_cover > 75, avg_cloud_cover > 50], np.array(['Overcast', 'Partly Cloudy'], dtype=object),
+        np.array('Clear', dtype=object),
+    )
+    wind = np.select(
+        [wind_speed > 30, wind_speed > 15], np.array(['Storm', 'Windy'], dtype=object),
+        np.array('Calm', dtype=object),
+    )
+    flood = np.where(np.asarray(flood, dtype=bool), 'Flood', 'No Flood').astype(object)
+    return temperature, precipitation, cloud_cover, wind, flood
@@ -1,6 +1,71 @@
 # api/utils/wind.py
 
-import math
+import numpy as np
+
+
+# 16-point compass, one sector per 22.5 degrees starting at north
+COMPASS_SECTORS = np.array([
+    "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+    "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"
+], dtype=object)
+
+# Lower wind speed limits (m/s) of Beaufort forces 1 to 12
+BEAUFORT_LIMITS = np.array([0.3, 1.6, 3.4, 5.5, 8.0, 10.8, 13.9, 17.2, 20.8, 24.5, 28.5, 32.7])
+
+
+def calculate_wind_arrays(u, v):
+    """
+    Calculate wind speed, direction and Beaufort scale for whole arrays of wind components,
+    e.g. every hour of a place or every place of an hour.
+
+    Parameters:
+    - u (array-like): U-components of wind (m/s), None or NaN where missing
+    - v (array-like): V-components of wind (m/s), None or NaN where missing
+
+    Returns:
+    - tuple: (wind_speed_m_s, wind_direction, beaufort_scale) numpy arrays; speed is NaN,
+      direction None and Beaufort -1 where a component is missing
+    """
+    u = np.asarray(u, dtype=float)
+    v = np.asarray(v, dtype=float)
+    missing = np.isnan(u) | np.isnan(v)
+
+    # Wind speed in m/s
+    wind_speed = np.round(np.hypot(u, v), 2)
+
+    # Direction the wind blows from, in degrees 0-360
+    wind_dir_degrees = (np.degrees(np.arctan2(-u, -v)) + 360) % 360
+    sectors = (np.floor((np.nan_to_num(wind_dir_degrees) + 11.25) / 22.5).astype(int)) % 16
+    wind_direction = COMPASS_SECTORS[sectors]
+    wind_direction[missing] = None
+
+    beaufort = np.searchsorted(BEAUFORT_LIMITS, np.nan_to_num(wind_speed), side='right')
+    beaufort[missing] = -1
+
+    return wind_speed, wind_direction, beaufort
+
+
+def calculate_wind_series(u, v):
+    """
+    Calculate wind speed, direction and Beaufort scale for sequences of wind components.
+
+    Parameters:
+    - u (list): U-components of wind (m/s), None where missing
+    - v (list): V-components of wind (m/s), None where missing
+
+    Returns:
+    - tuple: (wind_speeds, wind_directions, beaufort_scales) lists with None where missing
+    """
+    wind_speed, wind_direction, beaufort = calculate_wind_arrays(
+        [np.nan if value is None else value for value in u],
+        [np.nan if value is None else value for value in v],
+    )
+    missing = np.isnan(wind_speed).tolist()
+    return (
+        [None if absent else speed for speed, absent in zip(wind_speed.tolist(), missing)],
+        wind_direction.tolist(),
+        [None if absent else force for force, absent in zip(beaufort.tolist(), missing)],
+    )
 
 
 def calculate_wind(u, v):
@@ -14,43 +79,8 @@ def calculate_wind(u, v):
     Returns:
     - tuple: (wind_speed_m_s, wind_direction, beaufort_scale)
     """
-    if u is not None and v is not None:
-        # Wind speed in m/s
-        wind_speed = math.sqrt(u ** 2 + v ** 2)
-        wind_speed = round(wind_speed, 2)
-
-        # Wind direction in degrees
-        wind_dir_radians = math.atan2(-u, -v)
-        wind_dir_degrees = (math.degrees(wind_dir_radians) + 360) % 360  # Ensure 0-360
-
-        # Convert wind direction to compass direction
-        compass_sectors = [
-            "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
-            "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"
-        ]
-        idx = int((wind_dir_degrees + 11.25) / 22.5) % 16
-        wind_direction = compass_sectors[idx]
-
-        # Convert wind speed to Beaufort scale
-        beaufort_scale = [
-            (0, 0.3, 0),
-            (0.3, 1.6, 1),
-            (1.6, 3.4, 2),
-            (3.4, 5.5, 3),
-            (5.5, 8.0, 4),
-            (8.0, 10.8, 5),
-            (10.8, 13.9, 6),
-            (13.9, 17.2, 7),
-            (17.2, 20.8, 8),
-            (20.8, 24.5, 9),
-            (24.5, 28.5, 10),
-            (28.5, 32.7, 11),
-            (32.7, float('inf'), 12)
-        ]
-        beaufort = next((b for min_s, max_s, b in beaufort_scale if min_s <= wind_speed < max_s), 0)
-
-        return wind_speed, wind_direction, beaufort
-    return None, None, None
+    wind_speeds, wind_directions, beaufort_scales = calculate_wind_series([u], [v])
+    return wind_speeds[0], wind_directions[0], beaufort_scales[0]
 
 
 def calculate_alert_probability(conv_precip_rate):
@@ -77,3 +107,24 @@ def calculate_alert_probability(conv_precip_rate):
         else:
             return 100
     return None
+
+
+def calculate_alert_probabilities(conv_precip_rate):
+    """
+    Calculate storm probabilities for an array of convective precipitation rates,
+    with the thresholds of calculate_alert_probability.
+
+    Parameters:
+    - conv_precip_rate (array-like): Convective precipitation rates, NaN where missing
+
+    Returns:
+    - numpy.ndarray: Probability percentages (0-100), NaN where the rate is missing
+    """
+    rate = np.asarray(conv_precip_rate, dtype=float)
+    probability = np.select(
+        [rate == 0, rate < 0.0001, rate < 0.0005, rate < 0.001, rate < 0.005],
+        [0, 20, 40, 60, 80],
+        100,
+    ).astype(float)
+    probability[np.isnan(rate)] = np.nan
+    return probability
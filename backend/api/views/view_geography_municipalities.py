@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from geography.models import GeographicDivision
+from geography.translations import division_names
 from api.serializers import MunicipalitySerializer
 
 class MunicipalityList(APIView):
@@ -16,11 +17,13 @@ class MunicipalityList(APIView):
         normalized_language = language.split('-')[0]
 
         # Query municipalities using Parler's translated method
-        municipalities = GeographicDivision.objects.translated(normalized_language).filter(
-            translations__level_name="Municipality"
+        municipalities = list(
+            GeographicDivision.objects.translated(normalized_language).filter(
+                translations__level_name="Municipality"
+            ).only('id', 'slug')
         )
 
-        if not municipalities.exists():
+        if not municipalities:
             return Response(
                 {"detail": f"No municipalities found for the current language ({normalized_language})."},
                 status=status.HTTP_404_NOT_FOUND
@@ -30,6 +33,9 @@ class MunicipalityList(APIView):
         serializer = MunicipalitySerializer(
             municipalities,
             many=True,
-            context={'language': normalized_language}
+            context={
+                'language': normalized_language,
+                'names': division_names.get_many([municipality.pk for municipality in municipalities], normalized_language),
+            }
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
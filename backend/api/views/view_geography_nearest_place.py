@@ -2,9 +2,38 @@
 import logging
 from django.http import JsonResponse
 from django.contrib.gis.geos import Point
-from django.contrib.gis.db.models.functions import Distance
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.db.models.functions import GeometryDistance
+from django.db.models import Value
 from django.utils.translation import get_language
 from geography.models import GeographicPlace
+from geography.place_index import get_place_index
+from geography.translations import division_names, place_descriptions, place_names
+
+def find_nearest_place(latitude, longitude):
+    """
+    Find the place closest to a coordinate, from the in-process index when it is
+    available, otherwise with an index-assisted KNN (<->) query.
+    """
+    places = GeographicPlace.objects.select_related('admin_division')
+
+    index = get_place_index()
+    if index is not None:
+        nearest = index.nearest(latitude, longitude)
+        if nearest is None:
+            return None
+        place = places.filter(pk=nearest[0]).first()
+        if place is not None:
+            return place
+
+    # A geography operand keeps "location <-> point" on the location GiST index (KNN scan)
+    user_location = Value(Point(longitude, latitude, srid=4326), output_field=PointField(geography=True))
+    return (
+        places
+        .filter(location__isnull=False)
+        .order_by(GeometryDistance('location', user_location))
+        .first()
+    )
 
 def nearest_place(request):
     latitude = request.GET.get('latitude')
@@ -34,19 +63,17 @@ def nearest_place(request):
     except (TypeError, ValueError):
         return JsonResponse({'error': 'Invalid latitude or longitude.'}, status=400)
 
-    user_location = Point(longitude, latitude, srid=4326)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return JsonResponse({'error': 'Invalid latitude or longitude.'}, status=400)
 
-    # Find the nearest place
-    place = GeographicPlace.objects.annotate(
-        distance=Distance('location', user_location)
-    ).order_by('distance').first()
+    place = find_nearest_place(latitude, longitude)
 
     if not place:
         return JsonResponse({'error': 'No places found.'}, status=404)
 
     response_data = {
-        'name': place.safe_translation_getter('name', language_code=language, any_language=True),
-        'description': place.safe_translation_getter('description', language_code=language, any_language=True),
+        'name': place_names.get(place.id, language),
+        'description': place_descriptions.get(place.id, language),
         'latitude': place.latitude,
         'longitude': place.longitude,
         'elevation': place.elevation,
@@ -54,7 +81,7 @@ def nearest_place(request):
         'country_slug': place.get_country_slug(),
         'region_slug': place.get_region_slug(),
         'municipality_slug': place.admin_division.slug,
-        'municipality_name': place.admin_division.safe_translation_getter('name', language_code=language, any_language=True),
+        'municipality_name': division_names.get(place.admin_division_id, language),
         'place_slug': place.slug,
     }
 
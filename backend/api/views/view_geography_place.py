@@ -2,37 +2,28 @@
 
 from django.http import JsonResponse
 from django.utils.translation import get_language
-from geography.models import GeographicPlace, GeographicDivision
+from geography.models import GeographicDivision
+from geography.place_cache import get_place_record
 
 def place_detail(request, country_slug, region_slug, municipality_slug, place_slug):
     language = get_language()
 
-    # Get the municipality
-    try:
-        municipality = GeographicDivision.objects.get(
-            slug=municipality_slug
-        )
-    except GeographicDivision.DoesNotExist:
-        return JsonResponse({'error': 'Municipality not found.'}, status=404)
-
-    # Find the place
-    try:
-        place = GeographicPlace.objects.get(
-            slug=place_slug,
-            admin_division=municipality
-        )
-    except GeographicPlace.DoesNotExist:
+    # Find the place and check it lies in the municipality
+    place = get_place_record(place_slug)
+    if place is None or place.division_slug != municipality_slug:
+        if not GeographicDivision.objects.filter(slug=municipality_slug).exists():
+            return JsonResponse({'error': 'Municipality not found.'}, status=404)
         return JsonResponse({'error': 'Place not found.'}, status=404)
 
     # Prepare response data
     response_data = {
-        'name': place.safe_translation_getter('name', language_code=language, any_language=True),
-        'description': place.safe_translation_getter('description', language_code=language, any_language=True),
+        'name': place.name(language),
+        'description': place.description(language),
         'latitude': place.latitude,
         'longitude': place.longitude,
         'elevation': place.elevation,
-        'municipality_name': municipality.safe_translation_getter('name', language_code=language, any_language=True),
-        'municipality_slug': municipality.slug,
+        'municipality_name': place.division_name(language),
+        'municipality_slug': place.division_slug,
         # Include other necessary fields or slugs if needed
     }
 
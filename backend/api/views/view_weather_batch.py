@@ -0,0 +1,95 @@
+# api/views/view_weather_batch.py
+
+import json
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.translation import get_language
+from geography.models import GeographicPlace
+from geography.translations import place_names
+from weather.models import ForecastCycle
+from api.utils.weather_data import get_weather_data_for_place, build_weather_summary
+from api.utils.weather_payloads import encode_payload, iter_weather_payloads
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the places of one batch request
+WEATHER_BATCH_MAX_PLACES = 500
+
+
+def parse_bbox(value):
+    """
+    Parse a "west,south,east,north" bounding box in degrees.
+
+    Raises:
+    - ValueError: If the value is not four numbers forming a valid box.
+    """
+    west, south, east, north = (float(part) for part in value.split(','))
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError(f"Invalid bounding box: {value}")
+    return west, south, east, north
+
+
+def iter_place_payloads(places):
+    """
+    Yield (place, JSON bytes) of the hourly weather summary of each place, using the
+    configured forecast backend.
+    """
+    cycle_id = ForecastCycle.objects.current_id()
+    if settings.WEATHER_FORECAST_BACKEND == 'database' and cycle_id:
+        yield from iter_weather_payloads(places, cycle_id)
+        return
+
+    for place in places:
+        summary = build_weather_summary(place, get_weather_data_for_place(place))
+        yield place, encode_payload(summary, compress=False)
+
+
+def stream_weather_batch(places, language):
+    names = place_names.get_many([place.id for place in places], language)
+    yield b'{"places":['
+    for index, (place, payload) in enumerate(iter_place_payloads(places)):
+        place_name = names[place.id]
+        # The stored JSON object only lacks the place identification
+        yield (
+            (b',' if index else b'')
+            + b'{"place_slug":' + json.dumps(place.slug).encode('utf-8')
+            + b',"place_name":' + json.dumps(place_name, ensure_ascii=False).encode('utf-8')
+            + b',' + payload[1:]
+        )
+    yield b']}'
+
+
+def weather_batch(request):
+    """
+    Hourly weather for many places at once, selected by ?places=slug1,slug2 or
+    ?bbox=west,south,east,north, streamed as {"places": [...]}.
+    """
+    language = get_language()
+
+    slugs = [slug for slug in request.GET.get('places', '').split(',') if slug]
+    bbox = request.GET.get('bbox')
+
+    if slugs:
+        places = GeographicPlace.objects.filter(slug__in=slugs)
+    elif bbox:
+        try:
+            west, south, east, north = parse_bbox(bbox)
+        except ValueError:
+            return JsonResponse({'error': 'bbox must be west,south,east,north in degrees.'}, status=400)
+        places = GeographicPlace.objects.filter(
+            longitude__gte=west, longitude__lte=east,
+            latitude__gte=south, latitude__lte=north,
+        )
+    else:
+        return JsonResponse({'error': 'Either places or bbox is required.'}, status=400)
+
+    places = list(
+        places
+        .only('id', 'slug', 'latitude', 'longitude', 'elevation')
+        .order_by('id')[:WEATHER_BATCH_MAX_PLACES + 1]
+    )
+    if len(places) > WEATHER_BATCH_MAX_PLACES:
+        return JsonResponse({'error': f'At most {WEATHER_BATCH_MAX_PLACES} places can be requested at once.'}, status=400)
+
+    return StreamingHttpResponse(stream_weather_batch(places, language), content_type='application/json')
@@ -1,51 +1,48 @@
 # api/views/view_weather_for_place.py
 
+import json
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.utils.translation import get_language
-from geography.models import GeographicPlace
-from api.utils.weather_data import get_weather_data_for_place
-from api.utils.weather_state import determine_weather_state
-from api.utils.alerts import generate_alerts_for_weather
-from api.serializers import AlertSerializer, DailyWeatherSerializer  # Correct import
+from geography.place_cache import get_place_record
+from weather.models import ForecastCycle
+from api.utils.weather_data import get_weather_data_for_place, build_weather_summary
+from api.utils.weather_payloads import get_weather_payload
+from api.utils.response_cache import cache_weather_response, conditional_weather_response
 import logging
 
 logger = logging.getLogger(__name__)
 
+@conditional_weather_response('hourly')
+@cache_weather_response('hourly')
 @api_view(['GET'])
 def weather_for_place(request, place_slug):
     language = get_language()
 
     # Find the place
-    try:
-        place = GeographicPlace.objects.get(slug=place_slug)
-    except GeographicPlace.DoesNotExist:
+    place = get_place_record(place_slug)
+    if place is None:
         return Response({'error': 'Place not found.'}, status=404)
 
-    # Fetch weather data
-    weather_data = get_weather_data_for_place(place)
-
-    # Generate alerts based on the latest weather entry
-    alerts = []
-    if weather_data:
-        latest_weather = weather_data[-1]  # Assuming latest is last
-        alerts = generate_alerts_for_weather(place, latest_weather)
+    place_name = place.name(language)
 
-    # Determine weather state for the latest forecast
-    if weather_data:
-        latest_weather = weather_data[-1]
-        weather_state = determine_weather_state(latest_weather)
-    else:
-        weather_state = {}
+    # Serve the payload rendered after the import of the current cycle
+    if settings.WEATHER_FORECAST_BACKEND == 'database':
+        cycle_id = ForecastCycle.objects.current_id()
+        payload = get_weather_payload(place, cycle_id) if cycle_id else None
+        if payload is not None:
+            # The stored JSON object only lacks the (translated) place name
+            body = b'{"place_name":' + json.dumps(place_name, ensure_ascii=False).encode('utf-8') + b',' + payload[1:]
+            return HttpResponse(body, content_type='application/json')
 
-    # Serialize alerts
-    serializer = AlertSerializer(alerts, many=True)
+    # Fetch weather data
+    weather_data = get_weather_data_for_place(place)
 
     response_data = {
-        'place_name': place.safe_translation_getter('name', language_code=language, any_language=True),
-        'weather_data': weather_data,
-        'weather_state': weather_state,
-        'alerts': serializer.data,  # Include the serialized alerts
+        'place_name': place_name,
+        **build_weather_summary(place, weather_data),
     }
 
     return Response(response_data)
@@ -4,20 +4,22 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.http import JsonResponse
 from django.utils.translation import get_language
-from geography.models import GeographicPlace
+from geography.place_cache import get_place_record
 from api.utils.weather_data import get_daily_weather_data_for_place
 from api.serializers import DailyWeatherSerializer
+from api.utils.response_cache import cache_weather_response, conditional_weather_response
 import logging
 
 logger = logging.getLogger(__name__)
 
+@conditional_weather_response('daily')
+@cache_weather_response('daily')
 def weather_for_place_daily(request, place_slug):
     language = get_language()
 
     # Find the place
-    try:
-        place = GeographicPlace.objects.get(slug=place_slug)
-    except GeographicPlace.DoesNotExist:
+    place = get_place_record(place_slug)
+    if place is None:
         logger.error(f"Place with slug '{place_slug}' not found.")
         return JsonResponse({'error': 'Place not found.'}, status=404)
 
@@ -28,7 +30,7 @@ def weather_for_place_daily(request, place_slug):
     serializer = DailyWeatherSerializer(daily_weather_data, many=True)
 
     response_data = {
-        'place_name': place.safe_translation_getter('name', language_code=language, any_language=True),
+        'place_name': place.name(language),
         'daily_weather_data': serializer.data,
     }
 
@@ -223,6 +223,50 @@ PARLER_LANGUAGES = {
     }
 }
 
+# ------------------------------
+# WEATHER FORECAST SETTINGS
+# ------------------------------
+# 'database' reads GFSForecast rows, 'cube' reads the gridded forecast store first
+WEATHER_FORECAST_BACKEND = os.getenv('WEATHER_FORECAST_BACKEND', 'database').lower()
+
+# ------------------------------
+# GEOGRAPHY SETTINGS
+# ------------------------------
+# Answer nearest place lookups from an in-process KD-tree instead of the database
+NEAREST_PLACE_INDEX = os.getenv('NEAREST_PLACE_INDEX', 'True').lower() in ['true', '1', 't']
+# Above this many places the database is used: every worker process holds its own KD-tree,
+# about 60 bytes per place (500,000 places take some 30 MB per process)
+NEAREST_PLACE_INDEX_MAX_PLACES = int(os.getenv('NEAREST_PLACE_INDEX_MAX_PLACES', '500000'))
+
+# ------------------------------
+# CACHE SETTINGS
+# ------------------------------
+# 'locmem' (per process, development only), 'file' (shared on one host) or 'redis' (shared, needs the redis package)
+CACHE_BACKEND = os.getenv('DJANGO_CACHE_BACKEND', 'locmem').lower()
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_LOCATIONS = {
+    'locmem': 'aethra',
+    'file': str(BASE_DIR / 'data' / 'django_cache'),
+    'redis': 'redis://127.0.0.1:6379/1',
+}
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"Unknown DJANGO_CACHE_BACKEND: {CACHE_BACKEND}")
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', CACHE_LOCATIONS[CACHE_BACKEND]),
+        'TIMEOUT': int(os.getenv('DJANGO_CACHE_TIMEOUT', '300')),
+    }
+}
+
+# Weather responses are keyed by forecast cycle, so they can live as long as a cycle (6 hours)
+WEATHER_RESPONSE_CACHE_TIMEOUT = int(os.getenv('WEATHER_RESPONSE_CACHE_TIMEOUT', str(6 * 3600)))
+
 # ------------------------------
 # CORS HEADERS SETTINGS
 # ------------------------------
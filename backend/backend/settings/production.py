@@ -24,6 +24,19 @@ DATABASES = {
     }
 }
 
+# ------------------------------
+# CACHE SETTINGS
+# ------------------------------
+# Workers and the GFS pipeline must share a cache: a switch of the current forecast cycle
+# and version bumps are only seen by every worker through it, so 'locmem' is refused
+CACHE_BACKEND = os.getenv('DJANGO_CACHE_BACKEND', 'file').lower()
+
+if CACHE_BACKEND not in CACHE_BACKENDS or CACHE_BACKEND == 'locmem':
+    raise ValueError("DJANGO_CACHE_BACKEND must be 'file' or 'redis' for production.")
+
+CACHES['default']['BACKEND'] = CACHE_BACKENDS[CACHE_BACKEND]
+CACHES['default']['LOCATION'] = os.getenv('DJANGO_CACHE_LOCATION', CACHE_LOCATIONS[CACHE_BACKEND])
+
 # ------------------------------
 # EMAIL CONFIGURATION
 # ------------------------------
@@ -0,0 +1,48 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+def populate_ancestor_paths(apps, schema_editor):
+    GeographicDivision = apps.get_model('geography', 'GeographicDivision')
+    divisions = {division.pk: division for division in GeographicDivision.objects.only('slug', 'parent')}
+    paths = {}
+
+    def path_of(division_id, visiting=()):
+        if division_id not in paths:
+            division = divisions[division_id]
+            if division.parent_id is None or division.parent_id not in divisions or division.parent_id in visiting:
+                paths[division_id] = ([division_id], [division.slug])
+            else:
+                parent_ids, parent_slugs = path_of(division.parent_id, visiting + (division_id,))
+                paths[division_id] = (parent_ids + [division_id], parent_slugs + [division.slug])
+        return paths[division_id]
+
+    for division_id, division in divisions.items():
+        division.ancestor_ids, division.ancestor_slugs = path_of(division_id)
+    GeographicDivision.objects.bulk_update(divisions.values(), ['ancestor_ids', 'ancestor_slugs'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0008_remove_geographicdivision_geographic_data_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geographicdivision',
+            name='ancestor_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddField(
+            model_name='geographicdivision',
+            name='ancestor_slugs',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=255), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='geographicdivision',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ancestor_ids'], name='geography_g_ancesto_8d4119_gin'),
+        ),
+        migrations.RunPython(populate_ancestor_paths, migrations.RunPython.noop),
+    ]
@@ -6,3 +6,4 @@ from .model_geographic_division import GeographicDivision
 from .model_geographic_planet import GeographicPlanet
 from .model_geographic_place import GeographicPlace
 
+from .model_cache_version import CacheVersion
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class CacheVersion(models.Model):
+    """
+    Version counter of data that processes cache in memory, shared through the database
+    so a change made by any process (admin, management command) reaches all of them.
+    """
+    key = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
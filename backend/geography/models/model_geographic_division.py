@@ -3,6 +3,7 @@
 from django.db import models
 from django.utils.text import slugify
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.contrib.gis.db import models as gis_models  # Import GIS models
 from parler.models import TranslatableModel, TranslatedFields
 from unidecode import unidecode
@@ -25,6 +26,9 @@ class GeographicDivision(TranslatableModel):
     # Removed the geographic_data field
     confirmed = models.BooleanField(default=False)
     boundary = gis_models.PolygonField(geography=True, null=True, blank=True)  # Geospatial boundary
+    # Materialised path from the root division down to this one, maintained on save
+    ancestor_ids = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+    ancestor_slugs = ArrayField(models.CharField(max_length=255), default=list, blank=True, editable=False)
 
     def __str__(self):
         return self.safe_translation_getter('name', any_language=True)
@@ -33,11 +37,115 @@ class GeographicDivision(TranslatableModel):
         if not self.slug:
             name = self.safe_translation_getter('name', any_language=True)
             self.slug = slugify(unidecode(name))
+
         super().save(*args, **kwargs)
 
+        # The path includes the id, so it is stored once the division has one
+        ancestor_ids, ancestor_slugs = self.build_path()
+        if (ancestor_ids, ancestor_slugs) != (self.ancestor_ids, self.ancestor_slugs):
+            self.ancestor_ids, self.ancestor_slugs = ancestor_ids, ancestor_slugs
+            GeographicDivision.objects.filter(pk=self.pk).update(ancestor_ids=ancestor_ids, ancestor_slugs=ancestor_slugs)
+            self.update_descendant_paths()
+
+    def build_path(self):
+        """Return (ids, slugs) from the root division down to this one, based on the parent's stored path."""
+        if self.parent_id is None:
+            return [self.pk], [self.slug]
+        parent = GeographicDivision.objects.only('ancestor_ids', 'ancestor_slugs').get(pk=self.parent_id)
+        if not parent.ancestor_ids:
+            # Parent saved before paths were maintained
+            GeographicDivision.rebuild_paths()
+            parent.refresh_from_db(fields=['ancestor_ids', 'ancestor_slugs'])
+        return parent.ancestor_ids + [self.pk], parent.ancestor_slugs + [self.slug]
+
+    def update_descendant_paths(self):
+        """Replace the part of every descendant's path that leads to this division."""
+        descendants = list(
+            GeographicDivision.objects
+            .filter(ancestor_ids__contains=[self.pk])
+            .exclude(pk=self.pk)
+            .only('ancestor_ids', 'ancestor_slugs')
+        )
+        for descendant in descendants:
+            depth = descendant.ancestor_ids.index(self.pk)
+            descendant.ancestor_ids = self.ancestor_ids + descendant.ancestor_ids[depth + 1:]
+            descendant.ancestor_slugs = self.ancestor_slugs + descendant.ancestor_slugs[depth + 1:]
+        GeographicDivision.objects.bulk_update(descendants, ['ancestor_ids', 'ancestor_slugs'], batch_size=1000)
+
+    @classmethod
+    def rebuild_paths(cls):
+        """
+        Recompute the stored path of every division from the parent links, e.g. after
+        bulk imports or parent deletions that bypass save().
+
+        Returns:
+        - int: Number of divisions whose path changed.
+        """
+        divisions = {division.pk: division for division in cls.objects.only('slug', 'parent', 'ancestor_ids', 'ancestor_slugs')}
+        paths = {}
+
+        def path_of(division_id, visiting=()):
+            if division_id not in paths:
+                division = divisions[division_id]
+                if division.parent_id is None or division.parent_id not in divisions or division.parent_id in visiting:
+                    paths[division_id] = ([division_id], [division.slug])
+                else:
+                    parent_ids, parent_slugs = path_of(division.parent_id, visiting + (division_id,))
+                    paths[division_id] = (parent_ids + [division_id], parent_slugs + [division.slug])
+            return paths[division_id]
+
+        changed = []
+        for division_id, division in divisions.items():
+            ids, slugs = path_of(division_id)
+            if (division.ancestor_ids, division.ancestor_slugs) != (ids, slugs):
+                division.ancestor_ids, division.ancestor_slugs = ids, slugs
+                changed.append(division)
+        cls.objects.bulk_update(changed, ['ancestor_ids', 'ancestor_slugs'], batch_size=1000)
+        return len(changed)
+
+    @classmethod
+    def remove_from_paths(cls, division_ids):
+        """
+        Cut deleted divisions out of the stored paths below them, without walking the
+        whole tree: their children were detached (parent set to NULL) and became roots.
+
+        Parameters:
+        - division_ids (iterable): Ids of the deleted divisions.
+
+        Returns:
+        - int: Number of divisions whose path changed.
+        """
+        division_ids = set(division_ids)
+        # Deletions rolled back with a savepoint leave their division in place
+        deleted = division_ids - set(cls.objects.filter(pk__in=division_ids).values_list('pk', flat=True))
+        if not deleted:
+            return 0
+
+        descendants = list(
+            cls.objects
+            .filter(ancestor_ids__overlap=list(deleted))
+            .only('ancestor_ids', 'ancestor_slugs')
+        )
+        for descendant in descendants:
+            # The path restarts below the deepest deleted ancestor
+            cut = max(depth for depth, ancestor_id in enumerate(descendant.ancestor_ids) if ancestor_id in deleted)
+            descendant.ancestor_ids = descendant.ancestor_ids[cut + 1:]
+            descendant.ancestor_slugs = descendant.ancestor_slugs[cut + 1:]
+        cls.objects.bulk_update(descendants, ['ancestor_ids', 'ancestor_slugs'], batch_size=1000)
+        return len(descendants)
+
+    def get_path_slugs(self):
+        """Return the slugs from the root division down to this one without querying."""
+        return self.ancestor_slugs or [self.slug]
+
+    def subtree(self):
+        """Return this division and all divisions below it, in one indexed query."""
+        return GeographicDivision.objects.filter(ancestor_ids__contains=[self.pk])
+
     class Meta:
         verbose_name_plural = "Geographic Divisions"
         indexes = [
             models.Index(fields=['slug']),
             gis_models.Index(fields=['boundary']),  # Spatial index for boundary
+            GinIndex(fields=['ancestor_ids']),  # Subtree queries
         ]
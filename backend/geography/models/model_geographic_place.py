@@ -80,25 +80,14 @@ class GeographicPlace(TranslatableModel):
             'place_slug': self.slug,
         })
 
-    # Helper methods to get slugs
+    # Helper methods to get slugs, read from the stored division path without further queries
     def get_country_slug(self):
-        division = self.admin_division
-        while division.parent is not None:
-            if division.parent.parent is None:
-                return division.slug
-            division = division.parent
-        return division.slug
+        slugs = self.admin_division.get_path_slugs()
+        return slugs[1] if len(slugs) > 1 else slugs[0]
 
     def get_region_slug(self):
-        division = self.admin_division
-        while division.parent is not None:
-            if division.parent.parent is not None and division.parent.parent.parent is None:
-                return division.slug
-            division = division.parent
-        return division.slug
+        slugs = self.admin_division.get_path_slugs()
+        return slugs[2] if len(slugs) > 2 else slugs[0]
 
     def get_continent_slug(self):
-        division = self.admin_division
-        while division.parent is not None:
-            division = division.parent
-        return division.slug
\ No newline at end of file
+        return self.admin_division.get_path_slugs()[0]
@@ -0,0 +1,122 @@
+# geography/place_cache.py
+
+import threading
+from collections import OrderedDict
+from django.core.cache import cache
+from .models import GeographicPlace
+from .translations import resolve_translation
+from .versions import bump_version, get_version
+
+# Bumped whenever places, divisions or their translations change (see versions.py)
+PLACE_RECORDS_VERSION_KEY = 'place_records'
+
+# Shared cache lifetime of a record; changes invalidate records through the version
+PLACE_RECORD_CACHE_TIMEOUT = 24 * 3600
+
+# Records kept by each process
+PLACE_RECORD_LRU_SIZE = 10000
+
+_records = OrderedDict()
+_records_lock = threading.Lock()
+
+
+class PlaceRecord:
+    """
+    What the API needs to know about a place, resolved from its slug without queries.
+    """
+
+    __slots__ = (
+        'id', 'slug', 'latitude', 'longitude', 'elevation',
+        'admin_division_id', 'division_slugs', 'names', 'descriptions', 'division_names',
+    )
+
+    def __init__(self, id, slug, latitude, longitude, elevation, admin_division_id, division_slugs,
+                 names, descriptions, division_names):
+        self.id = id
+        self.slug = slug
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation = elevation
+        self.admin_division_id = admin_division_id
+        self.division_slugs = division_slugs  # From the root division down to the place's division
+        self.names = names  # Translated values keyed by language code
+        self.descriptions = descriptions
+        self.division_names = division_names
+
+    @classmethod
+    def from_place(cls, place):
+        division = place.admin_division
+        place_translations = list(place.translations.all())
+        return cls(
+            id=place.id,
+            slug=place.slug,
+            latitude=place.latitude,
+            longitude=place.longitude,
+            elevation=place.elevation,
+            admin_division_id=division.id,
+            division_slugs=list(division.get_path_slugs()),
+            names={translation.language_code: translation.name for translation in place_translations},
+            descriptions={translation.language_code: translation.description for translation in place_translations},
+            division_names={translation.language_code: translation.name for translation in division.translations.all()},
+        )
+
+    @property
+    def division_slug(self):
+        return self.division_slugs[-1]
+
+    def name(self, language_code):
+        return resolve_translation(self.names, language_code)
+
+    def description(self, language_code):
+        return resolve_translation(self.descriptions, language_code)
+
+    def division_name(self, language_code):
+        return resolve_translation(self.division_names, language_code)
+
+
+def place_records_version():
+    return get_version(PLACE_RECORDS_VERSION_KEY)
+
+
+def invalidate_place_records():
+    """
+    Makes every process drop its place records. Called from model signals, and by
+    bulk imports that bypass them.
+    """
+    bump_version(PLACE_RECORDS_VERSION_KEY)
+
+
+def get_place_record(slug):
+    """
+    Resolves a place slug, from the process-local LRU, then the shared cache,
+    then the database.
+
+    Args:
+        slug (str): GeographicPlace slug.
+
+    Returns:
+        PlaceRecord or None: The record, or None if there is no such place.
+    """
+    version = place_records_version()
+    key = (version, slug)
+
+    with _records_lock:
+        record = _records.get(key)
+        if record is not None:
+            _records.move_to_end(key)
+            return record
+
+    shared_key = f"geography:place:{version}:{slug}"
+    record = cache.get(shared_key)
+    if record is None:
+        place = GeographicPlace.objects.select_related('admin_division').filter(slug=slug).first()
+        if place is None:
+            return None
+        record = PlaceRecord.from_place(place)
+        cache.set(shared_key, record, PLACE_RECORD_CACHE_TIMEOUT)
+
+    with _records_lock:
+        _records[key] = record
+        while len(_records) > PLACE_RECORD_LRU_SIZE:
+            _records.popitem(last=False)
+    return record
@@ -0,0 +1,116 @@
+# geography/place_index.py
+
+import logging
+import threading
+import numpy as np
+from django.conf import settings
+from scipy.spatial import cKDTree
+from .models import GeographicPlace
+from .versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever places change; every process rebuilds its index when it sees a new value (see versions.py)
+PLACE_INDEX_VERSION_KEY = 'place_index'
+
+EARTH_RADIUS_METERS = 6371008.8
+
+# (version, PlaceIndex or None) of this process
+_loaded = None
+_index_lock = threading.Lock()
+
+
+def unit_vectors(latitudes, longitudes):
+    """
+    Returns the xyz coordinates of points on the unit sphere, so that euclidean
+    nearest neighbours are also great-circle nearest neighbours.
+    """
+    latitudes = np.radians(np.asarray(latitudes, dtype=float))
+    longitudes = np.radians(np.asarray(longitudes, dtype=float))
+    cos_latitudes = np.cos(latitudes)
+    return np.stack(
+        [cos_latitudes * np.cos(longitudes), cos_latitudes * np.sin(longitudes), np.sin(latitudes)],
+        axis=-1,
+    )
+
+
+class PlaceIndex:
+    """
+    KD-tree over the unit sphere positions of all places.
+    """
+
+    def __init__(self, place_ids, latitudes, longitudes):
+        self.place_ids = place_ids
+        self.tree = cKDTree(unit_vectors(latitudes, longitudes))
+
+    def __len__(self):
+        return len(self.place_ids)
+
+    @classmethod
+    def build(cls):
+        rows = np.array(
+            GeographicPlace.objects.order_by('id').values_list('id', 'latitude', 'longitude'),
+            dtype=float,
+        ).reshape(-1, 3)
+        return cls(rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2])
+
+    def nearest(self, latitude, longitude):
+        """
+        Finds the place closest to a coordinate.
+
+        Args:
+            latitude (float): Latitude in degrees.
+            longitude (float): Longitude in degrees.
+
+        Returns:
+            tuple or None: (place_id, great-circle distance in meters), or None if there are no places.
+        """
+        if not len(self):
+            return None
+        chord, position = self.tree.query(unit_vectors(latitude, longitude))
+        distance = 2 * np.arcsin(min(chord / 2, 1.0)) * EARTH_RADIUS_METERS
+        return int(self.place_ids[position]), float(distance)
+
+
+def place_index_version():
+    return get_version(PLACE_INDEX_VERSION_KEY)
+
+
+def invalidate_place_index():
+    """
+    Makes every process rebuild its place index on next use. Called on place
+    saves and deletes, and by bulk imports that bypass model signals.
+    """
+    bump_version(PLACE_INDEX_VERSION_KEY)
+
+
+def get_place_index():
+    """
+    Returns the in-process place index, rebuilding it when places changed.
+
+    Returns:
+        PlaceIndex or None: The index, or None if disabled or there are too many places to hold in memory.
+    """
+    global _loaded
+
+    if not settings.NEAREST_PLACE_INDEX:
+        return None
+
+    version = place_index_version()
+    loaded = _loaded
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+
+    # Concurrent requests wait for a single build
+    with _index_lock:
+        if _loaded is not None and _loaded[0] == version:
+            return _loaded[1]
+
+        index = None
+        if GeographicPlace.objects.count() > settings.NEAREST_PLACE_INDEX_MAX_PLACES:
+            logger.info("Too many places for an in-memory index, using the database")
+        else:
+            index = PlaceIndex.build()
+            logger.info("Built place index for %d places", len(index))
+        _loaded = (version, index)
+        return index
@@ -0,0 +1,65 @@
+# geography/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import GeographicCategory, GeographicDivision, GeographicPlace
+from .place_cache import invalidate_place_records
+from .place_index import invalidate_place_index
+from .translations import invalidate_translations
+from .versions import scheduled_on_commit
+
+
+class DeletedDivisionPaths:
+    """
+    Divisions deleted in one transaction, cut out of the stored paths once it commits.
+    """
+
+    def __init__(self):
+        self.division_ids = set()
+
+    def __call__(self):
+        GeographicDivision.remove_from_paths(self.division_ids)
+
+
+@receiver(post_save, sender=GeographicPlace)
+@receiver(post_delete, sender=GeographicPlace)
+def place_changed(sender, instance, **kwargs):
+    invalidate_place_index()
+    invalidate_place_records()
+
+
+@receiver(post_delete, sender=GeographicDivision)
+def division_deleted(sender, instance, **kwargs):
+    # Children of the deleted division were detached without save(); deleting a
+    # subtree updates the paths below it once, when the transaction commits
+    if not transaction.get_connection().in_atomic_block:
+        GeographicDivision.remove_from_paths([instance.pk])
+        return
+
+    pending = scheduled_on_commit(lambda callback: isinstance(callback, DeletedDivisionPaths))
+    if pending is None:
+        pending = DeletedDivisionPaths()
+        transaction.on_commit(pending)
+    pending.division_ids.add(instance.pk)
+
+
+@receiver(post_save, sender=GeographicDivision)
+@receiver(post_delete, sender=GeographicDivision)
+@receiver(post_save, sender=GeographicPlace._parler_meta.root_model)
+@receiver(post_delete, sender=GeographicPlace._parler_meta.root_model)
+@receiver(post_save, sender=GeographicDivision._parler_meta.root_model)
+@receiver(post_delete, sender=GeographicDivision._parler_meta.root_model)
+def place_record_changed(sender, instance, **kwargs):
+    # Translations are saved after their master, so they invalidate records on their own
+    invalidate_place_records()
+
+
+@receiver(post_save, sender=GeographicPlace._parler_meta.root_model)
+@receiver(post_delete, sender=GeographicPlace._parler_meta.root_model)
+@receiver(post_save, sender=GeographicDivision._parler_meta.root_model)
+@receiver(post_delete, sender=GeographicDivision._parler_meta.root_model)
+@receiver(post_save, sender=GeographicCategory._parler_meta.root_model)
+@receiver(post_delete, sender=GeographicCategory._parler_meta.root_model)
+def translation_changed(sender, instance, **kwargs):
+    invalidate_translations()
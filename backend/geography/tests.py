@@ -1,3 +1,255 @@
-from django.test import TestCase
+from unittest import mock
+import numpy as np
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase
+from . import place_cache, translations
+from .models import CacheVersion, GeographicCategory, GeographicDivision, GeographicPlace
+from .place_cache import PLACE_RECORDS_VERSION_KEY, get_place_record
+from .place_index import EARTH_RADIUS_METERS, PLACE_INDEX_VERSION_KEY, PlaceIndex
+from .signals import DeletedDivisionPaths
+from .translations import TRANSLATIONS_VERSION_KEY, place_names, resolve_translation
+from .versions import VersionBump, bump_version, get_version
 
-# Create your tests here.
+
+def great_circle_distances(latitude, longitude, latitudes, longitudes):
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    haversine = (
+        np.sin((latitudes - latitude) / 2) ** 2
+        + np.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(haversine))
+
+
+class PlaceIndexTests(SimpleTestCase):
+    def test_nearest_matches_brute_force_great_circle_search(self):
+        generator = np.random.default_rng(7)
+        latitudes = generator.uniform(34.8, 41.7, 2000)
+        longitudes = generator.uniform(19.3, 28.3, 2000)
+        index = PlaceIndex(np.arange(100, 2100), latitudes, longitudes)
+
+        for latitude, longitude in zip(generator.uniform(34.8, 41.7, 50), generator.uniform(19.3, 28.3, 50)):
+            distances = great_circle_distances(latitude, longitude, latitudes, longitudes)
+            place_id, distance = index.nearest(latitude, longitude)
+            self.assertEqual(place_id, 100 + int(np.argmin(distances)))
+            self.assertAlmostEqual(distance, distances.min(), delta=0.01)
+
+    def test_nearest_across_the_antimeridian(self):
+        index = PlaceIndex(np.array([1, 2]), np.array([0.0, 0.0]), np.array([179.9, 170.0]))
+
+        self.assertEqual(index.nearest(0.0, -179.9)[0], 1)
+
+    def test_empty_index_has_no_nearest_place(self):
+        index = PlaceIndex(np.array([], dtype=np.int64), np.array([]), np.array([]))
+
+        self.assertIsNone(index.nearest(37.9, 23.7))
+
+
+class GeographyTestCase(TestCase):
+    def setUp(self):
+        self.category = GeographicCategory.objects.create(slug='default')
+        self.division = GeographicDivision.objects.create(slug='attica')
+
+    def create_place(self, slug, latitude, longitude):
+        return GeographicPlace.objects.create(
+            slug=slug, latitude=latitude, longitude=longitude, category=self.category, admin_division=self.division,
+        )
+
+
+class GeographicPlaceValidationTests(GeographyTestCase):
+    def test_out_of_range_coordinates_are_rejected(self):
+        for latitude, longitude in [(90.5, 23.7), (-91.0, 23.7), (37.9, 180.5), (37.9, -181.0)]:
+            with self.subTest(latitude=latitude, longitude=longitude):
+                with self.assertRaises(ValidationError):
+                    self.create_place('out-of-range', latitude, longitude)
+
+    def test_coordinates_are_rounded_and_located(self):
+        place = self.create_place('athens', 37.98381234, 23.72753456)
+
+        self.assertEqual((place.latitude, place.longitude), (37.983812, 23.727535))
+        self.assertEqual((place.location.x, place.location.y), (23.727535, 37.983812))
+
+
+class VersionBumpTests(GeographyTestCase):
+    def test_saves_in_one_transaction_bump_each_version_once(self):
+        version = get_version(PLACE_INDEX_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for i in range(5):
+                self.create_place(f'place-{i}', 37.9 + i / 100, 23.7)
+
+        keys = [callback.key for callback in callbacks if isinstance(callback, VersionBump)]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertIn(PLACE_INDEX_VERSION_KEY, keys)
+        self.assertIn(PLACE_RECORDS_VERSION_KEY, keys)
+        self.assertEqual(get_version(PLACE_INDEX_VERSION_KEY), version + 1)
+
+    def test_rolled_back_savepoint_discards_its_bump(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    bump_version('test')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            bump_version('test')
+
+        self.assertEqual([callback.key for callback in callbacks], ['test'])
+
+    def test_bump_increments_the_shared_version(self):
+        VersionBump('test')()
+
+        self.assertEqual(CacheVersion.objects.get(key='test').version, 1)
+        self.assertEqual(get_version('test'), 1)
+
+
+class PlaceRecordCacheTests(GeographyTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        place_cache._records.clear()
+        self.place = self.create_place('athens', 37.9838, 23.7275)
+        self.place.set_current_language('en')
+        self.place.name = 'Athens'
+        self.place.save()
+
+    def change(self, instance, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            for name, value in fields.items():
+                setattr(instance, name, value)
+            instance.save()
+
+    def test_record_is_cached_in_process_and_in_the_shared_cache(self):
+        record = get_place_record('athens')
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_place_record('athens'), record)
+        place_cache._records.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_place_record('athens').name('en'), 'Athens')
+
+    def test_rename_invalidates_the_cached_record(self):
+        get_place_record('athens')
+
+        self.change(self.place, name='Athina')
+
+        self.assertEqual(get_place_record('athens').name('en'), 'Athina')
+        # Another process, with an empty LRU, does not read the stale shared record
+        place_cache._records.clear()
+        self.assertEqual(get_place_record('athens').name('en'), 'Athina')
+
+    def test_slug_change_invalidates_the_cached_record(self):
+        get_place_record('athens')
+
+        self.change(self.place, slug='athina')
+
+        self.assertIsNone(get_place_record('athens'))
+        self.assertEqual(get_place_record('athina').id, self.place.pk)
+
+    def test_division_slug_change_invalidates_the_cached_record(self):
+        get_place_record('athens')
+
+        self.change(self.division, slug='attiki')
+
+        self.assertEqual(get_place_record('athens').division_slugs, ['attiki'])
+        place_cache._records.clear()
+        self.assertEqual(get_place_record('athens').division_slug, 'attiki')
+
+
+class ResolveTranslationTests(SimpleTestCase):
+    def test_requested_language(self):
+        self.assertEqual(resolve_translation({'en': 'Athens', 'el': 'Αθήνα'}, 'el'), 'Αθήνα')
+
+    def test_falls_back_to_the_configured_fallback(self):
+        self.assertEqual(resolve_translation({'de': 'Athen', 'en': 'Athens'}, 'fr'), 'Athens')
+
+    def test_falls_back_to_the_default_language(self):
+        with mock.patch.object(translations.appsettings, 'PARLER_DEFAULT_LANGUAGE_CODE', 'el'):
+            self.assertEqual(resolve_translation({'de': 'Athen', 'el': 'Αθήνα'}, 'fr'), 'Αθήνα')
+
+    def test_any_language_is_picked_the_same_way_whatever_the_order(self):
+        self.assertEqual(resolve_translation({'it': 'Atene', 'de': 'Athen'}, 'fr'), 'Athen')
+        self.assertEqual(resolve_translation({'de': 'Athen', 'it': 'Atene'}, 'fr'), 'Athen')
+
+    def test_no_translations(self):
+        self.assertIsNone(resolve_translation({}, 'en'))
+
+
+class TranslationTableTests(GeographyTestCase):
+    def test_translation_change_invalidates_the_table(self):
+        place = self.create_place('athens', 37.9838, 23.7275)
+        place.set_current_language('en')
+        place.name = 'Athens'
+        with self.captureOnCommitCallbacks(execute=True):
+            place.save()
+        self.assertEqual(place_names.get(place.pk, 'en'), 'Athens')
+
+        place.name = 'Athina'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            place.save()
+
+        keys = [callback.key for callback in callbacks if isinstance(callback, VersionBump)]
+        self.assertEqual(keys.count(TRANSLATIONS_VERSION_KEY), 1)
+        self.assertEqual(place_names.get(place.pk, 'en'), 'Athina')
+
+
+class DivisionPathTests(TestCase):
+    def setUp(self):
+        # europe > greece > attica > athens, and greece > crete
+        self.europe = self.create_division('europe')
+        self.greece = self.create_division('greece', self.europe)
+        self.attica = self.create_division('attica', self.greece)
+        self.athens = self.create_division('athens', self.attica)
+        self.crete = self.create_division('crete', self.greece)
+
+    def create_division(self, slug, parent=None):
+        return GeographicDivision.objects.create(slug=slug, parent=parent)
+
+    def path(self, division):
+        division.refresh_from_db()
+        return division.ancestor_ids, division.ancestor_slugs
+
+    def test_path_runs_from_the_root_down(self):
+        ancestor_ids, ancestor_slugs = self.path(self.athens)
+
+        self.assertEqual(ancestor_ids, [self.europe.pk, self.greece.pk, self.attica.pk, self.athens.pk])
+        self.assertEqual(ancestor_slugs, ['europe', 'greece', 'attica', 'athens'])
+        self.assertEqual(self.athens.get_path_slugs(), ['europe', 'greece', 'attica', 'athens'])
+
+    def test_moving_a_division_updates_its_descendants(self):
+        self.attica.parent = self.crete
+        self.attica.save()
+
+        self.assertEqual(self.path(self.athens)[1], ['europe', 'greece', 'crete', 'attica', 'athens'])
+
+    def test_renaming_a_slug_updates_its_descendants(self):
+        self.greece.slug = 'hellas'
+        self.greece.save()
+
+        self.assertEqual(self.path(self.athens)[1], ['europe', 'hellas', 'attica', 'athens'])
+        self.assertEqual(self.path(self.crete)[1], ['europe', 'hellas', 'crete'])
+
+    def test_subtree(self):
+        self.assertEqual(
+            set(self.greece.subtree().values_list('slug', flat=True)), {'greece', 'attica', 'athens', 'crete'}
+        )
+        self.assertEqual(set(self.athens.subtree().values_list('slug', flat=True)), {'athens'})
+
+    def test_deleting_a_division_cuts_it_out_of_the_paths_below(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.greece.delete()
+
+        self.assertEqual(self.path(self.attica), ([self.attica.pk], ['attica']))
+        self.assertEqual(self.path(self.athens)[1], ['attica', 'athens'])
+        self.assertEqual(self.path(self.crete)[1], ['crete'])
+        self.assertEqual(self.path(self.europe)[1], ['europe'])
+
+    def test_deleting_many_divisions_updates_the_paths_once(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            GeographicDivision.objects.filter(slug__in=['greece', 'attica']).delete()
+
+        self.assertEqual(sum(isinstance(callback, DeletedDivisionPaths) for callback in callbacks), 1)
+        self.assertEqual(self.path(self.athens), ([self.athens.pk], ['athens']))
+        self.assertEqual(self.path(self.crete)[1], ['crete'])
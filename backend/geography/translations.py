@@ -0,0 +1,121 @@
+# geography/translations.py
+
+import threading
+from parler import appsettings
+from .models import GeographicCategory, GeographicDivision, GeographicPlace
+from .versions import bump_version, get_version
+
+# Bumped whenever a translation of a place, division or category changes (see versions.py)
+TRANSLATIONS_VERSION_KEY = 'translations'
+
+# Objects whose translations each process keeps per table
+TRANSLATION_TABLE_SIZE = 100000
+
+
+def resolve_translation(values, language_code):
+    """
+    Picks a translated value the way safe_translation_getter(..., any_language=True)
+    does: the language itself, then its fallback languages, then the default
+    language (PARLER_DEFAULT_LANGUAGE_CODE), then any language.
+
+    Args:
+        values (dict): Translated values keyed by language code.
+        language_code (str): Requested language.
+
+    Returns:
+        The translated value, or None if there are no translations.
+    """
+    if not values:
+        return None
+    for code in appsettings.PARLER_LANGUAGES.get_active_choices(language_code):
+        if code in values:
+            return values[code]
+    if appsettings.PARLER_DEFAULT_LANGUAGE_CODE in values:
+        return values[appsettings.PARLER_DEFAULT_LANGUAGE_CODE]
+    # Same pick in every process, whatever order the translations were loaded in
+    return values[min(values)]
+
+
+def load_translations(model, ids, field='name'):
+    """
+    Loads one translated field of many objects in a single query.
+
+    Args:
+        model (TranslatableModel): The translated model.
+        ids (list): Primary keys of the objects.
+        field (str): Translated field to load.
+
+    Returns:
+        dict: {language code: value} keyed by object id; objects without translations are left out.
+    """
+    translation_model = model._parler_meta.root_model
+    values = {}
+    rows = translation_model.objects.filter(master_id__in=ids).values_list('master_id', 'language_code', field)
+    for master_id, language_code, value in rows:
+        values.setdefault(master_id, {})[language_code] = value
+    return values
+
+
+def translations_version():
+    return get_version(TRANSLATIONS_VERSION_KEY)
+
+
+def invalidate_translations():
+    """Makes every process drop its translation tables."""
+    bump_version(TRANSLATIONS_VERSION_KEY)
+
+
+class TranslationTable:
+    """
+    Per-process table of one translated field in all languages, filled in bulk
+    for the objects asked for and dropped when any translation changes.
+    """
+
+    def __init__(self, model, field='name', max_size=TRANSLATION_TABLE_SIZE):
+        self.model = model
+        self.field = field
+        self.max_size = max_size
+        self._values = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_many(self, ids, language_code):
+        """
+        Resolves the field of many objects in one language, with at most one query.
+
+        Args:
+            ids (iterable): Primary keys of the objects.
+            language_code (str): Requested language.
+
+        Returns:
+            dict: The translated value (or None) keyed by object id.
+        """
+        ids = list(ids)
+        version = translations_version()
+        with self._lock:
+            if self._version != version:
+                self._values = {}
+                self._version = version
+            values = {object_id: self._values[object_id] for object_id in ids if object_id in self._values}
+
+        missing = [object_id for object_id in ids if object_id not in values]
+        if missing:
+            loaded = load_translations(self.model, missing, self.field)
+            loaded = {object_id: loaded.get(object_id, {}) for object_id in missing}
+            values.update(loaded)
+            with self._lock:
+                if self._version == version:
+                    if len(self._values) + len(loaded) > self.max_size:
+                        self._values = {}
+                    self._values.update(loaded)
+
+        return {object_id: resolve_translation(values[object_id], language_code) for object_id in ids}
+
+    def get(self, object_id, language_code):
+        return self.get_many([object_id], language_code)[object_id]
+
+
+place_names = TranslationTable(GeographicPlace)
+place_descriptions = TranslationTable(GeographicPlace, 'description')
+division_names = TranslationTable(GeographicDivision)
+category_names = TranslationTable(GeographicCategory)
@@ -0,0 +1,84 @@
+# geography/versions.py
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .models import CacheVersion
+
+# How long a process trusts its cached copy of a version; other processes see a bump within this time
+VERSION_CACHE_TIMEOUT = 60
+
+
+def _cache_key(key):
+    return f"geography:version:{key}"
+
+
+def get_version(key):
+    """
+    Returns the current version of some cached data, read from the database at most
+    once per VERSION_CACHE_TIMEOUT.
+
+    Args:
+        key (str): Name of the versioned data.
+
+    Returns:
+        int: The version, 0 if it was never bumped.
+    """
+    version = cache.get(_cache_key(key))
+    if version is None:
+        version = CacheVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+        cache.set(_cache_key(key), version, VERSION_CACHE_TIMEOUT)
+    return version
+
+
+class VersionBump:
+    """
+    Deferred bump of one version, run once the surrounding transaction commits.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def __call__(self):
+        with transaction.atomic():
+            CacheVersion.objects.get_or_create(key=self.key)
+            CacheVersion.objects.filter(key=self.key).update(version=F('version') + 1)
+        # This process (and any shared cache) sees the new version right away
+        cache.delete(_cache_key(self.key))
+
+
+def bump_version(key):
+    """
+    Invalidates some cached data in every process.
+
+    Inside a transaction the bump is deferred to its commit, and further bumps of
+    the same key in that transaction are dropped, so that saving many rows (admin
+    bulk edits, fixtures) costs one version UPDATE per key instead of one per row.
+
+    Args:
+        key (str): Name of the versioned data.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        VersionBump(key)()
+        return
+
+    # A rolled back transaction or savepoint also discards the bumps it scheduled
+    if scheduled_on_commit(lambda callback: isinstance(callback, VersionBump) and callback.key == key) is None:
+        transaction.on_commit(VersionBump(key))
+
+
+def scheduled_on_commit(match):
+    """
+    Returns a callback already scheduled to run when the current transaction commits.
+
+    Args:
+        match (callable): Predicate selecting the callback.
+
+    Returns:
+        callable or None: The first scheduled callback for which match is true.
+    """
+    for callback in transaction.get_connection().run_on_commit:
+        if match(callback[1]):
+            return callback[1]
+    return None
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from weather.models import ForecastCycle
 from weather_engine.models import GFSParameter
 
 @admin.register(GFSParameter)
@@ -15,4 +16,14 @@ class GFSParameterAdmin(admin.ModelAdmin):
     def disable_parameters(self, request, queryset):
         updated_count = queryset.update(enabled=False)
         self.message_user(request, f"{updated_count} parameters have been disabled.")
-    disable_parameters.short_description = "Disable selected parameters"
\ No newline at end of file
+    disable_parameters.short_description = "Disable selected parameters"
+
+@admin.register(ForecastCycle)
+class ForecastCycleAdmin(admin.ModelAdmin):
+    list_display = ('run_datetime', 'status', 'imported_files', 'expected_files', 'completed_at')
+    list_filter = ('status',)
+    ordering = ('-run_datetime',)
+    readonly_fields = (
+        'run_datetime', 'status', 'imported_files', 'imported_hours', 'expected_files', 'created_at', 'completed_at',
+        'payloads_rendered_at', 'updated_at',
+    )
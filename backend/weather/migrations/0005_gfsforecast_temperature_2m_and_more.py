@@ -0,0 +1,78 @@
+# Generated by Django 5.1.2 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0004_gfsforecast_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='temperature_2m',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='relative_humidity_2m',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='total_precipitation',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='convective_precipitation_rate',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='wind_u_10m',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='wind_v_10m',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='pressure_msl',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='gfsforecast',
+            name='low_cloud_cover',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        # Move the hot parameters of existing rows out of forecast_data
+        migrations.RunSQL(
+            sql="""
+                UPDATE weather_gfsforecast SET
+                    temperature_2m = (forecast_data->>'2t_level_2_heightAboveGround')::double precision,
+                    relative_humidity_2m = (forecast_data->>'2r_level_2_heightAboveGround')::double precision,
+                    total_precipitation = (forecast_data->>'tp_level_0_surface')::double precision,
+                    convective_precipitation_rate = (forecast_data->>'cprat_level_0_surface')::double precision,
+                    wind_u_10m = (forecast_data->>'10u_level_10_heightAboveGround')::double precision,
+                    wind_v_10m = (forecast_data->>'10v_level_10_heightAboveGround')::double precision,
+                    pressure_msl = (forecast_data->>'prmsl_level_0_meanSea')::double precision,
+                    low_cloud_cover = (forecast_data->>'lcc_level_0_lowCloudLayer')::double precision,
+                    forecast_data = forecast_data - ARRAY[
+                        '2t_level_2_heightAboveGround',
+                        '2r_level_2_heightAboveGround',
+                        'tp_level_0_surface',
+                        'cprat_level_0_surface',
+                        '10u_level_10_heightAboveGround',
+                        '10v_level_10_heightAboveGround',
+                        'prmsl_level_0_meanSea',
+                        'lcc_level_0_lowCloudLayer'
+                    ]
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,176 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Tags every forecast row with its ForecastCycle and rebuilds weather_gfsforecast
+# as a table list partitioned by cycle_id, so that a superseded cycle is removed
+# by dropping its partition. Existing rows were unique per run hour
+# (utc_cycle_time), so each run hour found becomes its own cycle, whose run time
+# is the last such hour at or before the run's earliest valid time; the latest
+# run is made current and the others superseded. Every row is copied once into
+# the partition of its own run. The primary key has to contain the partition key
+# and becomes (id, cycle_id); Django keeps treating id as the pk. The identity column of id
+# is replaced by a sequence default, which partitioned tables support.
+# Constraint and index names are the ones Django generated for the original table.
+# Reversing keeps the rows of the latest cycle of each run hour.
+
+PARTITION_GFSFORECAST_BY_CYCLE = """
+CREATE TEMPORARY TABLE weather_gfsforecast_runs AS
+SELECT
+    utc_cycle_time,
+    first_valid::date + make_interval(hours => utc_cycle_time::int)
+        - CASE WHEN first_valid::date + make_interval(hours => utc_cycle_time::int) > first_valid
+               THEN interval '1 day' ELSE interval '0' END AS run_datetime
+FROM (
+    SELECT utc_cycle_time, MIN(date + make_interval(hours => hour)) AS first_valid
+    FROM weather_gfsforecast
+    GROUP BY utc_cycle_time
+) AS runs;
+
+INSERT INTO weather_forecastcycle (run_datetime, status, expected_files, imported_files, created_at, completed_at)
+SELECT
+    run_datetime AT TIME ZONE 'UTC',
+    CASE WHEN run_datetime = MAX(run_datetime) OVER () THEN 'current' ELSE 'superseded' END,
+    0, 0, now(), now()
+FROM weather_gfsforecast_runs;
+
+ALTER TABLE weather_gfsforecast RENAME TO weather_gfsforecast_unpartitioned;
+
+CREATE TABLE weather_gfsforecast (
+    LIKE weather_gfsforecast_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    cycle_id bigint NOT NULL
+) PARTITION BY LIST (cycle_id);
+
+DO $$
+DECLARE
+    cycle_id bigint;
+BEGIN
+    FOR cycle_id IN SELECT id FROM weather_forecastcycle LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF weather_gfsforecast FOR VALUES IN (%s)',
+            'weather_gfsforecast_cycle_' || cycle_id, cycle_id
+        );
+    END LOOP;
+END
+$$;
+
+INSERT INTO weather_gfsforecast
+SELECT forecast.*, cycle.id
+FROM weather_gfsforecast_unpartitioned AS forecast
+JOIN weather_gfsforecast_runs AS runs ON runs.utc_cycle_time = forecast.utc_cycle_time
+JOIN weather_forecastcycle AS cycle ON cycle.run_datetime = runs.run_datetime AT TIME ZONE 'UTC';
+
+CREATE SEQUENCE weather_gfsforecast_partitioned_id_seq;
+SELECT setval(
+    'weather_gfsforecast_partitioned_id_seq',
+    (SELECT COALESCE(MAX(id), 0) + 1 FROM weather_gfsforecast_unpartitioned),
+    false
+);
+
+DROP TABLE weather_gfsforecast_unpartitioned;
+DROP TABLE weather_gfsforecast_runs;
+
+CREATE TABLE weather_gfsforecast_default PARTITION OF weather_gfsforecast DEFAULT;
+
+ALTER SEQUENCE weather_gfsforecast_partitioned_id_seq RENAME TO weather_gfsforecast_id_seq;
+ALTER SEQUENCE weather_gfsforecast_id_seq OWNED BY weather_gfsforecast.id;
+ALTER TABLE weather_gfsforecast ALTER COLUMN id SET DEFAULT nextval('weather_gfsforecast_id_seq');
+
+ALTER TABLE weather_gfsforecast ADD CONSTRAINT weather_gfsforecast_pkey PRIMARY KEY (id, cycle_id);
+ALTER TABLE weather_gfsforecast ADD CONSTRAINT weather_gfsforecast_cycle_id_place_id_date_hour_db081e56_uniq
+    UNIQUE (cycle_id, place_id, date, hour);
+ALTER TABLE weather_gfsforecast ADD CONSTRAINT weather_gfsforecast_cycle_id_aa6c59ca_fk_weather_f
+    FOREIGN KEY (cycle_id) REFERENCES weather_forecastcycle (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE weather_gfsforecast ADD CONSTRAINT weather_gfsforecast_place_id_acb88364_fk_geography
+    FOREIGN KEY (place_id) REFERENCES geography_geographicplace (id) DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX weather_gfsforecast_place_id_acb88364 ON weather_gfsforecast (place_id);
+CREATE INDEX weather_gfs_date_d387ca_idx ON weather_gfsforecast (date, hour);
+CREATE INDEX weather_gfs_place_i_d5448b_idx ON weather_gfsforecast (place_id, date);
+CREATE INDEX weather_gfs_utc_cyc_d54fd0_idx ON weather_gfsforecast (utc_cycle_time);
+CREATE INDEX weather_gfsforecast_location_id ON weather_gfsforecast USING gist (location);
+"""
+
+
+UNPARTITION_GFSFORECAST = """
+ALTER TABLE weather_gfsforecast RENAME TO weather_gfsforecast_partitioned;
+
+CREATE TABLE weather_gfsforecast (LIKE weather_gfsforecast_partitioned INCLUDING CONSTRAINTS);
+ALTER TABLE weather_gfsforecast DROP COLUMN cycle_id;
+
+DO $$
+DECLARE
+    columns text;
+BEGIN
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO columns
+    FROM pg_attribute
+    WHERE attrelid = 'weather_gfsforecast'::regclass AND attnum > 0 AND NOT attisdropped;
+    EXECUTE format(
+        'INSERT INTO weather_gfsforecast (%1$s) SELECT %1$s FROM ('
+        '    SELECT DISTINCT ON (forecast.place_id, forecast.date, forecast.hour, forecast.utc_cycle_time) forecast.*'
+        '    FROM weather_gfsforecast_partitioned AS forecast'
+        '    JOIN weather_forecastcycle AS cycle ON cycle.id = forecast.cycle_id'
+        '    ORDER BY forecast.place_id, forecast.date, forecast.hour, forecast.utc_cycle_time, cycle.run_datetime DESC'
+        ') AS latest',
+        columns
+    );
+END
+$$;
+
+DROP TABLE weather_gfsforecast_partitioned;
+
+ALTER TABLE weather_gfsforecast ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+SELECT setval(pg_get_serial_sequence('weather_gfsforecast', 'id'), COALESCE(MAX(id), 0) + 1, false)
+FROM weather_gfsforecast;
+
+ALTER TABLE weather_gfsforecast ADD CONSTRAINT weather_gfsforecast_pkey PRIMARY KEY (id);
+ALTER TABLE weather_gfsforecast ADD CONSTRAINT weather_gfsforecast_place_id_date_hour_utc_c_5f7231ba_uniq
+    UNIQUE (place_id, date, hour, utc_cycle_time);
+ALTER TABLE weather_gfsforecast ADD CONSTRAINT weather_gfsforecast_place_id_acb88364_fk_geography
+    FOREIGN KEY (place_id) REFERENCES geography_geographicplace (id) DEFERRABLE INITIALLY DEFERRED;
+CREATE INDEX weather_gfsforecast_place_id_acb88364 ON weather_gfsforecast (place_id);
+CREATE INDEX weather_gfs_date_d387ca_idx ON weather_gfsforecast (date, hour);
+CREATE INDEX weather_gfs_place_i_d5448b_idx ON weather_gfsforecast (place_id, date);
+CREATE INDEX weather_gfs_utc_cyc_d54fd0_idx ON weather_gfsforecast (utc_cycle_time);
+CREATE INDEX weather_gfsforecast_location_id ON weather_gfsforecast USING gist (location);
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0005_gfsforecast_temperature_2m_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastCycle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_datetime', models.DateTimeField(unique=True)),
+                ('status', models.CharField(choices=[('importing', 'Importing'), ('current', 'Current'), ('superseded', 'Superseded')], default='importing', max_length=12)),
+                ('expected_files', models.PositiveIntegerField(default=0)),
+                ('imported_files', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-run_datetime'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'current')), fields=('status',), name='weather_forecastcycle_single_current')],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(sql=PARTITION_GFSFORECAST_BY_CYCLE, reverse_sql=UNPARTITION_GFSFORECAST),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='gfsforecast',
+                    name='cycle',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='weather.forecastcycle'),
+                    preserve_default=False,
+                ),
+                migrations.AlterUniqueTogether(
+                    name='gfsforecast',
+                    unique_together={('cycle', 'place', 'date', 'hour')},
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.2 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geography', '0008_remove_geographicdivision_geographic_data_and_more'),
+        ('weather', '0007_forecastcycle_partition_gfsforecast_by_cycle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceForecastPayload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cycle', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='payloads', to='weather.forecastcycle')),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecast_payloads', to='geography.geographicplace')),
+            ],
+            options={
+                'unique_together': {('cycle', 'place')},
+            },
+        ),
+    ]
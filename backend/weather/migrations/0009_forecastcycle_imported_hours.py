@@ -0,0 +1,17 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0008_placeforecastpayload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastcycle',
+            name='imported_hours',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.PositiveSmallIntegerField(), blank=True, default=list, size=None),
+        ),
+    ]
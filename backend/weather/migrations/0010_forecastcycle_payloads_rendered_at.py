@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0009_forecastcycle_imported_hours'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastcycle',
+            name='payloads_rendered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,3 +1,5 @@
 # weather/models/__init__.py
 
-from .model_gfs_forecast import GFSForecast
+from .model_forecast_cycle import ForecastCycle
+from .model_gfs_forecast import GFSForecast, HOT_PARAMETER_FIELDS
+from .model_place_forecast_payload import PlaceForecastPayload
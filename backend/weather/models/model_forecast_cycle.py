@@ -0,0 +1,143 @@
+from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+# Cached summary of the current cycle; processes whose cache is not shared pick up a switch after the timeout
+CURRENT_CYCLE_CACHE_KEY = 'weather:current_cycle'
+CURRENT_CYCLE_CACHE_TIMEOUT = 60
+
+
+class ForecastCycleManager(models.Manager):
+    def current(self):
+        """Return the cycle served to readers, or None before the first complete import."""
+        return self.filter(status=ForecastCycle.STATUS_CURRENT).first()
+
+    def current_summary(self):
+        """
+        Return id, revision, run_datetime, completed_at, updated_at and is_complete of the
+        current cycle, cached between requests.
+        The id is 0, the revision '0' and the datetimes None if there is no current cycle.
+        """
+        summary = cache.get(CURRENT_CYCLE_CACHE_KEY)
+        if summary is None:
+            cycle = self.current()
+            summary = {
+                'id': cycle.pk if cycle is not None else 0,
+                'revision': cycle.revision if cycle is not None else '0',
+                'run_datetime': cycle.run_datetime if cycle is not None else None,
+                'completed_at': cycle.completed_at if cycle is not None else None,
+                'updated_at': cycle.updated_at if cycle is not None else None,
+                'is_complete': cycle.is_complete if cycle is not None else False,
+            }
+            cache.set(CURRENT_CYCLE_CACHE_KEY, summary, CURRENT_CYCLE_CACHE_TIMEOUT)
+        return summary
+
+    def forget_current_summary(self):
+        """Drop the cached summary once the current transaction commits, e.g. after the current cycle changed."""
+        transaction.on_commit(lambda: cache.delete(CURRENT_CYCLE_CACHE_KEY))
+
+    def current_id(self):
+        """Return the id of the current cycle (0 if there is none), cached between requests."""
+        return self.current_summary()['id']
+
+    def register(self, run_datetime, expected_files=0):
+        """Get or create the cycle of a GFS run, raising its expected file count if needed."""
+        cycle, _ = self.get_or_create(run_datetime=run_datetime)
+        if expected_files > cycle.expected_files:
+            self.filter(pk=cycle.pk).update(expected_files=expected_files)
+            cycle.expected_files = expected_files
+        return cycle
+
+
+class ForecastCycle(models.Model):
+    STATUS_IMPORTING = 'importing'
+    STATUS_CURRENT = 'current'
+    STATUS_SUPERSEDED = 'superseded'
+    STATUS_CHOICES = [
+        (STATUS_IMPORTING, 'Importing'),
+        (STATUS_CURRENT, 'Current'),
+        (STATUS_SUPERSEDED, 'Superseded'),
+    ]
+
+    run_datetime = models.DateTimeField(unique=True)  # GFS run (cycle) time, UTC
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_IMPORTING)
+    expected_files = models.PositiveIntegerField(default=0)  # 0 while unknown
+    imported_files = models.PositiveIntegerField(default=0)  # Number of distinct imported_hours
+    imported_hours = ArrayField(models.PositiveSmallIntegerField(), default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    payloads_rendered_at = models.DateTimeField(null=True, blank=True)  # Set once PlaceForecastPayloads are stored
+    # Last change of what readers get: activation, an imported hour or rendered payloads
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ForecastCycleManager()
+
+    class Meta:
+        ordering = ['-run_datetime']
+        constraints = [
+            # The "current cycle" pointer: at most one cycle is served at a time
+            models.UniqueConstraint(
+                fields=['status'],
+                condition=Q(status='current'),
+                name='weather_forecastcycle_single_current',
+            ),
+        ]
+
+    @property
+    def is_complete(self):
+        return self.expected_files > 0 and self.imported_files >= self.expected_files
+
+    @property
+    def revision(self):
+        """Identifies the served content: responses cached under one revision are not reused for the next."""
+        return f"{self.pk}.{int(self.updated_at.timestamp() * 1000000)}"
+
+    def record_imported_file(self, forecast_hour):
+        """
+        Record the forecast hour of one imported GRIB file. Importing the same hour
+        again (a retry or a duplicate file) does not count twice.
+        Returns True if the cycle is complete but not yet published: for the file
+        that completed it, and for any later file while publication is pending.
+        """
+        with transaction.atomic():
+            locked = ForecastCycle.objects.select_for_update().get(pk=self.pk)
+            if forecast_hour not in locked.imported_hours:
+                locked.imported_hours = sorted([*locked.imported_hours, forecast_hour])
+                locked.imported_files = len(locked.imported_hours)
+                locked.save(update_fields=['imported_hours', 'imported_files', 'updated_at'])
+                if locked.status == self.STATUS_CURRENT:
+                    # A published cycle that is still streaming in serves the new hour
+                    ForecastCycle.objects.forget_current_summary()
+        self.imported_hours = locked.imported_hours
+        self.imported_files = locked.imported_files
+        self.updated_at = locked.updated_at
+        self.expected_files = locked.expected_files
+        self.status = locked.status
+        return self.status == self.STATUS_IMPORTING and self.is_complete
+
+    def activate(self):
+        """
+        Make this cycle the current one in a single transaction.
+        A cycle older than the current one is marked superseded instead.
+        """
+        with transaction.atomic():
+            current = ForecastCycle.objects.select_for_update().filter(status=self.STATUS_CURRENT).first()
+            if current is not None and current.pk != self.pk:
+                if current.run_datetime > self.run_datetime:
+                    self.status = self.STATUS_SUPERSEDED
+                    self.save(update_fields=['status'])
+                    return False
+                current.status = self.STATUS_SUPERSEDED
+                current.save(update_fields=['status'])
+
+            self.status = self.STATUS_CURRENT
+            self.completed_at = self.completed_at or timezone.now()
+            self.save(update_fields=['status', 'completed_at', 'updated_at'])
+            # Responses are cached per cycle revision, so forgetting the cached cycle invalidates them all
+            ForecastCycle.objects.forget_current_summary()
+        return True
+
+    def __str__(self):
+        return f"GFS cycle {self.run_datetime:%Y-%m-%d %H}Z ({self.status})"
@@ -1,7 +1,27 @@
 from django.contrib.gis.db import models
 from geography.models import GeographicPlace
+from .model_forecast_cycle import ForecastCycle
 
+# Frequently read GRIB parameters stored in their own columns instead of forecast_data
+HOT_PARAMETER_FIELDS = {
+    '2t_level_2_heightAboveGround': 'temperature_2m',
+    '2r_level_2_heightAboveGround': 'relative_humidity_2m',
+    'tp_level_0_surface': 'total_precipitation',
+    'cprat_level_0_surface': 'convective_precipitation_rate',
+    '10u_level_10_heightAboveGround': 'wind_u_10m',
+    '10v_level_10_heightAboveGround': 'wind_v_10m',
+    'prmsl_level_0_meanSea': 'pressure_msl',
+    'lcc_level_0_lowCloudLayer': 'low_cloud_cover',
+}
+
+# Stored in one list partition per cycle (migration 0007), see weather_engine.forecast_partitions
 class GFSForecast(models.Model):
+    cycle = models.ForeignKey(
+        ForecastCycle,
+        on_delete=models.CASCADE,
+        related_name='forecasts',
+        db_index=False,  # Partition key, leads the unique constraint
+    )
     place = models.ForeignKey(
         GeographicPlace,
         on_delete=models.CASCADE,
@@ -13,14 +33,23 @@ class GFSForecast(models.Model):
         max_length=2,
         choices=[('00', '00'), ('06', '06'), ('12', '12'), ('18', '18')]
     )
-    forecast_data = models.JSONField()
+    forecast_data = models.JSONField()  # Parameters not listed in HOT_PARAMETER_FIELDS
+
+    temperature_2m = models.FloatField(null=True, blank=True)  # K
+    relative_humidity_2m = models.FloatField(null=True, blank=True)  # %
+    total_precipitation = models.FloatField(null=True, blank=True)  # kg m-2
+    convective_precipitation_rate = models.FloatField(null=True, blank=True)  # kg m-2 s-1
+    wind_u_10m = models.FloatField(null=True, blank=True)  # m/s
+    wind_v_10m = models.FloatField(null=True, blank=True)  # m/s
+    pressure_msl = models.FloatField(null=True, blank=True)  # Pa
+    low_cloud_cover = models.FloatField(null=True, blank=True)  # %
 
     latitude = models.FloatField()
     longitude = models.FloatField()
     location = models.PointField(null=True, blank=True)  # Make the field nullable
 
     class Meta:
-        unique_together = ('place', 'date', 'hour', 'utc_cycle_time')
+        unique_together = ('cycle', 'place', 'date', 'hour')
         indexes = [
             models.Index(fields=['date', 'hour']),
             models.Index(fields=['place', 'date']),
@@ -28,5 +57,14 @@ class GFSForecast(models.Model):
         ]
         ordering = ['date', 'hour', 'utc_cycle_time']
 
+    def get_forecast_data(self):
+        """Return all parameters keyed by GRIB parameter name, hot columns included."""
+        forecast_data = dict(self.forecast_data)
+        for param_name, field_name in HOT_PARAMETER_FIELDS.items():
+            value = getattr(self, field_name)
+            if value is not None:
+                forecast_data[param_name] = value
+        return forecast_data
+
     def __str__(self):
         return f"Forecast for {self.place.name} on {self.date} at {self.hour}:00 UTC"
@@ -0,0 +1,26 @@
+from django.db import models
+from geography.models import GeographicPlace
+from .model_forecast_cycle import ForecastCycle
+
+
+class PlaceForecastPayload(models.Model):
+    """The rendered hourly weather response of one place for one cycle."""
+    cycle = models.ForeignKey(
+        ForecastCycle,
+        on_delete=models.CASCADE,
+        related_name='payloads',
+        db_index=False,  # Leads the unique constraint
+    )
+    place = models.ForeignKey(
+        GeographicPlace,
+        on_delete=models.CASCADE,
+        related_name='forecast_payloads'
+    )
+    payload = models.BinaryField()  # gzip compressed JSON
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('cycle', 'place')
+
+    def __str__(self):
+        return f"Forecast payload for place {self.place_id} in cycle {self.cycle_id}"
@@ -0,0 +1,76 @@
+from datetime import date, datetime, timezone
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from geography.models import GeographicCategory, GeographicDivision, GeographicPlace
+
+UNPARTITIONED = [('weather', '0005_gfsforecast_temperature_2m_and_more')]
+PARTITIONED = [('weather', '0007_forecastcycle_partition_gfsforecast_by_cycle')]
+
+
+def migrate(targets):
+    """Migrate the test database to targets and return the historical apps at that state."""
+    executor = MigrationExecutor(connection)
+    executor.migrate(targets)
+    executor.loader.build_graph()
+    return executor.loader.project_state(targets).apps
+
+
+class PartitionGFSForecastByCycleMigrationTests(TransactionTestCase):
+    def setUp(self):
+        category = GeographicCategory.objects.create(slug='default')
+        division = GeographicDivision.objects.create(slug='default')
+        self.place = GeographicPlace.objects.create(
+            slug='athens', latitude=37.9838, longitude=23.7275, category=category, admin_division=division,
+        )
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_each_run_becomes_its_own_cycle(self):
+        apps = migrate(UNPARTITIONED)
+        GFSForecast = apps.get_model('weather', 'GFSForecast')
+        # Same place, date and hour in the 00Z and 06Z runs, which the old unique key allowed
+        for utc_cycle_time, hour, temperature in [('00', 0, 280.0), ('00', 6, 281.0), ('06', 6, 282.0)]:
+            GFSForecast.objects.create(
+                place_id=self.place.pk, date=date(2026, 10, 17), hour=hour, utc_cycle_time=utc_cycle_time,
+                forecast_data={}, temperature_2m=temperature, latitude=37.9838, longitude=23.7275,
+            )
+
+        apps = migrate(PARTITIONED)
+        ForecastCycle = apps.get_model('weather', 'ForecastCycle')
+        GFSForecast = apps.get_model('weather', 'GFSForecast')
+
+        cycles = {cycle.run_datetime: cycle for cycle in ForecastCycle.objects.all()}
+        first_run = cycles[datetime(2026, 10, 17, 0, tzinfo=timezone.utc)]
+        second_run = cycles[datetime(2026, 10, 17, 6, tzinfo=timezone.utc)]
+        self.assertEqual(len(cycles), 2)
+        self.assertEqual(first_run.status, 'superseded')
+        self.assertEqual(second_run.status, 'current')
+
+        self.assertEqual(
+            sorted(GFSForecast.objects.filter(cycle=first_run).values_list('hour', 'temperature_2m')),
+            [(0, 280.0), (6, 281.0)],
+        )
+        self.assertEqual(
+            list(GFSForecast.objects.filter(cycle=second_run).values_list('hour', 'temperature_2m')),
+            [(6, 282.0)],
+        )
+
+    def test_reversing_keeps_the_latest_run_of_each_run_hour(self):
+        migrate(UNPARTITIONED)
+        apps = migrate(PARTITIONED)
+        ForecastCycle = apps.get_model('weather', 'ForecastCycle')
+        GFSForecast = apps.get_model('weather', 'GFSForecast')
+        for day, temperature in [(16, 279.0), (17, 283.0)]:
+            cycle = ForecastCycle.objects.create(run_datetime=datetime(2026, 10, day, 0, tzinfo=timezone.utc))
+            GFSForecast.objects.create(
+                cycle=cycle, place_id=self.place.pk, date=date(2026, 10, 17), hour=12, utc_cycle_time='00',
+                forecast_data={}, temperature_2m=temperature, latitude=37.9838, longitude=23.7275,
+            )
+
+        apps = migrate(UNPARTITIONED)
+        GFSForecast = apps.get_model('weather', 'GFSForecast')
+
+        self.assertEqual(list(GFSForecast.objects.values_list('temperature_2m', flat=True)), [283.0])
@@ -0,0 +1,108 @@
+# weather_engine/forecast_loader.py
+
+import csv
+import io
+import json
+import logging
+from django.db import connection, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from weather.models import GFSForecast, HOT_PARAMETER_FIELDS
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "gfsforecast_staging"
+
+HOT_COLUMNS = tuple(HOT_PARAMETER_FIELDS.values())
+
+STAGING_COLUMNS = (
+    'cycle_id', 'place_id', 'date', 'hour', 'utc_cycle_time', 'latitude', 'longitude', 'forecast_data',
+) + HOT_COLUMNS
+
+
+def _staging_rows(forecast_data):
+    for data in forecast_data:
+        # Hot parameters go to their typed columns, the long tail stays in JSON
+        long_tail = dict(data['forecast_data'])
+        hot_values = tuple(long_tail.pop(param_name, None) for param_name in HOT_PARAMETER_FIELDS)
+        yield (
+            data['cycle_id'],
+            data['place_id'],
+            data['date'],
+            data['hour'],
+            data['utc_cycle_time'],
+            data['latitude'],
+            data['longitude'],
+            json.dumps(long_tail),
+        ) + hot_values
+
+
+def _copy_into_staging(cursor, forecast_data):
+    columns = ', '.join(STAGING_COLUMNS)
+    if is_psycopg3:
+        with cursor.cursor.copy(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN") as copy:
+            for row in _staging_rows(forecast_data):
+                copy.write_row(row)
+    else:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(_staging_rows(forecast_data))
+        buffer.seek(0)
+        cursor.cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def copy_forecast_rows(forecast_data):
+    """
+    Upserts forecast rows by streaming them with COPY into a staging table and
+    merging into GFSForecast with a single INSERT ... ON CONFLICT.
+
+    Existing rows keep their forecast_data keys; keys present in the new data win.
+    Parameters listed in HOT_PARAMETER_FIELDS are written to their typed columns
+    instead of forecast_data.
+
+    Args:
+        forecast_data (list): Dicts with cycle_id, place_id, date, hour, utc_cycle_time,
+            latitude, longitude and forecast_data. Keys must be unique within the list.
+
+    Returns:
+        int: Number of rows inserted or updated.
+    """
+    if not forecast_data:
+        return 0
+
+    table = GFSForecast._meta.db_table
+    columns = ', '.join(STAGING_COLUMNS)
+    hot_column_definitions = ''.join(f",\n                {column} double precision" for column in HOT_COLUMNS)
+    # Parameters missing from this batch keep their stored value
+    hot_column_updates = ''.join(
+        f",\n                {column} = COALESCE(EXCLUDED.{column}, forecast.{column})" for column in HOT_COLUMNS
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Temporary tables are never WAL-logged and are private to the connection
+        cursor.execute(f"""
+            CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+                cycle_id bigint NOT NULL,
+                place_id integer NOT NULL,
+                date date NOT NULL,
+                hour smallint NOT NULL,
+                utc_cycle_time varchar(2) NOT NULL,
+                latitude double precision NOT NULL,
+                longitude double precision NOT NULL,
+                forecast_data jsonb NOT NULL{hot_column_definitions}
+            ) ON COMMIT DELETE ROWS
+        """)
+        cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+
+        _copy_into_staging(cursor, forecast_data)
+
+        cursor.execute(f"""
+            INSERT INTO {table} AS forecast ({columns})
+            SELECT {columns} FROM {STAGING_TABLE}
+            ON CONFLICT (cycle_id, place_id, date, hour) DO UPDATE SET
+                forecast_data = forecast.forecast_data || EXCLUDED.forecast_data,
+                latitude = EXCLUDED.latitude,
+                longitude = EXCLUDED.longitude{hot_column_updates}
+        """)
+        merged = cursor.rowcount
+
+    logger.info("Merged %d forecast rows into %s", merged, table)
+    return merged
@@ -0,0 +1,137 @@
+# weather_engine/forecast_partitions.py
+
+import logging
+import re
+from django.db import connection, transaction
+from django.db.models import Q
+from weather.models import ForecastCycle, GFSForecast
+
+logger = logging.getLogger(__name__)
+
+
+def partition_name(cycle):
+    return f"{GFSForecast._meta.db_table}_cycle_{cycle.pk}"
+
+
+def list_forecast_partitions():
+    """
+    Returns the per cycle partitions of the GFSForecast table.
+
+    Returns:
+        dict: Partition name keyed by ForecastCycle id.
+    """
+    table = GFSForecast._meta.db_table
+    pattern = re.compile(rf"^{re.escape(table)}_cycle_(\d+)$")
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+        """, [table])
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            partitions[int(match.group(1))] = name
+    return partitions
+
+
+def ensure_cycle_partition(cycle):
+    """
+    Creates the partition holding the forecast rows of a cycle.
+
+    Must run before the cycle's rows are written, and not concurrently for the
+    same cycle; rows of a cycle without a partition land in the default partition.
+
+    Args:
+        cycle (ForecastCycle): Cycle to create the partition for.
+
+    Returns:
+        bool: True if the partition was created.
+    """
+    if cycle.pk in list_forecast_partitions():
+        return False
+
+    name = partition_name(cycle)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {GFSForecast._meta.db_table} "
+            f"FOR VALUES IN ({int(cycle.pk)})"
+        )
+    logger.info("Created forecast partition %s for %s", name, cycle)
+    return True
+
+
+def drop_cycle(cycle):
+    """
+    Removes a cycle and its forecast rows by detaching and dropping its partition.
+
+    Args:
+        cycle (ForecastCycle): Cycle to remove; must not be the current cycle.
+    """
+    table = GFSForecast._meta.db_table
+    name = list_forecast_partitions().get(cycle.pk)
+
+    with transaction.atomic():
+        if name is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+                cursor.execute(f"DROP TABLE {name}")
+        # Only rows that ended up in the default partition are left to cascade
+        cycle.delete()
+    logger.info("Dropped %s", cycle)
+
+
+def previous_cycle(current):
+    """
+    Returns the cycle served before the current one, or None.
+
+    Cycles superseded without ever being served have no completed_at.
+    """
+    return (
+        ForecastCycle.objects
+        .filter(
+            status=ForecastCycle.STATUS_SUPERSEDED,
+            completed_at__isnull=False,
+            run_datetime__lt=current.run_datetime,
+        )
+        .order_by('-run_datetime')
+        .first()
+    )
+
+
+def drop_expired_cycles(cutoff_datetime):
+    """
+    Drops every cycle that readers can no longer be switched to: cycles older
+    than the current one, and unfinished cycles that started before the cutoff.
+
+    The cycle served before the current one is kept until the next one is
+    published, since workers whose cached current cycle summary has not expired
+    yet still read it.
+
+    Args:
+        cutoff_datetime (datetime): Unfinished cycles older than this are dropped.
+
+    Returns:
+        int: Number of cycles dropped.
+    """
+    expired = Q(run_datetime__lt=cutoff_datetime)
+    current = ForecastCycle.objects.current()
+    if current is not None:
+        expired |= Q(run_datetime__lt=current.run_datetime)
+
+    cycles = ForecastCycle.objects.filter(expired).exclude(status=ForecastCycle.STATUS_CURRENT)
+    previous = previous_cycle(current) if current is not None else None
+    if previous is not None:
+        cycles = cycles.exclude(pk=previous.pk)
+
+    dropped = 0
+    for cycle in cycles:
+        drop_cycle(cycle)
+        dropped += 1
+    return dropped
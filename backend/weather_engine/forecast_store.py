@@ -0,0 +1,240 @@
+# weather_engine/forecast_store.py
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+import numpy as np
+from .grid_index import GridDomain
+
+logger = logging.getLogger(__name__)
+
+# Root directory holding one sub-directory per GFS cycle
+FORECAST_STORE_DIRECTORY = os.path.join("data", "forecast_store")
+
+MANIFEST_NAME = "manifest.json"
+CUBE_NAME = "cube.npy"
+# One empty marker file per forecast hour written, safe to create from concurrent import workers
+WRITTEN_HOURS_DIRECTORY = "written_hours"
+
+# Opened cubes keyed by manifest path, invalidated by manifest modification time
+_open_cubes = {}
+
+
+def cycle_directory_name(cycle_datetime):
+    return cycle_datetime.strftime('%Y%m%d_%H')
+
+
+class ForecastCube:
+    """
+    One GFS cycle stored as a memory-mapped float32 array of shape
+    (parameter, forecast hour, latitude, longitude), cropped to our domain,
+    next to a small JSON manifest describing the axes.
+    """
+
+    def __init__(self, directory, manifest, data):
+        self.directory = directory
+        self.manifest = manifest
+        self.data = data
+        self.domain = GridDomain.from_dict(manifest['domain'])
+        self.cycle_datetime = datetime.fromisoformat(manifest['cycle'])
+        self.parameters = manifest['parameters']
+        self.forecast_hours = manifest['forecast_hours']
+        self._parameter_positions = {name: i for i, name in enumerate(self.parameters)}
+        self._hour_positions = {hour: i for i, hour in enumerate(self.forecast_hours)}
+
+    @property
+    def complete(self):
+        return self.manifest.get('complete', False)
+
+    @classmethod
+    def create(cls, cycle_datetime, forecast_hours, parameters, domain, directory=FORECAST_STORE_DIRECTORY):
+        """
+        Allocates an empty (NaN filled) cube for a cycle, replacing any previous one.
+
+        Args:
+            cycle_datetime (datetime): Cycle (run) time, timezone aware.
+            forecast_hours (list): Forecast hours forming the time axis.
+            parameters (list): Forecast data keys forming the parameter axis.
+            domain (GridDomain): Window of the GRIB grid to store.
+            directory (str): Root of the forecast store.
+
+        Returns:
+            ForecastCube: The cube, opened for writing.
+        """
+        cycle_directory = os.path.join(directory, cycle_directory_name(cycle_datetime))
+        os.makedirs(cycle_directory, exist_ok=True)
+        shutil.rmtree(os.path.join(cycle_directory, WRITTEN_HOURS_DIRECTORY), ignore_errors=True)
+
+        rows, columns = domain.shape
+        data = np.lib.format.open_memmap(
+            os.path.join(cycle_directory, CUBE_NAME),
+            mode='w+',
+            dtype=np.float32,
+            shape=(len(parameters), len(forecast_hours), rows, columns),
+        )
+        data[:] = np.nan
+
+        manifest = {
+            'cycle': cycle_datetime.isoformat(),
+            'forecast_hours': sorted(forecast_hours),
+            'parameters': list(parameters),
+            'domain': domain.to_dict(),
+            'complete': False,
+        }
+        cube = cls(cycle_directory, manifest, data)
+        cube.save_manifest()
+        logger.info("Created forecast cube %s with shape %s", cycle_directory, data.shape)
+        return cube
+
+    @classmethod
+    def open(cls, cycle_directory, mode='r'):
+        with open(os.path.join(cycle_directory, MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+        data = np.load(os.path.join(cycle_directory, CUBE_NAME), mmap_mode=mode)
+        return cls(cycle_directory, manifest, data)
+
+    def save_manifest(self):
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(self.manifest, file)
+        os.replace(temp_path, path)
+
+    def has_parameter(self, parameter):
+        return parameter in self._parameter_positions
+
+    def write_field(self, parameter, forecast_hour, values):
+        """
+        Stores one cropped field.
+
+        Args:
+            parameter (str): Forecast data key.
+            forecast_hour (int): Forecast hour of the field.
+            values (numpy.ndarray): Field already cropped to the cube domain.
+        """
+        self.data[self._parameter_positions[parameter], self._hour_positions[forecast_hour]] = values
+
+    def flush(self):
+        self.data.flush()
+
+    def mark_hour_written(self, forecast_hour):
+        """Records that every field of a forecast hour has been written and flushed."""
+        hours_directory = os.path.join(self.directory, WRITTEN_HOURS_DIRECTORY)
+        os.makedirs(hours_directory, exist_ok=True)
+        open(os.path.join(hours_directory, f"{forecast_hour:03d}"), 'w').close()
+
+    def written_hours(self):
+        hours_directory = os.path.join(self.directory, WRITTEN_HOURS_DIRECTORY)
+        if not os.path.isdir(hours_directory):
+            return []
+        return sorted(int(name) for name in os.listdir(hours_directory) if name.isdigit())
+
+    def mark_complete(self):
+        self.flush()
+        self.manifest['complete'] = True
+        self.save_manifest()
+
+    def mark_incomplete(self):
+        self.manifest['complete'] = False
+        self.save_manifest()
+
+    def valid_datetimes(self):
+        return [self.cycle_datetime + timedelta(hours=hour) for hour in self.forecast_hours]
+
+    def series(self, latitude, longitude):
+        """
+        Slices the time series of every parameter at the grid point nearest to a coordinate.
+
+        Args:
+            latitude (float): Latitude of the location.
+            longitude (float): Longitude of the location.
+
+        Returns:
+            list or None: (valid datetime, forecast data dict) per forecast hour,
+            or None if the location lies outside the cube domain.
+        """
+        position = self.domain.nearest(latitude, longitude)
+        if position is None:
+            return None
+
+        row, column = position
+        # (parameter, hour) -> (hour, parameter)
+        values = self.data[:, :, row, column].T.tolist()
+        return [
+            (
+                valid_datetime,
+                {name: None if value != value else value for name, value in zip(self.parameters, hour_values)},
+            )
+            for valid_datetime, hour_values in zip(self.valid_datetimes(), values)
+        ]
+
+
+def latest_cube(until=None, directory=FORECAST_STORE_DIRECTORY):
+    """
+    Returns the most recent complete cube, reusing already opened memory maps.
+
+    Args:
+        until (datetime): Latest cycle to consider, normally the current ForecastCycle,
+            so that a cube is only served once its cycle has been published.
+        directory (str): Root of the forecast store.
+
+    Returns:
+        ForecastCube or None: The cube, or None if no complete cycle is stored.
+    """
+    if not os.path.isdir(directory):
+        return None
+
+    for name in sorted(os.listdir(directory), reverse=True):
+        if until is not None and name > cycle_directory_name(until):
+            continue
+        manifest_path = os.path.join(directory, name, MANIFEST_NAME)
+        try:
+            modified = os.path.getmtime(manifest_path)
+        except OSError:
+            continue
+
+        cached = _open_cubes.get(manifest_path)
+        if cached is not None and cached[0] == modified:
+            cube = cached[1]
+        else:
+            try:
+                cube = ForecastCube.open(os.path.join(directory, name))
+            except Exception as e:
+                logger.warning("Could not open forecast cube %s: %s", name, e)
+                continue
+            _open_cubes[manifest_path] = (modified, cube)
+
+        if cube.complete:
+            return cube
+
+    return None
+
+
+def remove_expired_cubes(cutoff_datetime, keep=None, directory=FORECAST_STORE_DIRECTORY):
+    """
+    Deletes the cubes of cycles run before a cutoff. Processes that still map a
+    deleted cube keep reading it until they switch to a newer one.
+
+    Args:
+        cutoff_datetime (datetime): Cubes of earlier cycles are deleted.
+        keep (datetime): Cycle whose cube is kept regardless, normally the current one.
+        directory (str): Root of the forecast store.
+
+    Returns:
+        int: Number of cubes deleted.
+    """
+    if not os.path.isdir(directory):
+        return 0
+
+    cutoff_name = cycle_directory_name(cutoff_datetime)
+    keep_name = cycle_directory_name(keep) if keep is not None else None
+    removed = 0
+    for name in os.listdir(directory):
+        if name >= cutoff_name or name == keep_name:
+            continue
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        logger.info("Removed expired forecast cube %s", name)
+        removed += 1
+    return removed
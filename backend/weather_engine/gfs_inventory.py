@@ -0,0 +1,177 @@
+# weather_engine/gfs_inventory.py
+
+import logging
+from weather_engine.models import GFSParameter
+
+logger = logging.getLogger(__name__)
+
+# eccodes shortName -> wgrib2 variable abbreviation used in NOAA .idx inventories
+IDX_VARIABLE_NAMES = {
+    '2t': 'TMP',
+    't': 'TMP',
+    '2d': 'DPT',
+    '2r': 'RH',
+    'r': 'RH',
+    '2sh': 'SPFH',
+    '10u': 'UGRD',
+    '10v': 'VGRD',
+    'u': 'UGRD',
+    'v': 'VGRD',
+    'gust': 'GUST',
+    'prmsl': 'PRMSL',
+    'sp': 'PRES',
+    'gh': 'HGT',
+    'orog': 'HGT',
+    'tp': 'APCP',
+    'acpcp': 'ACPCP',
+    'cprat': 'CPRAT',
+    'prate': 'PRATE',
+    'crain': 'CRAIN',
+    'csnow': 'CSNOW',
+    'cfrzr': 'CFRZR',
+    'cicep': 'CICEP',
+    'lcc': 'LCDC',
+    'mcc': 'MCDC',
+    'hcc': 'HCDC',
+    'tcc': 'TCDC',
+    'cape': 'CAPE',
+    'cin': 'CIN',
+    'vis': 'VIS',
+    'sde': 'SNOD',
+    'sdwe': 'WEASD',
+    'pwat': 'PWAT',
+    'lftx': 'LFTX',
+    '4lftx': '4LFTX',
+}
+
+# eccodes typeOfLevel -> .idx level descriptions (formatted with the level value).
+# Layer types such as depthBelowLandLayer ("0-0.1 m below ground") or
+# pressureFromGroundLayer ("30-0 mb above ground") are listed by their two bounds,
+# which the single GFSParameter level does not give, so they are left unmapped.
+IDX_LEVEL_NAMES = {
+    'heightAboveGround': ('{level} m above ground',),
+    'heightAboveSea': ('{level} m above mean sea level',),
+    'isobaricInhPa': ('{level} mb',),
+    'surface': ('surface',),
+    'meanSea': ('mean sea level',),
+    'lowCloudLayer': ('low cloud layer',),
+    'middleCloudLayer': ('middle cloud layer',),
+    'highCloudLayer': ('high cloud layer',),
+    'entireAtmosphere': ('entire atmosphere', 'entire atmosphere (considered as a single layer)'),
+    'atmosphere': ('entire atmosphere', 'entire atmosphere (considered as a single layer)'),
+    'cloudCeiling': ('cloud ceiling',),
+    'tropopause': ('tropopause',),
+    'maxWind': ('max wind',),
+}
+
+
+class IdxRecord:
+    """
+    One message of a GRIB file as listed in its .idx inventory.
+    """
+
+    def __init__(self, number, start, end, variable, level, forecast):
+        self.number = number
+        self.start = start
+        self.end = end  # Inclusive, None for the last message of the file
+        self.variable = variable
+        self.level = level
+        self.forecast = forecast
+
+    def __repr__(self):
+        return f"IdxRecord({self.number}, {self.variable}, {self.level}, {self.forecast})"
+
+
+def parse_idx(text):
+    """
+    Parses a wgrib2 style inventory ("1:0:d=2024101406:PRMSL:mean sea level:anl:").
+
+    Args:
+        text (str): Content of the .idx file.
+
+    Returns:
+        list: IdxRecord per message, with byte ranges derived from the next message offset.
+    """
+    entries = []
+    for line in text.splitlines():
+        fields = line.split(':')
+        if len(fields) < 6:
+            continue
+        try:
+            entries.append((int(fields[0]), int(fields[1]), fields[3], fields[4], fields[5]))
+        except ValueError:
+            logger.warning("Skipping malformed inventory line: %s", line)
+
+    records = []
+    for i, (number, start, variable, level, forecast) in enumerate(entries):
+        end = entries[i + 1][1] - 1 if i + 1 < len(entries) else None
+        records.append(IdxRecord(number, start, end, variable, level, forecast))
+    return records
+
+
+def idx_keys_for(short_name, level, type_of_level):
+    """
+    Translates an eccodes (shortName, level, typeOfLevel) triple into the
+    (variable, level) pairs that .idx inventories may list it under.
+
+    Returns:
+        list or None: (variable, level description) pairs, or None if the level type is unknown.
+    """
+    level_names = IDX_LEVEL_NAMES.get(type_of_level)
+    if type_of_level == 'isobaricInPa':
+        # Levels above 1 hPa are listed in mb with decimals ("0.4 mb")
+        try:
+            level, level_names = f"{float(level) / 100:g}", IDX_LEVEL_NAMES['isobaricInhPa']
+        except (TypeError, ValueError):
+            return None
+    if level_names is None or not short_name:
+        return None
+    variable = IDX_VARIABLE_NAMES.get(short_name.lower(), short_name.upper())
+    return [(variable, level_name.format(level=level)) for level_name in level_names]
+
+
+def enabled_idx_keys():
+    """
+    Returns the .idx (variable, level) pairs of all enabled GFSParameter records.
+
+    Returns:
+        set or None: The pairs (empty if nothing is enabled), or None if some enabled
+        parameter has no inventory mapping and the full files must be downloaded.
+    """
+    keys = set()
+    for param in GFSParameter.objects.filter(enabled=True):
+        param_keys = idx_keys_for(param.short_name, param.level_layer, param.forecast_valid)
+        if param_keys is None:
+            logger.warning(
+                "No inventory mapping for parameter %s (%s, %s), downloading full files",
+                param, param.short_name, param.forecast_valid
+            )
+            return None
+        keys.update(param_keys)
+    return keys
+
+
+def select_records(records, keys):
+    """
+    Returns the inventory records whose (variable, level) is wanted.
+    """
+    return [record for record in records if (record.variable, record.level) in keys]
+
+
+def merge_ranges(records):
+    """
+    Collapses the byte ranges of records into as few contiguous ranges as possible.
+
+    Args:
+        records (list): IdxRecord instances, in file order.
+
+    Returns:
+        list: (start, end) tuples; end is inclusive or None for "until end of file".
+    """
+    ranges = []
+    for record in sorted(records, key=lambda r: r.start):
+        if ranges and ranges[-1][1] is not None and ranges[-1][1] + 1 == record.start:
+            ranges[-1] = (ranges[-1][0], record.end)
+        else:
+            ranges.append((record.start, record.end))
+    return ranges
@@ -0,0 +1,449 @@
+# weather_engine/grid_index.py
+
+import glob
+import hashlib
+import logging
+import math
+import os
+import threading
+import numpy as np
+from django.db.models import Count, Max, Min, Sum
+from scipy import sparse
+from geography.models import GeographicPlace
+
+logger = logging.getLogger(__name__)
+
+# Directory where place-to-gridpoint indices are persisted between runs
+GRID_INDEX_DIRECTORY = os.path.join("data", "grid_index")
+
+# How grid values are interpolated onto places: 'bilinear' or 'nearest'
+DEFAULT_INTERPOLATION = 'bilinear'
+
+# Degrees added around the places bounding box when cropping grids
+DOMAIN_MARGIN_DEGREES = 1.0
+
+# GRIB keys that fully describe a regular lat/lon grid
+GRID_DEFINITION_KEYS = (
+    'Ni',
+    'Nj',
+    'latitudeOfFirstGridPointInDegrees',
+    'longitudeOfFirstGridPointInDegrees',
+    'latitudeOfLastGridPointInDegrees',
+    'longitudeOfLastGridPointInDegrees',
+    'iDirectionIncrementInDegrees',
+    'jDirectionIncrementInDegrees',
+)
+
+
+def grid_definition(grib):
+    """
+    Builds a hashable description of the grid a GRIB message is defined on.
+
+    Args:
+        grib (pygrib.gribmessage): The GRIB message.
+
+    Returns:
+        tuple: The values of GRID_DEFINITION_KEYS, rounded for stable comparison.
+    """
+    definition = []
+    for key in GRID_DEFINITION_KEYS:
+        value = grib[key]
+        definition.append(round(value, 6) if isinstance(value, float) else value)
+    return tuple(definition)
+
+
+def places_signature():
+    """
+    Summarises the place table so that a stored index can be invalidated when places change.
+
+    Returns:
+        tuple: (count, max id, latitude sum, longitude sum) of all GeographicPlace rows.
+    """
+    summary = GeographicPlace.objects.aggregate(
+        count=Count('id'),
+        max_id=Max('id'),
+        latitude_sum=Sum('latitude'),
+        longitude_sum=Sum('longitude'),
+    )
+    return (
+        summary['count'],
+        summary['max_id'] or 0,
+        round(summary['latitude_sum'] or 0.0, 3),
+        round(summary['longitude_sum'] or 0.0, 3),
+    )
+
+
+def places_bounding_box():
+    """
+    Returns the bounding box of all GeographicPlace rows.
+
+    Returns:
+        tuple or None: (min_lat, max_lat, min_lon, max_lon), or None if there are no places.
+    """
+    box = GeographicPlace.objects.aggregate(
+        min_lat=Min('latitude'),
+        max_lat=Max('latitude'),
+        min_lon=Min('longitude'),
+        max_lon=Max('longitude'),
+    )
+    if box['min_lat'] is None:
+        return None
+    return box['min_lat'], box['max_lat'], box['min_lon'], box['max_lon']
+
+
+class GridDomain:
+    """
+    Rectangular window of rows and columns of a regular lat/lon grid.
+    """
+
+    def __init__(self, definition, row_start, row_stop, column_start, column_stop):
+        self.definition = tuple(definition)
+        self.row_start = row_start
+        self.row_stop = row_stop
+        self.column_start = column_start
+        self.column_stop = column_stop
+
+        grid = dict(zip(GRID_DEFINITION_KEYS, self.definition))
+        self.first_latitude = grid['latitudeOfFirstGridPointInDegrees']
+        self.first_longitude = grid['longitudeOfFirstGridPointInDegrees']
+        self.longitude_step = grid['iDirectionIncrementInDegrees']
+        # Rows run north to south on GFS grids, so the latitude step is usually negative
+        if grid['latitudeOfLastGridPointInDegrees'] < self.first_latitude:
+            self.latitude_step = -grid['jDirectionIncrementInDegrees']
+        else:
+            self.latitude_step = grid['jDirectionIncrementInDegrees']
+
+    @property
+    def shape(self):
+        return self.row_stop - self.row_start, self.column_stop - self.column_start
+
+    @property
+    def wraps_longitude(self):
+        """
+        True if the window spans a global grid, so that its last column neighbours its first.
+        """
+        grid = dict(zip(GRID_DEFINITION_KEYS, self.definition))
+        return (
+            self.column_start == 0
+            and self.column_stop == grid['Ni']
+            and math.isclose(grid['Ni'] * self.longitude_step, 360)
+        )
+
+    @classmethod
+    def around(cls, definition, min_lat, max_lat, min_lon, max_lon, margin=DOMAIN_MARGIN_DEGREES):
+        """
+        Builds the smallest window covering a bounding box plus a margin.
+
+        Args:
+            definition (tuple): Grid definition as returned by grid_definition().
+            min_lat (float): Southern edge of the box.
+            max_lat (float): Northern edge of the box.
+            min_lon (float): Western edge of the box.
+            max_lon (float): Eastern edge of the box.
+            margin (float): Degrees added on every side.
+
+        Returns:
+            GridDomain: The window, or the full grid if the box wraps around the grid seam.
+        """
+        domain = cls(definition, 0, 0, 0, 0)
+        grid = dict(zip(GRID_DEFINITION_KEYS, domain.definition))
+
+        rows = sorted((
+            (min_lat - margin - domain.first_latitude) / domain.latitude_step,
+            (max_lat + margin - domain.first_latitude) / domain.latitude_step,
+        ))
+        domain.row_start = max(0, math.floor(rows[0]))
+        domain.row_stop = min(grid['Nj'], math.ceil(rows[1]) + 1)
+
+        west = ((min_lon - margin - domain.first_longitude) % 360) / domain.longitude_step
+        east = ((max_lon + margin - domain.first_longitude) % 360) / domain.longitude_step
+        if west <= east:
+            domain.column_start = max(0, math.floor(west))
+            domain.column_stop = min(grid['Ni'], math.ceil(east) + 1)
+        else:
+            domain.column_start, domain.column_stop = 0, grid['Ni']
+
+        return domain
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['definition'],
+            data['row_start'],
+            data['row_stop'],
+            data['column_start'],
+            data['column_stop'],
+        )
+
+    def to_dict(self):
+        return {
+            'definition': list(self.definition),
+            'row_start': self.row_start,
+            'row_stop': self.row_stop,
+            'column_start': self.column_start,
+            'column_stop': self.column_stop,
+        }
+
+    def latitudes(self):
+        return self.first_latitude + np.arange(self.row_start, self.row_stop) * self.latitude_step
+
+    def longitudes(self):
+        return self.first_longitude + np.arange(self.column_start, self.column_stop) * self.longitude_step
+
+    def crop(self, values):
+        """
+        Cuts the window out of a full (Nj, Ni) field.
+        """
+        return values[self.row_start:self.row_stop, self.column_start:self.column_stop]
+
+    def nearest(self, latitude, longitude):
+        """
+        Returns the (row, column) of the grid point nearest to a coordinate, relative to the window.
+
+        Returns:
+            tuple or None: The position, or None if the coordinate lies outside the window.
+        """
+        row = round((latitude - self.first_latitude) / self.latitude_step) - self.row_start
+        column = round(((longitude - self.first_longitude) % 360) / self.longitude_step) - self.column_start
+        rows, columns = self.shape
+        if self.wraps_longitude:
+            column %= columns
+        if 0 <= row < rows and 0 <= column < columns:
+            return row, column
+        return None
+
+
+def _digest(value):
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()[:16]
+
+
+def _interpolation_weights(domain, latitudes, longitudes, method):
+    """
+    Computes, for every place, the window grid points and weights to interpolate from.
+
+    Returns:
+        tuple: (columns, weights) arrays of shape (places, points per place).
+    """
+    rows, columns = domain.shape
+    # Fractional position of every place in the window
+    row_positions = (latitudes - domain.first_latitude) / domain.latitude_step - domain.row_start
+    column_positions = ((longitudes - domain.first_longitude) % 360) / domain.longitude_step - domain.column_start
+
+    if method == 'nearest':
+        row = np.clip(np.rint(row_positions), 0, rows - 1).astype(np.int64)
+        if domain.wraps_longitude:
+            column = np.rint(column_positions).astype(np.int64) % columns
+        else:
+            column = np.clip(np.rint(column_positions), 0, columns - 1).astype(np.int64)
+        return (row * columns + column)[:, None], np.ones((len(latitudes), 1))
+
+    # Bilinear weights of the four corners of the grid cell containing each place
+    row = np.clip(np.floor(row_positions), 0, rows - 2).astype(np.int64)
+    row_fraction = np.clip(row_positions - row, 0.0, 1.0)
+    if domain.wraps_longitude:
+        # Cells between the last and the first meridian of a global grid wrap around
+        column = np.floor(column_positions).astype(np.int64) % columns
+        column_fraction = column_positions - np.floor(column_positions)
+        next_column = (column + 1) % columns
+    else:
+        column = np.clip(np.floor(column_positions), 0, columns - 2).astype(np.int64)
+        column_fraction = np.clip(column_positions - column, 0.0, 1.0)
+        next_column = column + 1
+
+    corners = np.column_stack((
+        row * columns + column,
+        row * columns + next_column,
+        (row + 1) * columns + column,
+        (row + 1) * columns + next_column,
+    ))
+    weights = np.column_stack((
+        (1 - row_fraction) * (1 - column_fraction),
+        (1 - row_fraction) * column_fraction,
+        row_fraction * (1 - column_fraction),
+        row_fraction * column_fraction,
+    ))
+    return corners, weights
+
+
+class GridIndex:
+    """
+    Interpolates grid fields onto every GeographicPlace with a sparse
+    (places x window grid points) weights matrix, on a GridDomain cropped
+    around the places.
+    """
+
+    def __init__(self, domain, place_ids, latitudes, longitudes, weights):
+        self.domain = domain
+        self.place_ids = place_ids
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.place_ids)
+
+    @classmethod
+    def build(cls, definition, place_ids, latitudes, longitudes, method=DEFAULT_INTERPOLATION):
+        """
+        Builds the weights matrix for the grid window covering the places.
+
+        Positions follow directly from the regular grid definition, so no
+        coordinate arrays or spatial trees are needed and the cost is linear
+        in the number of places.
+
+        Args:
+            definition (tuple): Grid definition as returned by grid_definition().
+            place_ids (numpy.ndarray): Place primary keys.
+            latitudes (numpy.ndarray): Place latitudes.
+            longitudes (numpy.ndarray): Place longitudes.
+            method (str): 'bilinear' or 'nearest'.
+
+        Returns:
+            GridIndex: The computed index.
+        """
+        domain = GridDomain.around(
+            definition, latitudes.min(), latitudes.max(), longitudes.min(), longitudes.max()
+        )
+        columns, weights = _interpolation_weights(domain, latitudes, longitudes, method)
+        points_per_place = columns.shape[1]
+        matrix = sparse.csr_matrix(
+            (weights.ravel(), columns.ravel(), np.arange(0, columns.size + 1, points_per_place)),
+            shape=(len(place_ids), domain.shape[0] * domain.shape[1]),
+        )
+        # Zero weights would still propagate NaN from masked neighbours
+        matrix.eliminate_zeros()
+        # Cells wrapping around the grid seam list their columns out of order
+        matrix.sort_indices()
+        return cls(domain, place_ids, latitudes, longitudes, matrix)
+
+    @classmethod
+    def load(cls, path, definition):
+        with np.load(path) as stored:
+            row_start, row_stop, column_start, column_stop = stored['window'].tolist()
+            domain = GridDomain(definition, row_start, row_stop, column_start, column_stop)
+            rows, columns = domain.shape
+            weights = sparse.csr_matrix(
+                (stored['weight_data'], stored['weight_indices'], stored['weight_indptr']),
+                shape=(len(stored['place_ids']), rows * columns),
+            )
+            return cls(domain, stored['place_ids'], stored['latitudes'], stored['longitudes'], weights)
+
+    def save(self, path):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as file:
+            np.savez(
+                file,
+                window=np.array([
+                    self.domain.row_start,
+                    self.domain.row_stop,
+                    self.domain.column_start,
+                    self.domain.column_stop,
+                ]),
+                place_ids=self.place_ids,
+                latitudes=self.latitudes,
+                longitudes=self.longitudes,
+                weight_data=self.weights.data,
+                weight_indices=self.weights.indices,
+                weight_indptr=self.weights.indptr,
+            )
+        os.replace(temp_path, path)
+
+    def values(self, grib):
+        """
+        Interpolates a GRIB message onto every indexed place.
+
+        Args:
+            grib (pygrib.gribmessage): The GRIB message.
+
+        Returns:
+            numpy.ndarray: float64 values per place, NaN where a contributing grid point is masked.
+        """
+        window = np.ma.asarray(self.domain.crop(grib.values), dtype=np.float64)
+        return self.weights @ np.ma.filled(window, np.nan).ravel()
+
+
+class GridIndexCache:
+    """
+    Hands out GridIndex instances per grid definition, reusing them across
+    messages and files and persisting them under GRID_INDEX_DIRECTORY.
+    """
+
+    def __init__(self, directory=GRID_INDEX_DIRECTORY, method=DEFAULT_INTERPOLATION):
+        self.directory = directory
+        self.method = method
+        self._signature = None
+        self._indices = {}
+        self._lock = threading.Lock()
+
+    @property
+    def signature(self):
+        if self._signature is None:
+            self._signature = places_signature()
+        return self._signature
+
+    def get(self, grib):
+        """
+        Returns the index for the grid of a GRIB message, building it on first use.
+
+        Args:
+            grib (pygrib.gribmessage): Any message on the wanted grid.
+
+        Returns:
+            GridIndex or None: The index, or None if there are no places.
+        """
+        definition = grid_definition(grib)
+        index = self._indices.get(definition)
+        if index is not None:
+            return index
+
+        # Concurrent importers of the same grid wait for a single build
+        with self._lock:
+            return self._get_locked(definition)
+
+    def _get_locked(self, definition):
+        index = self._indices.get(definition)
+        if index is not None:
+            return index
+
+        grid_hash = _digest(definition)
+        path = os.path.join(
+            self.directory, f"grid_{grid_hash}_{_digest((self.method, self.signature))}.npz"
+        )
+
+        if os.path.exists(path):
+            try:
+                index = GridIndex.load(path, definition)
+                logger.info("Loaded grid index for %d places from %s", len(index), path)
+            except Exception as e:
+                logger.warning("Could not load grid index %s, rebuilding: %s", path, e)
+
+        if index is None:
+            index = self._build(definition)
+            if index is None:
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            for stale_path in glob.glob(os.path.join(self.directory, f"grid_{grid_hash}_*.npz")):
+                os.remove(stale_path)
+            index.save(path)
+            logger.info("Saved grid index for %d places to %s", len(index), path)
+
+        self._indices[definition] = index
+        return index
+
+    def _build(self, definition):
+        rows = np.array(
+            list(GeographicPlace.objects.order_by('id').values_list('id', 'latitude', 'longitude')),
+            dtype=np.float64,
+        )
+        if rows.size == 0:
+            logger.error("No places found in the database.")
+            return None
+
+        logger.info("Building %s grid index for %d places.", self.method, len(rows))
+        return GridIndex.build(
+            definition,
+            rows[:, 0].astype(np.int64),
+            rows[:, 1],
+            rows[:, 2],
+            self.method,
+        )
@@ -0,0 +1,141 @@
+# weather_engine/solar.py
+
+import numpy as np
+
+# Zenith angle of the sun's centre at sunrise and sunset, including refraction
+SUNRISE_ZENITH_DEGREES = 90.833
+
+# Julian day of 1970-01-01 00:00 UTC
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+MINUTES_PER_DAY = 1440
+
+# Polar flags returned by sun_times
+POLAR_NIGHT = -1
+POLAR_DAY = 1
+
+
+def _sun_position(julian_day):
+    """
+    Returns the declination (radians) and equation of time (minutes) of the sun,
+    following the NOAA solar calculator.
+    """
+    t = (julian_day - 2451545.0) / 36525.0
+
+    mean_longitude = np.radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360)
+    mean_anomaly = np.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+
+    equation_of_centre = np.radians(
+        np.sin(mean_anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t))
+        + np.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * t)
+        + np.sin(3 * mean_anomaly) * 0.000289
+    )
+    omega = np.radians(125.04 - 1934.136 * t)
+    apparent_longitude = mean_longitude + equation_of_centre - np.radians(0.00569 + 0.00478 * np.sin(omega))
+
+    mean_obliquity = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+    obliquity = np.radians(mean_obliquity + 0.00256 * np.cos(omega))
+
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_longitude))
+
+    y = np.tan(obliquity / 2) ** 2
+    equation_of_time = 4 * np.degrees(
+        y * np.sin(2 * mean_longitude)
+        - 2 * eccentricity * np.sin(mean_anomaly)
+        + 4 * eccentricity * y * np.sin(mean_anomaly) * np.cos(2 * mean_longitude)
+        - 0.5 * y * y * np.sin(4 * mean_longitude)
+        - 1.25 * eccentricity * eccentricity * np.sin(2 * mean_anomaly)
+    )
+    return declination, equation_of_time
+
+
+def _hour_angle_degrees(latitude, declination):
+    """
+    Returns the sunrise hour angle and the raw arccos argument, which lies
+    outside [-1, 1] when the sun never rises or never sets.
+    """
+    latitude = np.radians(latitude)
+    argument = (
+        np.cos(np.radians(SUNRISE_ZENITH_DEGREES)) / (np.cos(latitude) * np.cos(declination))
+        - np.tan(latitude) * np.tan(declination)
+    )
+    return np.degrees(np.arccos(np.clip(argument, -1, 1))), argument
+
+
+def sun_times(dates, latitudes, longitudes):
+    """
+    Computes solar noon, sunrise and sunset for arrays of dates and coordinates
+    in one vectorised pass. Inputs are broadcast against each other, so a column
+    of dates and a row of places yield a dates x places table.
+
+    Each event is refined once at its own time, which keeps the results within
+    about a minute of astral.
+
+    Args:
+        dates (array-like): Dates as numpy datetime64[D] (or anything convertible).
+        latitudes (array-like): Latitudes in degrees.
+        longitudes (array-like): Longitudes in degrees, east positive.
+
+    Returns:
+        tuple: (solar_noon, sunrise, sunset, polar) arrays. Times are UTC
+        datetime64[s]; sunrise and sunset are NaT where polar is POLAR_DAY
+        or POLAR_NIGHT, and polar is 0 elsewhere.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    latitudes = np.clip(np.asarray(latitudes, dtype=float), -89.8, 89.8)
+    longitudes = np.asarray(longitudes, dtype=float)
+
+    day_start = dates.astype(np.int64) + UNIX_EPOCH_JULIAN_DAY
+
+    # First guess at local noon, then refine every event at its own time
+    _, equation_of_time = _sun_position(day_start + 0.5 - longitudes / 360)
+    noon_minutes = 720 - 4 * longitudes - equation_of_time
+    declination, equation_of_time = _sun_position(day_start + noon_minutes / MINUTES_PER_DAY)
+    noon_minutes = 720 - 4 * longitudes - equation_of_time
+
+    hour_angle, argument = _hour_angle_degrees(latitudes, declination)
+    events = []
+    for sign in (-1, 1):
+        event_minutes = noon_minutes + sign * 4 * hour_angle
+        declination, equation_of_time = _sun_position(day_start + event_minutes / MINUTES_PER_DAY)
+        event_hour_angle, _ = _hour_angle_degrees(latitudes, declination)
+        events.append(720 - 4 * longitudes - equation_of_time + sign * 4 * event_hour_angle)
+
+    polar = np.where(argument > 1, POLAR_NIGHT, np.where(argument < -1, POLAR_DAY, 0))
+
+    day_start_seconds = dates.astype('datetime64[s]')
+
+    def to_datetime(minutes, valid):
+        seconds = np.round(np.where(valid, minutes, 0) * 60).astype(np.int64)
+        times = day_start_seconds + seconds.astype('timedelta64[s]')
+        return np.where(valid, times, np.datetime64('NaT'))
+
+    always_valid = np.ones(polar.shape, dtype=bool)
+    return (
+        to_datetime(noon_minutes, always_valid),
+        to_datetime(events[0], polar == 0),
+        to_datetime(events[1], polar == 0),
+        polar,
+    )
+
+
+def solar_dates(times, longitudes):
+    """
+    Returns the date of the solar day each UTC time belongs to, i.e. the date in
+    local mean solar time, so that its sunrise and sunset bracket the daylight
+    around that time even far from Greenwich.
+    """
+    times = np.asarray(times, dtype='datetime64[s]')
+    offsets = np.round(np.asarray(longitudes, dtype=float) * 240).astype(np.int64).astype('timedelta64[s]')
+    return (times + offsets).astype('datetime64[D]')
+
+
+def is_day(times, sunrise, sunset, polar):
+    """
+    Classifies UTC times as day (True) or night (False) given the sun times of
+    their solar dates, as returned by sun_times.
+    """
+    times = np.asarray(times, dtype='datetime64[s]')
+    between = (sunrise <= times) & (times <= sunset)
+    return np.where(polar == 0, between, polar == POLAR_DAY)
@@ -0,0 +1,236 @@
+# weather_engine/sun_table.py
+
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+import numpy as np
+from geography.models import GeographicPlace
+from .grid_index import places_signature
+from .solar import sun_times
+
+logger = logging.getLogger(__name__)
+
+# Root directory holding one sub-directory per built table
+SUN_TABLE_DIRECTORY = os.path.join("data", "sun_table")
+
+MANIFEST_NAME = "manifest.json"
+
+# (place, date) arrays stored as one .npy file each
+SUN_TABLE_ARRAYS = {
+    'solar_noon': 'datetime64[s]',
+    'sunrise': 'datetime64[s]',
+    'sunset': 'datetime64[s]',
+    'polar': np.int8,
+}
+
+# Forecast horizon covered by the table, matching the 384 hour GFS run
+SUN_TABLE_DAYS = 16
+
+# Places computed (and read from the database) at once while building
+SUN_TABLE_CHUNK_PLACES = 100000
+
+# Seconds a process keeps its choice of table while the root directory is unchanged
+SUN_TABLE_RESCAN_SECONDS = 60
+
+# Opened tables keyed by directory; a rebuild always writes a new directory
+_open_tables = {}
+
+# Latest table per root directory: (root mtime, monotonic time of the scan, table or None)
+_latest_tables = {}
+
+
+def load_place_coordinates(chunk_size=SUN_TABLE_CHUNK_PLACES):
+    """
+    Reads the id, latitude and longitude of all places in id order, one chunk at a time.
+
+    Returns:
+        numpy.ndarray: (place, 3) array of id, latitude and longitude.
+    """
+    chunks = []
+    last_id = 0
+    while True:
+        rows = np.array(
+            GeographicPlace.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'latitude', 'longitude')[:chunk_size],
+            dtype=float,
+        ).reshape(-1, 3)
+        if not len(rows):
+            break
+        chunks.append(rows)
+        last_id = int(rows[-1, 0])
+    return np.concatenate(chunks) if chunks else np.empty((0, 3))
+
+
+class SunTable:
+    """
+    Solar noon, sunrise and sunset of every place for a range of solar dates,
+    stored as memory-mapped (place, date) arrays sorted by place id so that the
+    dates of one place are contiguous on disk.
+    """
+
+    def __init__(self, directory, manifest, place_ids, solar_noon, sunrise, sunset, polar):
+        self.directory = directory
+        self.start_date = np.datetime64(manifest['start_date'], 'D')
+        self.signature = tuple(manifest['signature'])
+        self.place_ids = place_ids
+        self.solar_noon = solar_noon
+        self.sunrise = sunrise
+        self.sunset = sunset
+        self.polar = polar
+
+    @property
+    def days(self):
+        return self.sunrise.shape[1]
+
+    @classmethod
+    def build(cls, start_date, days=SUN_TABLE_DAYS, directory=SUN_TABLE_DIRECTORY, chunk_size=SUN_TABLE_CHUNK_PLACES):
+        """
+        Computes the table for all places, chunk by chunk, straight into a new
+        table directory. The manifest is written last, so readers never open a
+        partially written table.
+
+        Args:
+            start_date (date): First solar date of the table.
+            days (int): Number of dates covered.
+            directory (str): Root of the sun tables.
+            chunk_size (int): Places computed at once.
+
+        Returns:
+            SunTable: The table, opened read-only.
+        """
+        signature = places_signature()
+        rows = load_place_coordinates(chunk_size)
+
+        built_at = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')
+        table_directory = os.path.join(directory, f"{start_date:%Y%m%d}_{built_at}")
+        os.makedirs(table_directory, exist_ok=True)
+
+        np.save(os.path.join(table_directory, 'place_ids.npy'), rows[:, 0].astype(np.int64))
+        arrays = {
+            name: np.lib.format.open_memmap(
+                os.path.join(table_directory, f"{name}.npy"), mode='w+', dtype=dtype, shape=(len(rows), days)
+            )
+            for name, dtype in SUN_TABLE_ARRAYS.items()
+        }
+
+        dates = np.datetime64(start_date, 'D') + np.arange(days)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            solar_noon, sunrise, sunset, polar = sun_times(dates[None, :], chunk[:, 1:2], chunk[:, 2:3])
+            arrays['solar_noon'][start:start + len(chunk)] = solar_noon
+            arrays['sunrise'][start:start + len(chunk)] = sunrise
+            arrays['sunset'][start:start + len(chunk)] = sunset
+            arrays['polar'][start:start + len(chunk)] = polar
+
+        for data in arrays.values():
+            data.flush()
+        del arrays
+
+        manifest = {'start_date': str(np.datetime64(start_date, 'D')), 'signature': list(signature)}
+        path = os.path.join(table_directory, MANIFEST_NAME)
+        with open(f"{path}.tmp", 'w') as file:
+            json.dump(manifest, file)
+        os.replace(f"{path}.tmp", path)
+        # Readers re-scan the root when its mtime changes; the manifest alone does not change it
+        os.utime(directory)
+        logger.info("Saved sun table for %d places and %d days to %s", len(rows), days, table_directory)
+        return cls.open(table_directory)
+
+    @classmethod
+    def open(cls, table_directory):
+        with open(os.path.join(table_directory, MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+        arrays = {
+            name: np.load(os.path.join(table_directory, f"{name}.npy"), mmap_mode='r')
+            for name in ('place_ids', *SUN_TABLE_ARRAYS)
+        }
+        return cls(table_directory, manifest, **arrays)
+
+    def is_current(self, start_date):
+        return self.start_date == np.datetime64(start_date, 'D') and self.signature == places_signature()
+
+    def lookup(self, place_id, dates):
+        """
+        Returns the sun times of one place for some solar dates.
+
+        Args:
+            place_id (int): GeographicPlace id.
+            dates (numpy.ndarray): datetime64[D] solar dates.
+
+        Returns:
+            tuple or None: (sunrise, sunset, polar) arrays, or None if the
+            place or any of the dates is not covered by the table.
+        """
+        position = np.searchsorted(self.place_ids, place_id)
+        if position >= len(self.place_ids) or self.place_ids[position] != place_id:
+            return None
+
+        offsets = (np.asarray(dates, dtype='datetime64[D]') - self.start_date).astype(np.int64)
+        if offsets.size == 0 or offsets.min() < 0 or offsets.max() >= self.days:
+            return None
+
+        return self.sunrise[position, offsets], self.sunset[position, offsets], self.polar[position, offsets]
+
+
+def latest_sun_table(directory=SUN_TABLE_DIRECTORY):
+    """
+    Returns the most recently built sun table, reusing already opened memory maps.
+
+    The root directory is only listed again when its mtime changes, or at the latest
+    after SUN_TABLE_RESCAN_SECONDS.
+
+    Returns:
+        SunTable or None: The table, or None if it has not been built.
+    """
+    try:
+        modified = os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+    cached = _latest_tables.get(directory)
+    if cached is not None and cached[0] == modified and time.monotonic() - cached[1] < SUN_TABLE_RESCAN_SECONDS:
+        return cached[2]
+
+    table = _find_latest_sun_table(directory)
+    _latest_tables[directory] = (modified, time.monotonic(), table)
+    return table
+
+
+def _find_latest_sun_table(directory):
+    try:
+        names = sorted(os.listdir(directory), reverse=True)
+    except OSError:
+        return None
+
+    for name in names:
+        table_directory = os.path.join(directory, name)
+        table = _open_tables.get(table_directory)
+        if table is not None:
+            return table
+        if not os.path.exists(os.path.join(table_directory, MANIFEST_NAME)):
+            continue
+        try:
+            table = SunTable.open(table_directory)
+        except Exception as e:
+            logger.warning("Could not open sun table %s: %s", table_directory, e)
+            continue
+        _open_tables.clear()
+        _open_tables[table_directory] = table
+        return table
+
+    return None
+
+
+def remove_old_sun_tables(keep, directory=SUN_TABLE_DIRECTORY):
+    """
+    Deletes every table directory except the given one. Processes that still map
+    an old table keep reading it until they switch to the new one.
+    """
+    for name in os.listdir(directory):
+        table_directory = os.path.join(directory, name)
+        if os.path.isdir(table_directory) and os.path.abspath(table_directory) != os.path.abspath(keep):
+            shutil.rmtree(table_directory, ignore_errors=True)
+            logger.info("Removed old sun table %s", table_directory)
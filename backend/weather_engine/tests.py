@@ -1,3 +1,384 @@
-from django.test import TestCase
+import json
+import math
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timezone
+import numpy as np
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from api.utils.wind import calculate_wind, calculate_wind_arrays
+from geography.models import GeographicCategory, GeographicDivision, GeographicPlace
+from weather.models import ForecastCycle, GFSForecast
+from .forecast_loader import _staging_rows, copy_forecast_rows
+from .gfs_inventory import idx_keys_for, merge_ranges, parse_idx, select_records
+from .grid_index import GRID_DEFINITION_KEYS, GridDomain, GridIndex
+from . import sun_table
+from .solar import POLAR_DAY, POLAR_NIGHT, is_day, solar_dates, sun_times
 
-# Create your tests here.
+# Global 1 degree grid laid out like GFS: rows north to south, columns east from Greenwich
+GLOBAL_GRID = dict(zip(GRID_DEFINITION_KEYS, (360, 181, 90.0, 0.0, -90.0, 359.0, 1.0, 1.0)))
+GLOBAL_DEFINITION = tuple(GLOBAL_GRID[key] for key in GRID_DEFINITION_KEYS)
+
+
+class FakeGrib:
+    """
+    Stands in for a pygrib message; GridIndex only reads its values.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+
+def grid_field(function):
+    """
+    Evaluates function(latitude, longitude) on every point of the global grid.
+    """
+    latitudes = 90.0 - np.arange(181, dtype=float)
+    longitudes = np.arange(360, dtype=float)
+    return function(latitudes[:, None], longitudes[None, :])
+
+
+def baseline_nearest_value(field, latitude, longitude):
+    """
+    Value of the grid point closest in degrees, with longitudes compared around the globe,
+    as the KD-tree lookup used before the sparse weights matrix.
+    """
+    latitudes = 90.0 - np.arange(181, dtype=float)
+    longitudes = np.arange(360, dtype=float)
+    longitude_distance = np.abs((longitudes - longitude + 180) % 360 - 180)
+    row = int(np.argmin(np.abs(latitudes - latitude)))
+    column = int(np.argmin(longitude_distance))
+    return field[row, column]
+
+
+def baseline_calculate_wind(u, v):
+    """
+    The scalar wind calculation replaced by calculate_wind_arrays.
+    """
+    if u is None or v is None:
+        return None, None, None
+    wind_speed = round(math.sqrt(u ** 2 + v ** 2), 2)
+    wind_dir_degrees = (math.degrees(math.atan2(-u, -v)) + 360) % 360
+    compass_sectors = [
+        "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+        "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"
+    ]
+    wind_direction = compass_sectors[int((wind_dir_degrees + 11.25) / 22.5) % 16]
+    limits = [0, 0.3, 1.6, 3.4, 5.5, 8.0, 10.8, 13.9, 17.2, 20.8, 24.5, 28.5, 32.7, float('inf')]
+    beaufort = next((force for force in range(13) if limits[force] <= wind_speed < limits[force + 1]), 0)
+    return wind_speed, wind_direction, beaufort
+
+
+class GridIndexTests(SimpleTestCase):
+    def build(self, latitudes, longitudes, method='bilinear'):
+        latitudes = np.array(latitudes, dtype=float)
+        longitudes = np.array(longitudes, dtype=float)
+        return GridIndex.build(GLOBAL_DEFINITION, np.arange(1, len(latitudes) + 1), latitudes, longitudes, method)
+
+    def test_bilinear_is_exact_on_a_linear_field(self):
+        field = grid_field(lambda latitude, longitude: 2.0 * latitude + 3.0 * longitude)
+        latitudes = [37.25, 38.0, 39.9, 35.1]
+        longitudes = [23.5, 21.0, 20.75, 26.4]
+
+        values = self.build(latitudes, longitudes).values(FakeGrib(field))
+
+        expected = [2.0 * latitude + 3.0 * longitude for latitude, longitude in zip(latitudes, longitudes)]
+        np.testing.assert_allclose(values, expected)
+
+    def test_weights_of_every_place_sum_to_one(self):
+        index = self.build([37.25, 90.0, -90.0], [23.5, 10.0, 359.5])
+
+        np.testing.assert_allclose(np.asarray(index.weights.sum(axis=1)).ravel(), 1.0)
+
+    def test_bilinear_at_the_poles_uses_the_edge_rows(self):
+        field = grid_field(lambda latitude, longitude: latitude + 0.0 * longitude)
+
+        values = self.build([90.0, -90.0, 89.5], [10.0, 10.0, 10.0]).values(FakeGrib(field))
+
+        np.testing.assert_allclose(values, [90.0, -90.0, 89.5])
+
+    def test_bilinear_interpolates_across_the_longitude_seam(self):
+        # Column c holds c, so a place between columns 359 and 0 mixes both ends of the row
+        field = grid_field(lambda latitude, longitude: longitude + 0.0 * latitude)
+        index = self.build([10.0, 10.0, 10.0], [359.75, -0.25, 0.5])
+
+        self.assertTrue(index.domain.wraps_longitude)
+        np.testing.assert_allclose(index.values(FakeGrib(field)), [0.25 * 359, 0.25 * 359, 0.5])
+
+    def test_nearest_matches_the_baseline_lookup(self):
+        field = grid_field(lambda latitude, longitude: np.sin(np.radians(latitude)) * np.cos(np.radians(longitude)))
+        latitudes = [37.9838, 35.3387, 40.6401, 10.0, -45.2]
+        longitudes = [23.7275, 25.1442, 22.9444, 359.8, 0.3]
+
+        values = self.build(latitudes, longitudes, method='nearest').values(FakeGrib(field))
+
+        expected = [
+            baseline_nearest_value(field, latitude, longitude) for latitude, longitude in zip(latitudes, longitudes)
+        ]
+        np.testing.assert_allclose(values, expected)
+
+    def test_masked_neighbour_gives_nan(self):
+        field = np.ma.masked_array(grid_field(lambda latitude, longitude: latitude + longitude))
+        field[52, 23] = np.ma.masked  # 38N 23E
+
+        values = self.build([37.5, 36.0], [23.5, 23.0]).values(FakeGrib(field))
+
+        self.assertTrue(np.isnan(values[0]))
+        self.assertAlmostEqual(values[1], 59.0)
+
+    def test_domain_nearest_wraps_across_the_seam(self):
+        domain = GridDomain(GLOBAL_DEFINITION, 0, 181, 0, 360)
+
+        self.assertEqual(domain.nearest(10.0, 359.8), (80, 0))
+        self.assertEqual(domain.nearest(10.0, -0.2), (80, 0))
+
+
+class WindTests(SimpleTestCase):
+    def test_beaufort_boundaries_match_the_baseline(self):
+        limits = [0.3, 1.6, 3.4, 5.5, 8.0, 10.8, 13.9, 17.2, 20.8, 24.5, 28.5, 32.7]
+        for limit in limits:
+            for speed in (limit - 0.01, limit, limit + 0.01):
+                with self.subTest(speed=speed):
+                    self.assertEqual(calculate_wind(0.0, -speed), baseline_calculate_wind(0.0, -speed))
+
+    def test_beaufort_forces_at_the_limits(self):
+        _, _, beaufort = calculate_wind_arrays([0.0, 0.0, 0.0, 0.0], [0.0, -0.29, -0.3, -32.7])
+
+        self.assertEqual(beaufort.tolist(), [0, 0, 1, 12])
+
+    def test_direction_sector_boundaries_match_the_baseline(self):
+        for sector in range(16):
+            for offset in (-0.001, 0.0, 0.001):
+                degrees = sector * 22.5 + 11.25 + offset
+                # Wind blowing from the given direction
+                u = -10.0 * math.sin(math.radians(degrees))
+                v = -10.0 * math.cos(math.radians(degrees))
+                with self.subTest(degrees=degrees):
+                    self.assertEqual(calculate_wind(u, v), baseline_calculate_wind(u, v))
+
+    def test_cardinal_directions(self):
+        _, directions, _ = calculate_wind_arrays([0.0, -5.0, 0.0, 5.0], [-5.0, 0.0, 5.0, 0.0])
+
+        self.assertEqual(directions.tolist(), ['N', 'E', 'S', 'W'])
+
+    def test_random_components_match_the_baseline(self):
+        rng = np.random.default_rng(0)
+        u = rng.uniform(-40, 40, 2000)
+        v = rng.uniform(-40, 40, 2000)
+        speeds, directions, forces = calculate_wind_arrays(u, v)
+
+        for i in range(len(u)):
+            self.assertEqual(
+                (speeds[i], directions[i], forces[i]),
+                baseline_calculate_wind(float(u[i]), float(v[i])),
+            )
+
+    def test_calm_and_missing_components(self):
+        self.assertEqual(calculate_wind(0.0, 0.0), baseline_calculate_wind(0.0, 0.0))
+        self.assertEqual(calculate_wind(None, 1.0), (None, None, None))
+        self.assertEqual(calculate_wind(1.0, None), (None, None, None))
+
+
+class SolarTests(SimpleTestCase):
+    # Sunrise, solar noon and sunset (UTC) given by astral, which the baseline used
+    ASTRAL_SUN_TIMES = [
+        ('Athens', 37.9838, 23.7275, '2026-06-21', '2026-06-21T03:03:01', '2026-06-21T10:26:48', '2026-06-21T17:50:45'),
+        ('Athens', 37.9838, 23.7275, '2026-12-21', '2026-12-21T05:37:33', '2026-12-21T10:22:55', '2026-12-21T15:08:42'),
+        ('Heraklion', 35.3387, 25.1442, '2026-03-20', '2026-03-20T04:23:33', '2026-03-20T10:27:00', '2026-03-20T16:30:45'),
+    ]
+
+    # Largest difference to astral, which refines each event further
+    TOLERANCE = np.timedelta64(60, 's')
+
+    def assertCloseTime(self, actual, expected):
+        difference = abs(np.datetime64(actual, 's') - np.datetime64(expected, 's'))
+        self.assertLessEqual(difference, self.TOLERANCE, f"{actual} differs from {expected}")
+
+    def test_sun_times_match_astral(self):
+        for name, latitude, longitude, date, sunrise, noon, sunset in self.ASTRAL_SUN_TIMES:
+            with self.subTest(place=name, date=date):
+                solar_noon, rise, set_, polar = sun_times(np.datetime64(date), latitude, longitude)
+                self.assertEqual(polar, 0)
+                self.assertCloseTime(rise, sunrise)
+                self.assertCloseTime(solar_noon, noon)
+                self.assertCloseTime(set_, sunset)
+
+    def test_vectorised_sun_times_match_single_places(self):
+        dates = np.array(['2026-06-21', '2026-12-21'], dtype='datetime64[D]')
+        latitudes = np.array([37.9838, 35.3387])
+        longitudes = np.array([23.7275, 25.1442])
+
+        table = sun_times(dates[:, None], latitudes[None, :], longitudes[None, :])
+
+        for i, date in enumerate(dates):
+            for j in range(len(latitudes)):
+                single = sun_times(date, latitudes[j], longitudes[j])
+                for tabled, alone in zip(table, single):
+                    self.assertEqual(tabled[i, j], alone)
+
+    def test_polar_day_and_night(self):
+        # Tromsø
+        _, summer_sunrise, _, summer = sun_times(np.datetime64('2026-06-21'), 69.6492, 18.9553)
+        _, winter_sunrise, _, winter = sun_times(np.datetime64('2026-12-21'), 69.6492, 18.9553)
+
+        self.assertEqual(summer, POLAR_DAY)
+        self.assertEqual(winter, POLAR_NIGHT)
+        self.assertTrue(np.isnat(summer_sunrise))
+        self.assertTrue(np.isnat(winter_sunrise))
+
+    def test_day_and_night_in_athens(self):
+        times = np.array(
+            ['2026-06-21T02:00', '2026-06-21T04:00', '2026-06-21T12:00', '2026-06-21T17:45', '2026-06-21T18:00'],
+            dtype='datetime64[s]',
+        )
+        _, sunrise, sunset, polar = sun_times(solar_dates(times, 23.7275), 37.9838, 23.7275)
+
+        self.assertEqual(is_day(times, sunrise, sunset, polar).tolist(), [False, True, True, True, False])
+
+    def test_solar_date_follows_local_mean_time(self):
+        times = np.array([datetime(2026, 6, 21, 23, tzinfo=timezone.utc).replace(tzinfo=None)], dtype='datetime64[s]')
+
+        self.assertEqual(str(solar_dates(times, 23.7275)[0]), '2026-06-22')
+        self.assertEqual(str(solar_dates(times, -150.0)[0]), '2026-06-21')
+
+
+class GFSInventoryTests(SimpleTestCase):
+    INVENTORY = (
+        "1:0:d=2026101800:PRMSL:mean sea level:anl:\n"
+        "2:1000:d=2026101800:TMP:2 m above ground:anl:\n"
+        "3:2500:d=2026101800:RH:2 m above ground:anl:\n"
+        "4:bad:d=2026101800:UGRD:10 m above ground:anl:\n"
+        "5:4000:d=2026101800:TCDC:entire atmosphere:anl:\n"
+    )
+
+    def test_parse_idx_derives_byte_ranges_from_the_next_offset(self):
+        records = parse_idx(self.INVENTORY)
+
+        self.assertEqual(
+            [(record.number, record.start, record.end, record.variable, record.level) for record in records],
+            [
+                (1, 0, 999, 'PRMSL', 'mean sea level'),
+                (2, 1000, 2499, 'TMP', '2 m above ground'),
+                (3, 2500, 3999, 'RH', '2 m above ground'),
+                (5, 4000, None, 'TCDC', 'entire atmosphere'),
+            ],
+        )
+
+    def test_merge_ranges_joins_adjacent_messages_only(self):
+        records = parse_idx(self.INVENTORY)
+        selected = select_records(records, {('PRMSL', 'mean sea level'), ('TMP', '2 m above ground'),
+                                            ('TCDC', 'entire atmosphere')})
+
+        self.assertEqual(merge_ranges(selected), [(0, 2499), (4000, None)])
+
+    def test_idx_keys_for_maps_eccodes_names(self):
+        self.assertEqual(idx_keys_for('2t', 2, 'heightAboveGround'), [('TMP', '2 m above ground')])
+        self.assertEqual(idx_keys_for('gh', 500, 'isobaricInhPa'), [('HGT', '500 mb')])
+        self.assertEqual(idx_keys_for('t', 40, 'isobaricInPa'), [('TMP', '0.4 mb')])
+        self.assertEqual(
+            idx_keys_for('tcc', 0, 'entireAtmosphere'),
+            [('TCDC', 'entire atmosphere'), ('TCDC', 'entire atmosphere (considered as a single layer)')],
+        )
+
+    def test_idx_keys_for_unknown_level_type_is_unmapped(self):
+        self.assertIsNone(idx_keys_for('soilw', 0, 'depthBelowLandLayer'))
+        self.assertIsNone(idx_keys_for(None, 2, 'heightAboveGround'))
+
+
+class ForecastLoaderTests(TestCase):
+    def setUp(self):
+        category = GeographicCategory.objects.create(slug='default')
+        division = GeographicDivision.objects.create(slug='attica')
+        self.place = GeographicPlace.objects.create(
+            slug='athens', latitude=37.9838, longitude=23.7275, category=category, admin_division=division,
+        )
+        self.cycle = ForecastCycle.objects.create(run_datetime=datetime(2026, 10, 18, 0, tzinfo=timezone.utc))
+
+    def row(self, hour, forecast_data):
+        return {
+            'cycle_id': self.cycle.pk, 'place_id': self.place.pk, 'date': date(2026, 10, 18), 'hour': hour,
+            'utc_cycle_time': '00', 'latitude': 37.9838, 'longitude': 23.7275, 'forecast_data': forecast_data,
+        }
+
+    def stored(self, hour):
+        return GFSForecast.objects.get(cycle=self.cycle, place=self.place, hour=hour)
+
+    def test_hot_parameters_go_to_their_columns(self):
+        row = next(_staging_rows([self.row(0, {'2t_level_2_heightAboveGround': 290.0, 'gust_level_0_surface': 7.0})]))
+
+        self.assertEqual(row[7], '{"gust_level_0_surface": 7.0}')
+        self.assertEqual(row[8:], (290.0,) + (None,) * 7)
+
+    def test_parameters_missing_from_a_later_file_keep_their_value(self):
+        copy_forecast_rows([self.row(0, {
+            '2t_level_2_heightAboveGround': 290.0, '10u_level_10_heightAboveGround': 3.0, 'gust_level_0_surface': 7.0,
+        })])
+
+        copy_forecast_rows([self.row(0, {'2t_level_2_heightAboveGround': 291.0, 'vis_level_0_surface': 9000.0})])
+
+        forecast = self.stored(0)
+        self.assertEqual((forecast.temperature_2m, forecast.wind_u_10m), (291.0, 3.0))
+        self.assertIsNone(forecast.pressure_msl)
+        self.assertEqual(forecast.forecast_data, {'gust_level_0_surface': 7.0, 'vis_level_0_surface': 9000.0})
+
+    def test_reimporting_the_same_file_leaves_the_rows_unchanged(self):
+        rows = [self.row(hour, {'2t_level_2_heightAboveGround': 290.0 + hour, 'gust_level_0_surface': 7.0})
+                for hour in (0, 3, 6)]
+        copy_forecast_rows(rows)
+        before = list(GFSForecast.objects.filter(cycle=self.cycle).order_by('hour').values())
+
+        self.assertEqual(copy_forecast_rows(rows), 3)
+
+        self.assertEqual(list(GFSForecast.objects.filter(cycle=self.cycle).order_by('hour').values()), before)
+
+
+class LatestSunTableTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(sun_table._latest_tables.clear)
+        self.addCleanup(sun_table._open_tables.clear)
+
+    def write_table(self, name, touch=True):
+        # What SunTable.build writes for a single place and day
+        table_directory = os.path.join(self.directory, name)
+        os.makedirs(table_directory, exist_ok=True)
+        np.save(os.path.join(table_directory, 'place_ids.npy'), np.array([1], dtype=np.int64))
+        for array_name, dtype in sun_table.SUN_TABLE_ARRAYS.items():
+            np.save(os.path.join(table_directory, f"{array_name}.npy"), np.zeros((1, 1), dtype=dtype))
+        with open(os.path.join(table_directory, sun_table.MANIFEST_NAME), 'w') as file:
+            json.dump({'start_date': '2026-10-17', 'signature': [1, 1]}, file)
+        if touch:
+            modified = os.stat(self.directory).st_mtime_ns + 1000000000
+            os.utime(self.directory, ns=(modified, modified))
+        return table_directory
+
+    def test_choice_is_kept_while_the_directory_is_unchanged(self):
+        self.write_table('20261017_1')
+        first = sun_table.latest_sun_table(self.directory)
+
+        with mock.patch.object(sun_table.os, 'listdir', wraps=os.listdir) as listdir:
+            self.assertIs(sun_table.latest_sun_table(self.directory), first)
+        listdir.assert_not_called()
+
+    def test_new_table_is_picked_up_when_the_directory_changes(self):
+        self.write_table('20261017_1')
+        sun_table.latest_sun_table(self.directory)
+
+        newer = self.write_table('20261017_2')
+
+        self.assertEqual(sun_table.latest_sun_table(self.directory).directory, newer)
+
+    def test_directory_is_scanned_again_after_the_rescan_interval(self):
+        os.makedirs(os.path.join(self.directory, '20261017_1'))
+        self.assertIsNone(sun_table.latest_sun_table(self.directory))
+        # Files written into an existing table directory leave the root mtime alone
+        table_directory = self.write_table('20261017_1', touch=False)
+
+        self.assertIsNone(sun_table.latest_sun_table(self.directory))
+        with mock.patch.object(sun_table, 'SUN_TABLE_RESCAN_SECONDS', 0):
+            self.assertEqual(sun_table.latest_sun_table(self.directory).directory, table_directory)
+
+    def test_missing_directory(self):
+        self.assertIsNone(sun_table.latest_sun_table(os.path.join(self.directory, 'missing')))